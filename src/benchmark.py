@@ -0,0 +1,290 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import multiprocessing
+from datetime import datetime, timezone
+from movies_dataset_class import MoviesDataSet
+from synthetic_data import generate_synthetic_dataset
+from instrumentation import get_peak_rss_bytes
+from utils import logger
+
+# Version of the benchmark report format
+REPORT_VERSION = 1
+DEFAULT_SCALES = [1000000, 10000000, 100000000]
+# Query methods timed by the benchmark, with their arguments
+BENCHMARK_QUERIES = {
+    "get_unique_movies": {},
+    "get_average_movie_rating": {},
+    "get_top_5_highest_rated_movies": {},
+    "get_top_n_rated_movies": {"n": 10, "min_ratings": 10},
+    "get_movies_released_each_year": {},
+    "get_movies_count_by_genre": {}
+}
+# Query methods estimated in approximate mode, timed against their exact results
+APPROXIMATE_QUERIES = [
+    "get_average_movie_rating",
+    "get_top_5_highest_rated_movies"
+]
+# Export file attributes of the ConfigParser redirected to the benchmark output directory
+EXPORT_FILE_ATTRIBUTES = [
+    "movies_metadata_json",
+    "ratings_json",
+    "genres_json",
+    "unique_movies_json",
+    "average_movies_rating_json",
+    "top_5_rated_movies_json",
+    "movies_released_by_year_json",
+    "movies_by_genre_json"
+]
+
+
+def run_scale_benchmark(source_files: dict, backend: str = "pandas", repeat: int = 1, export: bool = True,
+                        export_dir: str = None) -> dict:
+    """
+    Times the loading, the query methods and the export of a dataset. Every query run is cold - timed with
+    an empty result cache and without the indexes and aggregates built by earlier runs or queries - and the fastest
+    of the repeated runs is reported. The warm timings are of one more run reusing the indexes and aggregates
+    of the cold runs. The approximate timings are of the queries estimated in approximate mode and of their exact
+    results, both run on a new dataset, so the reading of the ratings CSV file is timed. Runs in a fresh process,
+    see benchmark_scale, so the peak resident set size belongs to a single dataset.
+    :param source_files: Dictionary with the table names and their CSV file paths
+    :param backend: Query backend name - 'pandas' or 'sql'
+    :param repeat: Number of runs of every query
+    :param export: If true, the export is timed
+    :param export_dir: Directory of the exported files
+    :return: Dictionary with the cold, warm and approximate timings in seconds, the rows counts and the peak
+    resident set size in bytes
+    """
+    timings = {}
+    warm_timings = {}
+    start_time = time.perf_counter()
+    movies_dataset_object = MoviesDataSet(
+        movies_file_path=source_files["movies"],
+        ratings_file_path=source_files["ratings"],
+        genres_file_path=source_files["genres"],
+        links_file_path=source_files["links"],
+        backend=backend,
+        # The tables are loaded eagerly, so the queries are timed without the reading of the CSV files
+        lazy_loading=False
+    )
+    timings["load"] = time.perf_counter() - start_time
+
+    for method_name, arguments in BENCHMARK_QUERIES.items():
+        run_timings = []
+        for _ in range(repeat):
+            movies_dataset_object.clear_derived_state()
+            start_time = time.perf_counter()
+            getattr(movies_dataset_object, method_name)(**arguments)
+            run_timings.append(time.perf_counter() - start_time)
+        timings[method_name] = min(run_timings)
+
+        movies_dataset_object.result_cache.clear()
+        start_time = time.perf_counter()
+        getattr(movies_dataset_object, method_name)(**arguments)
+        warm_timings[method_name] = time.perf_counter() - start_time
+
+    approximate_timings = {}
+    for method_name in APPROXIMATE_QUERIES:
+        approximate_timings[method_name] = {}
+        for mode_name, approximate in [("exact", False), ("approximate", True)]:
+            run_timings = []
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                lazy_dataset_object = MoviesDataSet(
+                    movies_file_path=source_files["movies"],
+                    ratings_file_path=source_files["ratings"],
+                    genres_file_path=source_files["genres"],
+                    links_file_path=source_files["links"],
+                    backend=backend,
+                    lazy_loading=True,
+                    approximate=approximate
+                )
+                getattr(lazy_dataset_object, method_name)()
+                run_timings.append(time.perf_counter() - start_time)
+            approximate_timings[method_name][mode_name] = min(run_timings)
+
+    if export:
+        for attribute_name in EXPORT_FILE_ATTRIBUTES:
+            setattr(movies_dataset_object.config, attribute_name, os.path.join(export_dir, f"{attribute_name}.json"))
+        movies_dataset_object.clear_derived_state()
+        start_time = time.perf_counter()
+        movies_dataset_object.save_to_json_movies_dataset()
+        timings["save_to_json_movies_dataset"] = time.perf_counter() - start_time
+
+    return {
+        "rows": {
+            "movies": len(movies_dataset_object.movies_df),
+            "ratings": len(movies_dataset_object.ratings_df),
+            "genres": len(movies_dataset_object.genres_df)
+        },
+        "timings": timings,
+        "warm_timings": warm_timings,
+        "approximate_timings": approximate_timings,
+        "peak_rss_bytes": get_peak_rss_bytes()
+    }
+
+
+def benchmark_scale(ratings_count: int, data_dir: str, backend: str = "pandas", seed: int = 0, repeat: int = 1,
+                    export: bool = True) -> dict:
+    """
+    Generates the synthetic dataset of a scale, unless it was generated before, and benchmarks it in a new process
+    :param ratings_count: Number of ratings of the synthetic dataset
+    :param data_dir: Directory of the generated datasets
+    :param backend: Query backend name - 'pandas' or 'sql'
+    :param seed: Synthetic data generator seed
+    :param repeat: Number of runs of every query
+    :param export: If true, the export is timed
+    :return: Dictionary with the scale benchmark results, see run_scale_benchmark
+    """
+    dataset_dir = os.path.join(data_dir, f"ratings_{ratings_count}_seed_{seed}")
+    complete_marker_path = os.path.join(dataset_dir, "complete")
+    start_time = time.perf_counter()
+    source_files = {
+        "movies": os.path.join(dataset_dir, "movies_metadata.csv"),
+        "ratings": os.path.join(dataset_dir, "ratings.csv"),
+        "genres": os.path.join(dataset_dir, "genres.csv"),
+        "links": os.path.join(dataset_dir, "links.csv")
+    }
+    # The datasets generated without the links file have ratings with TMDB ids, so they are generated again
+    if not (os.path.exists(complete_marker_path) and os.path.exists(source_files["links"])):
+        source_files = generate_synthetic_dataset(dataset_dir, ratings_count=ratings_count, seed=seed)
+        open(complete_marker_path, "w").close()
+    generation_time = time.perf_counter() - start_time
+
+    # A spawned process starts with a fresh peak resident set size
+    with multiprocessing.get_context("spawn").Pool(processes=1) as pool:
+        result = pool.apply(
+            run_scale_benchmark, (source_files, backend, repeat, export, os.path.join(dataset_dir, "export"))
+        )
+
+    logger.info(f"Benchmarked {ratings_count} ratings with {backend} backend: {result}")
+    return dict(scale=ratings_count, generation_seconds=generation_time, **result)
+
+
+def run_benchmarks(scales: list, data_dir: str, backend: str = "pandas", seed: int = 0, repeat: int = 1,
+                   export: bool = True) -> dict:
+    """
+    Benchmarks MoviesDataSet on synthetic datasets of several scales
+    :param scales: List with the numbers of ratings of the benchmarked datasets
+    :param data_dir: Directory of the generated datasets
+    :param backend: Query backend name - 'pandas' or 'sql'
+    :param seed: Synthetic data generator seed
+    :param repeat: Number of runs of every query
+    :param export: If true, the export is timed
+    :return: Dictionary with the benchmark report
+    """
+    return {
+        "report_version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "backend": backend,
+        "seed": seed,
+        "repeat": repeat,
+        "results": [
+            benchmark_scale(scale, data_dir, backend=backend, seed=seed, repeat=repeat, export=export)
+            for scale in scales
+        ]
+    }
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """
+    Compares the timings and the peak memory of a benchmark report with a baseline report
+    :param report: Dictionary with the benchmark report
+    :param baseline: Dictionary with the baseline benchmark report
+    :param tolerance: Allowed relative increase, e.g. 0.2 for 20 %
+    :return: List with a dictionary for every metric measured in both reports - the scale, the metric name,
+    the baseline and the current values, their ratio and if the metric regressed above the tolerance
+    """
+    baseline_results = {result["scale"]: result for result in baseline["results"]}
+    comparison = []
+    for result in report["results"]:
+        baseline_result = baseline_results.get(result["scale"])
+        if baseline_result is None:
+            continue
+        metrics = dict(result["timings"], peak_rss_bytes=result["peak_rss_bytes"])
+        baseline_metrics = dict(baseline_result["timings"], peak_rss_bytes=baseline_result["peak_rss_bytes"])
+        for metric, value in metrics.items():
+            # The peak resident set size is unknown on the platforms without the resource module
+            if value is None or baseline_metrics.get(metric) is None:
+                continue
+            baseline_value = baseline_metrics[metric]
+            ratio = value / baseline_value if baseline_value else float("inf")
+            comparison.append(
+                {
+                    "scale": result["scale"],
+                    "metric": metric,
+                    "baseline": baseline_value,
+                    "current": value,
+                    "ratio": ratio,
+                    "regressed": ratio > 1 + tolerance
+                }
+            )
+
+    return comparison
+
+
+def format_comparison(comparison: list) -> str:
+    """
+    Formats a report comparison as a text table
+    :param comparison: List with the compared metrics, see compare_reports
+    :return: Text table with a line per compared metric
+    """
+    lines = [f"{'scale':>12} {'metric':<32} {'baseline':>14} {'current':>14} {'ratio':>7}"]
+    for row in comparison:
+        lines.append(
+            f"{row['scale']:>12} {row['metric']:<32} {row['baseline']:>14.4f} {row['current']:>14.4f} "
+            f"{row['ratio']:>7.2f}{'  REGRESSED' if row['regressed'] else ''}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list = None) -> int:
+    """
+    Benchmark command line entry point, e.g.:
+    python src/benchmark.py --scales 1000000 10000000 --output report.json --baseline baseline.json
+    :param argv: List with the command line arguments, sys.argv by default
+    :return: Exit code - 1 if a metric regressed against the baseline, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Benchmark MoviesDataSet on synthetic datasets.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="numbers of ratings")
+    parser.add_argument("--data-dir", default="benchmark_data", help="directory of the generated datasets")
+    parser.add_argument("--backend", default="pandas", choices=["pandas", "sql"], help="query backend")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data generator seed")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of every query")
+    parser.add_argument("--no-export", action="store_true", help="do not time the export")
+    parser.add_argument("--output", default="benchmark_report.json", help="benchmark report file path")
+    parser.add_argument("--baseline", help="baseline report file path the results are compared with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    arguments = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        arguments.scales,
+        arguments.data_dir,
+        backend=arguments.backend,
+        seed=arguments.seed,
+        repeat=arguments.repeat,
+        export=not arguments.no_export
+    )
+    with open(arguments.output, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=4)
+    print(f"Benchmark report saved to: {arguments.output}")
+
+    if not arguments.baseline:
+        return 0
+
+    with open(arguments.baseline, "r", encoding="utf-8") as baseline_file:
+        comparison = compare_reports(report, json.load(baseline_file), tolerance=arguments.tolerance)
+    print(format_comparison(comparison))
+    return 1 if any(row["regressed"] for row in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
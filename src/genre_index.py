@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from ratings_aggregation import RatingsAggregate
+from primary_key_index import PrimaryKeyIndex
+
+
+class GenreIndex:
+    """
+    A class for the genre index of the movies - a movie x genre bitmap built once from the genres table,
+    so the genre queries are answered without joining the movies and genres tables
+    ...
+
+    Attributes
+    ----------
+    movie_ids : np.ndarray
+        sorted ids of the movies, the rows of the bitmap
+    genre_names : list
+        sorted genre names, the columns of the bitmap
+    bitmap : np.ndarray
+        boolean movie x genre matrix, true if the movie has the genre
+    unparsed_movies_count : int
+        number of distinct movie ids which are not integers, they have no genres
+
+    Methods
+    -------
+    from_frames(movies_df, genres_df):
+        Builds the genre index of the movies
+    from_key_positions(movies_index, movie_positions, genre_names):
+        Builds the genre index from the movie key positions of the genres
+    get_movie_ids(genre_name):
+        Gets the ids of the movies with a genre
+    get_counts():
+        Gets the number of movies of every genre
+    get_movies_with_genres(genre_names, match):
+        Gets the ids of the movies with any or all of the genres
+    get_cooccurrence():
+        Gets the number of movies of every pair of genres
+    get_average_ratings(ratings_aggregate):
+        Gets the number of ratings and the average rating of every genre
+    """
+
+    def __init__(self, movie_ids: np.ndarray, genre_names: list, bitmap: np.ndarray, unparsed_movies_count: int = 0):
+        self.movie_ids = movie_ids
+        self.genre_names = genre_names
+        self.bitmap = bitmap
+        self.unparsed_movies_count = unparsed_movies_count
+
+    @classmethod
+    def from_frames(cls, movies_df: pd.DataFrame, genres_df: pd.DataFrame):
+        """
+        Builds the genre index of the movies. The genres of the ids missing in the movies table are ignored,
+        the same as by the left join of the movies with the genres, so every indexed genre has a movie.
+        :param movies_df: Pandas data frame with the movies 'id' column
+        :param genres_df: Pandas data frame with the movie 'id' and 'genre_name' columns
+        :return: GenreIndex object
+        """
+        movies_index = PrimaryKeyIndex.from_frame(movies_df, "id")
+        return cls.from_key_positions(
+            movies_index, movies_index.get_key_positions(genres_df["id"]), genres_df["genre_name"]
+        )
+
+    @classmethod
+    def from_key_positions(cls, movies_index: PrimaryKeyIndex, movie_positions: np.ndarray, genre_names: pd.Series):
+        """
+        Builds the genre index from the positions of the genres movies in the movies primary key index,
+        so the genres are joined with the movies by position
+        :param movies_index: PrimaryKeyIndex object of the movies table
+        :param movie_positions: NumPy array with the key position of the movie of every genre row, -1 for unknown ids
+        :param genre_names: Pandas series with the genre name of every genre row
+        :return: GenreIndex object
+        """
+        genre_names = genre_names.astype(object)
+        known_movies = (movie_positions >= 0) & genre_names.notna().to_numpy()
+        genre_codes, unique_genre_names = pd.factorize(genre_names[known_movies], sort=True)
+
+        bitmap = np.zeros((len(movies_index.keys), len(unique_genre_names)), dtype=bool)
+        bitmap[movie_positions[known_movies], genre_codes] = True
+        return cls(movies_index.keys, list(unique_genre_names), bitmap, movies_index.unparsed_keys_count)
+
+    def get_movie_ids(self, genre_name: str) -> np.ndarray:
+        """
+        Gets the ids of the movies with a genre
+        :param genre_name: Genre name
+        :return: Sorted NumPy array with the movie ids, empty for an unknown genre
+        """
+        if genre_name not in self.genre_names:
+            return np.zeros(0, dtype="int64")
+        return self.movie_ids[self.bitmap[:, self.genre_names.index(genre_name)]]
+
+    def get_counts(self) -> pd.DataFrame:
+        """
+        Gets the number of movies of every genre. The movies without genres are counted in the missing genre group.
+        :return: Pandas data frame with 'genre' and 'movies_count' columns ordered by descending count and genre
+        """
+        genre_counts = self.bitmap.sum(axis=0)
+        without_genres_count = int((~self.bitmap.any(axis=1)).sum()) + self.unparsed_movies_count
+        counts = pd.DataFrame(
+            {
+                "genre": [None] + self.genre_names,
+                "movies_count": np.concatenate([[without_genres_count], genre_counts]).astype("int64")
+            }
+        )
+        counts = counts[counts["movies_count"] > 0]
+        # The missing genre is first among the genres with the same count, as NULL is sorted first by SQL
+        order = np.lexsort((counts["genre"].notna().to_numpy(), -counts["movies_count"].to_numpy()))
+        return counts.iloc[order].reset_index(drop=True)
+
+    def get_movies_with_genres(self, genre_names: list, match: str = "any") -> np.ndarray:
+        """
+        Gets the ids of the movies with any or all of the genres
+        :param genre_names: List with the genre names
+        :param match: 'any' for the movies with at least one of the genres, 'all' for the movies with every genre
+        :return: Sorted NumPy array with the movie ids
+        """
+        if match not in ("any", "all"):
+            raise ValueError(f"Unknown genre match '{match}'. Available matches: any, all")
+
+        genre_positions = [self.genre_names.index(genre_name) for genre_name in genre_names
+                           if genre_name in self.genre_names]
+        if match == "all" and len(genre_positions) < len(set(genre_names)):
+            return np.zeros(0, dtype="int64")
+
+        genres_bitmap = self.bitmap[:, genre_positions]
+        selected_movies = genres_bitmap.any(axis=1) if match == "any" else genres_bitmap.all(axis=1)
+        return self.movie_ids[selected_movies]
+
+    def get_cooccurrence(self) -> pd.DataFrame:
+        """
+        Gets the number of movies of every pair of genres. The diagonal has the number of movies of every genre.
+        :return: Pandas data frame with the genre names as index and columns
+        """
+        bitmap = self.bitmap.astype("int64")
+        return pd.DataFrame(bitmap.T @ bitmap, index=self.genre_names, columns=self.genre_names)
+
+    def get_average_ratings(self, ratings_aggregate: RatingsAggregate) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average of all ratings of the movies of every genre
+        :param ratings_aggregate: RatingsAggregate object with the per-movie rating sums and counts
+        :return: Pandas data frame with 'genre', 'rating_count' and 'average_rating' columns of the rated genres
+        ordered by descending average rating and genre
+        """
+        # Rating sums and counts of the index movies, zero for the movies without ratings
+        rated_movies = (self.movie_ids >= 0) & (self.movie_ids < len(ratings_aggregate.rating_counts))
+        rating_sums = np.zeros(len(self.movie_ids))
+        rating_counts = np.zeros(len(self.movie_ids), dtype="int64")
+        rating_sums[rated_movies] = ratings_aggregate.rating_sums[self.movie_ids[rated_movies]]
+        rating_counts[rated_movies] = ratings_aggregate.rating_counts[self.movie_ids[rated_movies]]
+
+        genre_rating_counts = rating_counts @ self.bitmap
+        rated_genres = genre_rating_counts > 0
+        average_ratings = pd.DataFrame(
+            {
+                "genre": np.array(self.genre_names, dtype=object)[rated_genres],
+                "rating_count": genre_rating_counts[rated_genres].astype("int64"),
+                "average_rating": (rating_sums @ self.bitmap)[rated_genres] / genre_rating_counts[rated_genres]
+            }
+        )
+        return average_ratings.sort_values(
+            ["average_rating", "genre"], ascending=[False, True], kind="stable"
+        ).reset_index(drop=True)
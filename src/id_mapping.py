@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+class IdMapping:
+    """
+    A class for the dense id translation index of the links table - an array indexed by the MovieLens movie id
+    of the ratings with the TMDB movie id of the movies metadata, so ids are translated with a single array lookup
+    instead of a join
+    ...
+
+    Attributes
+    ----------
+    target_ids : np.ndarray
+        TMDB id of every MovieLens id, -1 for the MovieLens ids without a TMDB id
+
+    Methods
+    -------
+    from_frame(links_df, source_column, target_column):
+        Builds the id translation index of a links table
+    map_ids(movie_ids):
+        Translates MovieLens ids to TMDB ids
+    """
+
+    def __init__(self, target_ids: np.ndarray):
+        self.target_ids = target_ids
+
+    @classmethod
+    def from_frame(cls, links_df: pd.DataFrame, source_column: str = "movieId", target_column: str = "tmdbId"):
+        """
+        Builds the id translation index of a links table. The links with a missing or negative id are ignored
+        and the first link of a duplicated MovieLens id is used.
+        :param links_df: Pandas data frame with the MovieLens and TMDB id columns
+        :param source_column: Name of the MovieLens id column
+        :param target_column: Name of the TMDB id column
+        :return: IdMapping object
+        """
+        source_ids = pd.to_numeric(links_df[source_column], errors="coerce").to_numpy(dtype="float64")
+        target_ids = pd.to_numeric(links_df[target_column], errors="coerce").to_numpy(dtype="float64")
+        valid_links = (source_ids >= 0) & (target_ids >= 0) & (source_ids % 1 == 0) & (target_ids % 1 == 0)
+        source_ids = source_ids[valid_links].astype("int64")
+        target_ids = target_ids[valid_links].astype("int64")
+
+        source_ids, first_positions = np.unique(source_ids, return_index=True)
+        dense_target_ids = np.full(source_ids[-1] + 1 if len(source_ids) else 0, -1, dtype="int64")
+        dense_target_ids[source_ids] = target_ids[first_positions]
+        return cls(dense_target_ids)
+
+    def map_ids(self, movie_ids: np.ndarray) -> np.ndarray:
+        """
+        Translates MovieLens ids to TMDB ids
+        :param movie_ids: NumPy array with the MovieLens ids, missing ids are NaN
+        :return: NumPy array with the TMDB ids, -1 for the ids without a TMDB id
+        """
+        movie_ids = np.asarray(movie_ids)
+        mapped_ids = np.full(len(movie_ids), -1, dtype="int64")
+        known_ids = (movie_ids >= 0) & (movie_ids < len(self.target_ids))
+        mapped_ids[known_ids] = self.target_ids[movie_ids[known_ids].astype("int64")]
+        return mapped_ids
@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import time
+import inspect
+import functools
+import threading
+import tracemalloc
+from typing import Callable
+
+try:
+    import resource
+except ImportError:
+    # The resource module is Unix-only, the process peak resident set size is not reported on Windows
+    resource = None
+
+
+class MetricsRegistry:
+    """
+    A class for the in-process registry of the timing, row count and memory metrics of the instrumented operations
+    ...
+
+    Attributes
+    ----------
+    enabled : bool
+        if false, the instrumented operations are called without measuring them
+    started_tracing : bool
+        if true, the memory allocations tracing was started by enable() and is stopped by disable()
+    metrics : dict
+        dictionary with the operation names and their aggregated metrics
+    lock : threading.Lock
+        lock of the metrics updates, as the export files are written by a thread pool
+
+    Methods
+    -------
+    enable():
+        Starts recording the metrics and tracing the memory allocations
+    disable():
+        Stops recording the metrics and tracing the memory allocations
+    record(operation_name, wall_seconds, cpu_seconds, input_rows, output_rows, peak_memory_delta_bytes):
+        Adds the metrics of an operation call
+    reset():
+        Removes all recorded metrics
+    get_profile():
+        Gets the recorded metrics
+    save_to_json(file_path):
+        Saves the recorded metrics to a JSON file
+    format_summary():
+        Formats the recorded metrics as a text table
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started_tracing = False
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        """
+        Starts recording the metrics and tracing the memory allocations, unless they are traced already
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stops recording the metrics and the memory allocations tracing started by enable()
+        """
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        self.enabled = False
+
+    def record(self, operation_name: str, wall_seconds: float, cpu_seconds: float, input_rows: int = None,
+               output_rows: int = None, peak_memory_delta_bytes: int = 0) -> None:
+        """
+        Adds the metrics of an operation call to the aggregated metrics of the operation
+        :param operation_name: Operation name, e.g. 'MoviesDataSet.get_unique_movies'
+        :param wall_seconds: Wall time of the call
+        :param cpu_seconds: CPU time of the calling thread
+        :param input_rows: Number of input rows, None if unknown
+        :param output_rows: Number of output rows, None if the result is not a table
+        :param peak_memory_delta_bytes: Peak traced memory during the call above the traced memory at its start
+        """
+        with self.lock:
+            operation_metrics = self.metrics.setdefault(
+                operation_name,
+                {
+                    "calls": 0,
+                    "wall_seconds": 0.0,
+                    "max_wall_seconds": 0.0,
+                    "cpu_seconds": 0.0,
+                    "input_rows": 0,
+                    "output_rows": 0,
+                    "peak_memory_delta_bytes": 0
+                }
+            )
+            operation_metrics["calls"] += 1
+            operation_metrics["wall_seconds"] += wall_seconds
+            operation_metrics["max_wall_seconds"] = max(operation_metrics["max_wall_seconds"], wall_seconds)
+            operation_metrics["cpu_seconds"] += cpu_seconds
+            operation_metrics["input_rows"] += input_rows if input_rows else 0
+            operation_metrics["output_rows"] += output_rows if output_rows else 0
+            operation_metrics["peak_memory_delta_bytes"] = max(
+                operation_metrics["peak_memory_delta_bytes"], peak_memory_delta_bytes
+            )
+
+    def reset(self) -> None:
+        """
+        Removes all recorded metrics
+        """
+        with self.lock:
+            self.metrics = {}
+
+    def get_profile(self) -> dict:
+        """
+        Gets the recorded metrics
+        :return: Dictionary with the process peak resident set size, None if it is unknown, and the metrics of every
+        operation ordered by descending total wall time
+        """
+        with self.lock:
+            operations = sorted(self.metrics.items(), key=lambda item: item[1]["wall_seconds"], reverse=True)
+            return {
+                "peak_rss_bytes": get_peak_rss_bytes(),
+                "operations": {operation_name: dict(metrics) for operation_name, metrics in operations}
+            }
+
+    def save_to_json(self, file_path: str) -> None:
+        """
+        Saves the recorded metrics to a JSON file
+        :param file_path: JSON file path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as profile_file:
+            json.dump(self.get_profile(), profile_file, indent=4)
+
+    def format_summary(self) -> str:
+        """
+        Formats the recorded metrics as a text table
+        :return: Text table with a line per operation
+        """
+        profile = self.get_profile()
+        lines = [
+            f"{'operation':<50} {'calls':>6} {'wall_s':>9} {'cpu_s':>9} {'rows_in':>11} {'rows_out':>11} "
+            f"{'peak_mem_mb':>11}"
+        ]
+        for operation_name, metrics in profile["operations"].items():
+            lines.append(
+                f"{operation_name:<50} {metrics['calls']:>6} {metrics['wall_seconds']:>9.4f} "
+                f"{metrics['cpu_seconds']:>9.4f} {metrics['input_rows']:>11} {metrics['output_rows']:>11} "
+                f"{metrics['peak_memory_delta_bytes'] / 1024 ** 2:>11.1f}"
+            )
+        if profile["peak_rss_bytes"] is not None:
+            lines.append(f"Process peak resident set size: {profile['peak_rss_bytes'] / 1024 ** 2:.1f} MB")
+        return "\n".join(lines)
+
+
+# Metrics registry of the instrumented operations, disabled by default
+metrics_registry = MetricsRegistry()
+# Highest traced memory of every running instrumented call of a thread before its nested calls reset the peak
+traced_peaks = threading.local()
+
+
+def get_peak_rss_bytes() -> int:
+    """
+    Gets the lifetime peak resident set size of the current process
+    :return: Peak resident set size in bytes, None without the resource module, e.g. on Windows
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def count_rows(result) -> int:
+    """
+    Counts the rows of an operation result
+    :param result: Operation result
+    :return: Number of rows of a data frame, series or array result, None for the other results
+    """
+    return len(result) if hasattr(result, "shape") and hasattr(result, "__len__") else None
+
+
+def count_table_rows(*table_names) -> Callable[[dict], int]:
+    """
+    Gets a function counting the input rows of a MoviesDataSet method from the loaded tables it depends on
+    :param table_names: Names of the tables the method depends on
+    :return: Function counting the rows of the loaded tables from the bound method arguments
+    """
+    def table_rows(arguments: dict) -> int:
+        tables = arguments["self"]._tables
+        return sum(len(tables[table_name]) for table_name in table_names if table_name in tables)
+
+    return table_rows
+
+
+def instrumented(input_rows: Callable[[dict], int] = None, name: str = None):
+    """
+    Decorator recording the wall time, CPU time, input and output row counts and peak memory growth of a function
+    call in the metrics registry. The peak memory growth is the peak of the memory traced by tracemalloc during
+    the call above the traced memory at its start, so it is measured for every call and not only for the calls
+    setting a new process peak. With concurrent instrumented calls it includes the allocations of the other threads.
+    When the registry is disabled the function is called directly, so the overhead is a single attribute check.
+    :param input_rows: Function counting the input rows from the bound function arguments, None if not counted
+    :param name: Operation name, the function qualified name by default
+    :return: Decorated function
+    """
+    def decorator(function):
+        operation_name = name if name else function.__qualname__
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics_registry.enabled:
+                return function(*args, **kwargs)
+
+            if not hasattr(traced_peaks, "stack"):
+                traced_peaks.stack = []
+            call_peaks = traced_peaks.stack
+            tracing = tracemalloc.is_tracing()
+            start_memory = 0
+            if tracing:
+                # The peak of the calling instrumented call is kept before the peak is reset for this call
+                if call_peaks:
+                    call_peaks[-1] = max(call_peaks[-1], tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+                start_memory = tracemalloc.get_traced_memory()[0]
+            call_peaks.append(start_memory)
+            start_cpu_time = time.thread_time()
+            start_time = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                wall_seconds = time.perf_counter() - start_time
+                cpu_seconds = time.thread_time() - start_cpu_time
+                peak_memory = max(call_peaks.pop(), tracemalloc.get_traced_memory()[1] if tracing else 0)
+                if call_peaks:
+                    call_peaks[-1] = max(call_peaks[-1], peak_memory)
+
+            # The input rows are counted after the call, as the lazily loaded tables are read by the call
+            rows_in = None
+            if input_rows is not None:
+                try:
+                    rows_in = input_rows(signature.bind(*args, **kwargs).arguments)
+                except Exception:
+                    rows_in = None
+            metrics_registry.record(
+                operation_name,
+                wall_seconds=wall_seconds,
+                cpu_seconds=cpu_seconds,
+                input_rows=rows_in,
+                output_rows=count_rows(result),
+                peak_memory_delta_bytes=peak_memory - start_memory
+            )
+            return result
+
+        return wrapper
+
+    return decorator
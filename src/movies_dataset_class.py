@@ -1,12 +1,93 @@
+import functools
+import numpy as np
 import pandas as pd
-from pandasql import sqldf
+from concurrent.futures import ThreadPoolExecutor
+from query_backends import (
+    REPORTS,
+    RELEASE_PERIODS,
+    get_query_backend
+)
+from sqlite_store import SqliteStore
+from genre_index import GenreIndex
+from id_mapping import IdMapping
+from primary_key_index import (
+    PrimaryKeyIndex,
+    drop_duplicate_keys
+)
+from user_ratings import UserRatingsMatrix
+from ratings_sample import RatingsSample
+from rating_trends import (
+    TIME_BUCKETS,
+    SECONDS_PER_DAY,
+    RatingTimeline
+)
+from snapshot import (
+    save_snapshot,
+    load_snapshot
+)
+from ratings_aggregation import (
+    RatingsAggregate,
+    select_top_n,
+    summarize_movie_ratings
+)
+from instrumentation import (
+    count_rows,
+    instrumented,
+    metrics_registry,
+    count_table_rows
+)
+from result_cache import (
+    ResultCache,
+    DiskResultCache,
+    cached_query
+)
 from utils import (
     logger,
-    read_csv,
-    save_to_json,
+    apply_schema,
+    read_csv_files,
+    read_csv_chunks,
+    resolve_file_paths,
+    save_to_file,
+    get_export_file_path,
+    get_memory_usage_report,
     ConfigParser
 )
 
+# Reports with an error column in approximate mode and their query methods
+APPROXIMATE_REPORTS = {
+    "unique_movies": "get_unique_movies",
+    "average_movies_rating": "get_average_movie_rating",
+    "top_5_rated_movies": "get_top_5_highest_rated_movies",
+    "movies_by_genre": "get_movies_count_by_genre"
+}
+
+
+def requires_columns(**table_columns):
+    """
+    Decorator declaring the tables and columns a MoviesDataSet query method uses. The tables accessed by the method
+    are read with only the declared columns and, when the tables release is enabled, the tables read by the outermost
+    query method are released after it returns.
+    :param table_columns: Table names and lists with their columns used by the method
+    :return: Decorated method
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            outermost_query = not self._column_scopes
+            loaded_tables = set(self._tables)
+            self._column_scopes.append(table_columns)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._column_scopes.pop()
+                if outermost_query and self.release_tables_after_query:
+                    self.release_tables([table_name for table_name in self._tables if table_name not in loaded_tables])
+
+        wrapper.table_columns = table_columns
+        return wrapper
+
+    return decorator
+
 
 class MoviesDataSet:
     """
@@ -23,202 +104,1315 @@ class MoviesDataSet:
         Pandas data frame with movie ratings
     genres_df : pr.DataFrame
         Pandas data frame with movie genres
+    links_df : pr.DataFrame
+        Pandas data frame with the MovieLens and TMDB ids of the movies, None when no links file is configured
+    backend : QueryBackend
+        query backend running the movies dataset queries ('pandas', 'sql' or 'sqlite')
+    source_files : dict
+        dictionary with the table names and their CSV file paths
+    store : SqliteStore
+        persistent SQLite store of the tables used by the 'sqlite' backend, None for the other backends
+    result_cache : ResultCache
+        LRU cache of the query results, invalidated when the tables they depend on are replaced
+    disk_cache : DiskResultCache
+        on-disk cache of the query results keyed by the source files fingerprints, None when disabled
+    modified_tables : set
+        names of the tables replaced after loading, their results are not read from or written to the disk cache
+    ratings_chunksize : int
+        number of ratings read at once in streaming mode, None to aggregate the ratings loaded in memory
+    ratings_workers : int
+        number of processes aggregating the ratings CSV shards in parallel, None to aggregate them serially
+    dropped_rows : dict
+        dictionary with the table names and the rows dropped at load for a duplicated primary key
+    approximate : bool
+        if true, the average ratings are estimated from a sample of the ratings blocks with their standard errors
 
     Methods
     -------
+    clear_derived_state():
+        Clears the cached results and the indexes and aggregates built from the tables
+    save_snapshot(path):
+        Saves the dataset tables to a memory-mappable binary snapshot
+    from_snapshot(path, test, backend, mmap):
+        Creates a MoviesDataSet object from the tables of a binary snapshot
+    append_ratings(ratings):
+        Appends new ratings and updates the per-movie rating aggregates incrementally
+    get_ratings_aggregate():
+        Gets the per-movie rating sums, counts, minimums and maximums
+    get_id_mapping():
+        Gets the index translating the MovieLens ids of the ratings to the TMDB ids of the movies metadata
+    get_movies_index():
+        Gets the primary key index of the movies
+    get_foreign_key_positions(table_name):
+        Gets the positions in the movies index of the movies of the ratings or genres rows
+    get_dropped_rows_report():
+        Gets the number of rows dropped at load for every duplicated primary key
+    get_ratings_sample():
+        Gets the sample of the ratings blocks, the approximate mode source of the average ratings
+    get_user_ratings_matrix():
+        Gets the sparse user x movie ratings matrix
+    get_user_rating_stats():
+        Gets the number of ratings and the average, minimal and maximal rating of every user
+    get_similar_movies(movie_id, k, min_ratings):
+        Gets the k movies most similar to a movie by the cosine similarity of their ratings
+    get_movie_neighbours(k, min_ratings):
+        Gets the k most similar movies of every rated movie
+    get_rating_timeline():
+        Gets the ratings ordered by time with their day numbers
+    get_rating_trends(by, movie_id, per_movie):
+        Gets the number of ratings and the average rating of every day, week or month
+    get_rolling_rating_trends(by, window, movie_id):
+        Gets the number of ratings and the average rating of rolling windows of days, weeks or months
+    get_trending_movies(n, days, end, min_ratings):
+        Gets the n movies with the most ratings in the days before a date
+    get_movie_ratings_summary():
+        Gets the number of ratings, the average, minimal and maximal rating and the release year of the rated movies
+    get_top_n_rated_movies(n, min_ratings, genre, year_range):
+        Gets the n highest rated movies matching the filters
+    get_genre_index():
+        Gets the genre index of the movies
+    get_movies_by_genres(genres, match):
+        Gets the movies with any or all of the genres
+    get_genre_cooccurrence():
+        Gets the number of movies of every pair of genres
+    get_average_rating_by_genre():
+        Gets the number of ratings and the average rating of every genre
     get_unique_movies():
         Gets the number of unique movies in movies dataframe from the class attribute
     get_average_movie_rating():
         Gets the average rating of all movies
     get_top_5_highest_rated_movies():
         Gets the top 5 highest rated movies
+    get_movies_released(by):
+        Gets the number of movies released in every year, month or decade
     get_movies_released_each_year():
         Gets the number of movies released each year
     get_movies_count_by_genre():
         Gets the number of movies for each genre
+    run_reports(report_names):
+        Gets the results of several reports, sharing the deduplicated movies and the table joins
+    get_memory_usage_report():
+        Gets the memory saved by loading the movies dataset tables with the configured schema
     save_to_json_movies_dataset():
-        Saves all MoviesDataSet data frames to JSON files
+        Saves all MoviesDataSet data frames to JSON files or the configured export file formats
     """
 
     def __init__(self,
                  movies_file_path: str = None,
                  ratings_file_path: str = None,
                  genres_file_path: str = None,
-                 test: bool = False
+                 test: bool = False,
+                 backend: str = None,
+                 disk_cache_dir: str = None,
+                 ratings_chunksize: int = None,
+                 ratings_workers: int = None,
+                 lazy_loading: bool = None,
+                 links_file_path: str = None,
+                 approximate: bool = None
                  ):
         # Set config attribute for the file paths configuration
         env = "test" if test else "main"
         self.config = ConfigParser(env=env)
+        if self.config.instrumentation_enabled:
+            metrics_registry.enable()
+        # Set the query backend used by the query methods
+        self.backend = get_query_backend(backend if backend else self.config.query_backend)
+
+        self.source_files = {
+            "movies": movies_file_path if movies_file_path else self.config.movies_metadata_csv,
+            "ratings": ratings_file_path if ratings_file_path else self.config.ratings_csv,
+            "genres": genres_file_path if genres_file_path else self.config.genres_csv
+        }
+        # The links table translating the MovieLens ids of the ratings to the TMDB ids of the movies is optional
+        links_file_path = links_file_path if links_file_path else self.config.links_csv
+        if links_file_path:
+            self.source_files["links"] = links_file_path
+        self._tables = {}
+        # Loaded columns of the tables read with only the columns required by the query methods
+        self._table_columns = {}
+        # Columns required by the running query methods, see requires_columns
+        self._column_scopes = []
+        # Tables replaced by the setters, they cannot be read again from their CSV files
+        self._replaced_tables = set()
+        self.lazy_loading = self.config.lazy_loading if lazy_loading is None else lazy_loading
+        self.release_tables_after_query = self.config.release_tables_after_query
+        self.modified_tables = set()
+        self.store = None
+        self.result_cache = ResultCache(max_entries=self.config.result_cache_max_entries)
+        self.ratings_chunksize = ratings_chunksize if ratings_chunksize else self.config.ratings_chunksize
+        self.ratings_workers = ratings_workers if ratings_workers else self.config.ratings_workers
+        self.approximate = self.config.approximate_enabled if approximate is None else approximate
+        self._ratings_aggregate = None
+        self._ratings_sample = None
+        self._movie_ratings_summary = None
+        self._genre_index = None
+        self._id_mapping = None
+        self._user_ratings_matrix = None
+        self._rating_timeline = None
+        self._movies_index = None
+        # Positions in the movies index of the movies of the ratings and genres rows
+        self._foreign_key_positions = {}
+        self.dropped_rows = {}
+        # Appended ratings not yet concatenated to the loaded ratings table
+        self._pending_ratings = []
+        # All ratings appended to the ratings CSV files, concatenated whenever the ratings table is read
+        # from the CSV files and aggregated with them when the ratings are streamed
+        self._appended_ratings = []
+        self.disk_cache = None
+        if disk_cache_dir or self.config.disk_cache_enabled:
+            self.disk_cache = DiskResultCache(
+                disk_cache_dir if disk_cache_dir else self.config.disk_cache_dir,
+                max_bytes=self.config.disk_cache_max_bytes,
+                max_age_seconds=self.config.disk_cache_max_age_seconds,
+                verify_hash=self.config.verify_hash
+            )
+
+        if self.backend.name == "sqlite":
+            # Ingest only the CSV files changed since the last run, the tables are read from the store on access
+            self.store = SqliteStore(
+                self.config.movies_dataset_db, verify_hash=self.config.verify_hash, schema=self.config.schema
+            )
+            self.store.sync(self.source_files)
+        elif self.disk_cache is None and not self.lazy_loading:
+            # Load the movies, ratings and genres dataframes from the CSV files.
+            # With lazy loading or the disk cache the files are loaded on first access, only with the columns
+            # required by the query methods, and in streaming or parallel mode the ratings files are read
+            # when aggregated.
+            for table_name in self.source_files:
+                if table_name == "ratings" and (self.ratings_chunksize or self.ratings_workers):
+                    continue
+                self._get_table(table_name)
+
+    @property
+    def movies_df(self) -> pd.DataFrame:
+        return self._get_table("movies")
+
+    @movies_df.setter
+    def movies_df(self, df: pd.DataFrame) -> None:
+        self._set_table("movies", df)
+
+    @property
+    def ratings_df(self) -> pd.DataFrame:
+        return self._get_table("ratings")
+
+    @ratings_df.setter
+    def ratings_df(self, df: pd.DataFrame) -> None:
+        self._set_table("ratings", df)
+
+    @property
+    def genres_df(self) -> pd.DataFrame:
+        return self._get_table("genres")
+
+    @genres_df.setter
+    def genres_df(self, df: pd.DataFrame) -> None:
+        self._set_table("genres", df)
+
+    @property
+    def links_df(self) -> pd.DataFrame:
+        return self._get_table("links") if "links" in self.source_files or "links" in self._tables else None
+
+    def _get_table(self, table_name: str, columns: list = None) -> pd.DataFrame:
+        """
+        Gets a dataset table, reading it on first access from the persistent store in store mode
+        or from its CSV file otherwise. Inside a query method only the columns it requires are read,
+        see requires_columns, and the table is read again with all the columns when they are needed later.
+        :param table_name: Table name - 'movies', 'ratings' or 'genres'
+        :param columns: List with the required columns, the columns required by the running query method
+        or all columns by default
+        :return: Pandas data frame with the table data
+        """
+        if columns is None:
+            columns = self._get_required_columns(table_name)
+        if not self._is_loaded(table_name, columns):
+            loaded_columns = self._table_columns.get(table_name)
+            if columns is not None and loaded_columns is not None and table_name in self._tables:
+                # The table is read again with the already loaded and the newly required columns
+                columns = sorted(set(columns) | loaded_columns)
+            self._tables[table_name] = self._drop_duplicate_keys(table_name, self._read_table(table_name, columns))
+            self._table_columns[table_name] = set(self._tables[table_name].columns) if columns else None
+            if table_name == "ratings":
+                self._pending_ratings = []
+        if table_name == "ratings" and self._pending_ratings:
+            ratings_df = self._tables[table_name]
+            self._tables[table_name] = pd.concat(
+                [ratings_df, *[df[df.columns.intersection(ratings_df.columns)] for df in self._pending_ratings]],
+                ignore_index=True
+            )
+            self._pending_ratings = []
+        return self._tables[table_name]
+
+    def _read_table(self, table_name: str, columns: list = None) -> pd.DataFrame:
+        """
+        Reads a dataset table from the persistent store in store mode or from its CSV files otherwise.
+        The id columns of the table schema are always read, so the rows with malformed ids are dropped
+        the same way for every set of columns.
+        :param table_name: Table name - 'movies', 'ratings' or 'genres'
+        :param columns: List with the columns to be read, all columns by default
+        :return: Pandas data frame with the table data
+        """
+        schema = self.config.schema.get(table_name, {})
+        if columns is not None:
+            required_columns = set(columns) | set(schema.get("ids", {}))
+            schema_columns = schema.get("usecols", sorted(required_columns))
+            columns = [column for column in schema_columns if column in required_columns]
+
+        if self.store is not None:
+            return self.store.read_table(table_name, columns)
+
+        df = read_csv_files(self.source_files[table_name], schema=dict(schema, usecols=columns) if columns else schema)
+        if table_name == "ratings" and self._appended_ratings:
+            appended_ratings = [
+                ratings_df[ratings_df.columns.intersection(df.columns)] for ratings_df in self._appended_ratings
+            ]
+            df = pd.concat([df, *appended_ratings], ignore_index=True)
+        return df
+
+    def _drop_duplicate_keys(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drops the rows of a table with a duplicated primary key by the keep policy of the table schema
+        and records the dropped rows, see get_dropped_rows_report
+        :param table_name: Table name - 'movies', 'ratings' or 'genres'
+        :param df: Pandas data frame with the table data
+        :return: Pandas data frame without the duplicated primary keys
+        """
+        primary_key = self.config.schema.get(table_name, {}).get("primary_key")
+        if not primary_key or primary_key["column"] not in df:
+            return df
+
+        df, dropped_df = drop_duplicate_keys(df, primary_key["column"], keep=primary_key.get("keep", "first"))
+        self.dropped_rows[table_name] = dropped_df
+        if len(dropped_df):
+            logger.warning(
+                f"Dropped {len(dropped_df)} rows of the {table_name} table with a duplicated {primary_key['column']}, "
+                f"keeping the {primary_key.get('keep', 'first')} row of every {primary_key['column']}."
+            )
+        return df
+
+    def _is_loaded(self, table_name: str, columns: list = None) -> bool:
+        """
+        Checks if a table is loaded with the required columns
+        :param table_name: Table name - 'movies', 'ratings' or 'genres'
+        :param columns: List with the required columns, None for all columns
+        :return: True if the table is loaded with all the required columns
+        """
+        if table_name not in self._tables:
+            return False
+        loaded_columns = self._table_columns.get(table_name)
+        return loaded_columns is None or (columns is not None and loaded_columns.issuperset(columns))
+
+    def _get_required_columns(self, table_name: str):
+        """
+        Gets the columns of a table required by the innermost running query method which uses the table
+        :param table_name: Table name - 'movies', 'ratings' or 'genres'
+        :return: List with the required columns or None if all columns are required
+        """
+        for table_columns in reversed(self._column_scopes):
+            if table_name in table_columns:
+                return table_columns[table_name]
+        return None
+
+    def release_tables(self, table_names: list = None) -> list:
+        """
+        Releases the memory of loaded tables, which are read again on next access.
+        The tables replaced by the setters are kept unless they are in the persistent store.
+        :param table_names: List with the names of the tables to be released, all tables by default
+        :return: List with the names of the released tables
+        """
+        released_tables = []
+        for table_name in table_names if table_names else list(self._tables):
+            if table_name not in self._tables or (self.store is None and table_name in self._replaced_tables):
+                continue
+            del self._tables[table_name]
+            self._table_columns.pop(table_name, None)
+            released_tables.append(table_name)
+
+        if released_tables:
+            logger.info(f"Released the {', '.join(released_tables)} tables.")
+        return released_tables
+
+    def clear_derived_state(self) -> None:
+        """
+        Clears the cached results and the indexes and aggregates built from the tables, so the next queries
+        build them again from the loaded tables, e.g. to time the queries without the work of earlier queries.
+        The appended ratings are kept.
+        """
+        self.result_cache.clear()
+        self._ratings_aggregate = None
+        self._ratings_sample = None
+        self._movie_ratings_summary = None
+        self._genre_index = None
+        self._id_mapping = None
+        self._user_ratings_matrix = None
+        self._rating_timeline = None
+        self._movies_index = None
+        self._foreign_key_positions = {}
+
+    def save_snapshot(self, path: str) -> str:
+        """
+        Saves the typed dataset tables, with all their columns, to a binary snapshot directory with a NumPy .npy file
+        per column, see from_snapshot
+        :param path: Snapshot directory path, an existing snapshot is replaced
+        :return: Snapshot directory path
+        """
+        method_name = self.save_snapshot.__name__
+        try:
+            logger.info(f"Calling {self.__class__.__name__} method {method_name} with path {path}.")
+            save_snapshot({table_name: self._get_table(table_name) for table_name in self.source_files}, path)
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully. Snapshot saved to: {path}")
+        return path
+
+    @classmethod
+    def from_snapshot(cls, path: str, test: bool = False, backend: str = None, mmap: bool = True):
+        """
+        Creates a MoviesDataSet object from the tables of a snapshot saved by save_snapshot instead of parsing
+        the CSV files. The numeric, datetime and category columns are memory-mapped read-only, so the processes
+        opening the same snapshot share its pages. The snapshot tables are kept like the tables replaced by the
+        setters - they are not released and their results are not read from or written to the disk cache.
+        :param path: Snapshot directory path
+        :param test: If true, the test configuration is used
+        :param backend: Query backend name - 'pandas' or 'sql', the 'sqlite' backend reads the tables from its store
+        :param mmap: If true, the columns are memory-mapped, otherwise they are read to memory
+        :return: MoviesDataSet object
+        """
+        method_name = cls.from_snapshot.__name__
+        try:
+            logger.info(f"Calling {cls.__name__} method {method_name} with path {path}.")
+            config = ConfigParser(env="test" if test else "main")
+            if (backend if backend else config.query_backend) == "sqlite":
+                raise ValueError("The sqlite backend reads the tables from its store and cannot use a snapshot.")
+
+            movies_dataset_object = cls(test=test, backend=backend, lazy_loading=True)
+            for table_name, df in load_snapshot(path, mmap=mmap).items():
+                movies_dataset_object._set_table(table_name, df)
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return movies_dataset_object
+
+    def _set_table(self, table_name: str, df: pd.DataFrame) -> None:
+        """
+        Replaces a dataset table, writing it to the persistent store in store mode
+        :param table_name: Table name - 'movies', 'ratings' or 'genres'
+        :param df: Pandas data frame with the new table data
+        """
+        df = self._drop_duplicate_keys(table_name, df)
+        if self.store is not None:
+            self.store.write_table(table_name, df)
+        self._tables[table_name] = df
+        self._table_columns[table_name] = None
+        self._replaced_tables.add(table_name)
+        self.modified_tables.add(table_name)
+        self.result_cache.invalidate(table_name)
+        if table_name in ("ratings", "links"):
+            self._user_ratings_matrix = None
+            self._rating_timeline = None
+            self._foreign_key_positions.pop("ratings", None)
+        if table_name == "movies":
+            self._movies_index = None
+            self._foreign_key_positions = {}
+        if table_name == "genres":
+            self._foreign_key_positions.pop("genres", None)
+        if table_name == "ratings":
+            self._ratings_aggregate = None
+            self._ratings_sample = None
+            self._pending_ratings = []
+            self._appended_ratings = []
+        if table_name in ("movies", "ratings"):
+            self._movie_ratings_summary = None
+        if table_name in ("movies", "genres"):
+            self._genre_index = None
+        if table_name == "links":
+            # The rating aggregates are keyed by the translated movie ids
+            self._id_mapping = None
+            self._ratings_aggregate = None
+            self._ratings_sample = None
+            self._movie_ratings_summary = None
+            self.result_cache.invalidate("ratings")
+
+    @instrumented(input_rows=lambda arguments: count_rows(arguments["ratings"]))
+    def append_ratings(self, ratings) -> None:
+        """
+        Appends new ratings and updates the per-movie rating aggregates and the rated movies summary
+        in place, so the cost depends on the number of new ratings and not on the size of the ratings table.
+        The query results depending on the ratings are consistent with a full recomputation.
+        :param ratings: Pandas data frame with the new ratings or their CSV file path, glob pattern or list of them
+        """
+        method_name = self.append_ratings.__name__
+        try:
+            logger.info(f"Calling {self.__class__.__name__} method {method_name}.")
+            ratings_schema = self.config.schema.get("ratings", {})
+            if isinstance(ratings, pd.DataFrame):
+                usecols = ratings_schema.get("usecols")
+                new_ratings_df = ratings[[column for column in usecols if column in ratings]] if usecols else ratings
+                new_ratings_df = apply_schema(new_ratings_df.copy(), ratings_schema)
+            else:
+                new_ratings_df = read_csv_files(ratings, schema=ratings_schema)
+
+            # The aggregate of the existing ratings is built before the new ratings are added
+            ratings_aggregate = self.get_ratings_aggregate()
+            movie_ratings_summary = self._get_movie_ratings_summary()
+            movie_ids = new_ratings_df["movieId"].to_numpy()
+            ratings = new_ratings_df["rating"].to_numpy()
+            id_mapping = self.get_id_mapping()
+            if id_mapping is not None:
+                # The ratings of the MovieLens ids without a TMDB id have no movie, the same as by the inner join
+                movie_ids = id_mapping.map_ids(movie_ids)
+                movie_ids, ratings = movie_ids[movie_ids >= 0], ratings[movie_ids >= 0]
+            ratings_aggregate.update(movie_ids, ratings)
+            if self._ratings_sample is not None:
+                # The sample is mergeable, so the new ratings are added as one more fully read stratum
+                self._ratings_sample.merge(
+                    RatingsSample.from_frame(pd.DataFrame({"movieId": movie_ids, "rating": ratings}), fraction=1.0)
+                )
+
+            if self.store is not None:
+                self.store.append_rows("ratings", new_ratings_df)
+            # The streamed aggregates are rebuilt from the ratings CSV files and the appended ratings
+            self._appended_ratings.append(new_ratings_df)
+            # The ratings table is read with the appended rows when it is not loaded yet
+            if "ratings" in self._tables:
+                self._pending_ratings.append(new_ratings_df)
+            self.modified_tables.add("ratings")
+            self.result_cache.invalidate("ratings")
+            # The ratings matrix and timeline are rebuilt on access, the new ratings can add users and movies
+            self._user_ratings_matrix = None
+            self._rating_timeline = None
+            self._foreign_key_positions.pop("ratings", None)
+
+            self._movie_ratings_summary = self._update_movie_ratings_summary(
+                movie_ratings_summary, pd.Series(movie_ids)
+            )
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully with {len(new_ratings_df)} new ratings.")
+
+    def _update_movie_ratings_summary(self, movie_ratings_summary: pd.DataFrame,
+                                      movie_ids: pd.Series) -> pd.DataFrame:
+        """
+        Updates the rows of the rated movies summary of movies with new ratings from the ratings aggregate.
+        The summary is rebuilt only when a movie of the movies metadata is rated for the first time.
+        :param movie_ratings_summary: Pandas data frame with the rated movies summary, see get_movie_ratings_summary
+        :param movie_ids: Pandas series with the movie ids of the new ratings
+        :return: Pandas data frame with the updated rated movies summary
+        """
+        movie_ids = np.unique(pd.to_numeric(movie_ids, errors="coerce").dropna().to_numpy(dtype="int64"))
+        summary_movie_ids = movie_ratings_summary["id"].to_numpy()
+        positions = np.searchsorted(summary_movie_ids, movie_ids)
+        summarized = positions < len(summary_movie_ids)
+        summarized[summarized] = summary_movie_ids[positions[summarized]] == movie_ids[summarized]
+        known_movie_ids = pd.to_numeric(self.movies_df["id"], errors="coerce")
+        if np.isin(movie_ids[~summarized], known_movie_ids).any():
+            return summarize_movie_ratings(self._ratings_aggregate, self.movies_df)
+
+        positions = positions[summarized]
+        average_ratings = self._ratings_aggregate.get_average_ratings(movie_ids[summarized])
+        for column in ["rating_count", "average_rating", "min_rating", "max_rating"]:
+            movie_ratings_summary.iloc[positions, movie_ratings_summary.columns.get_loc(column)] = (
+                average_ratings[column].to_numpy()
+            )
+        return movie_ratings_summary
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @requires_columns(ratings=["movieId", "rating"])
+    def get_ratings_aggregate(self) -> RatingsAggregate:
+        """
+        Gets the per-movie rating sums, counts, minimums and maximums. In streaming or parallel mode
+        the ratings CSV files are aggregated without loading the ratings table - in chunks and by a process pool
+        when the ratings are split in shards. Otherwise the loaded ratings table is aggregated.
+        With a links table the aggregates are keyed by the TMDB ids of the movies metadata, see get_id_mapping.
+        :return: RatingsAggregate object
+        """
+        if self._ratings_aggregate is None:
+            if (self.ratings_chunksize or self.ratings_workers) and "ratings" not in self._tables:
+                ratings_aggregate = RatingsAggregate.from_csv_files(
+                    self.source_files["ratings"],
+                    chunksize=self.ratings_chunksize,
+                    schema=self.config.schema.get("ratings"),
+                    workers=self.ratings_workers
+                )
+                # The appended ratings are not in the CSV files, they are aggregated on every rebuild
+                for appended_ratings_df in self._appended_ratings:
+                    ratings_aggregate.update(
+                        appended_ratings_df["movieId"].to_numpy(), appended_ratings_df["rating"].to_numpy()
+                    )
+            else:
+                ratings_aggregate = RatingsAggregate.from_frame(self.ratings_df)
+
+            id_mapping = self.get_id_mapping()
+            if id_mapping is not None:
+                # The per-movie aggregates are translated once instead of joining the ratings with the links
+                ratings_aggregate = ratings_aggregate.map_movie_ids(id_mapping)
+            self._ratings_aggregate = ratings_aggregate
+
+        return self._ratings_aggregate
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @requires_columns(ratings=["movieId", "rating"])
+    def get_ratings_sample(self) -> RatingsSample:
+        """
+        Gets the sample of a sample_fraction of the ratings blocks, the approximate mode source of the average ratings.
+        Without a persistent store and with the ratings table not loaded, only the sampled byte blocks of every
+        ratings CSV shard are read and parsed, the shards are sampled in parallel with ratings_workers processes
+        and the appended ratings are added as fully read strata. Otherwise the row blocks of the loaded ratings table
+        are sampled. With a links table the sample is keyed by the TMDB ids of the movies metadata, see get_id_mapping.
+        :return: RatingsSample object
+        """
+        if self._ratings_sample is None:
+            if self.store is None and "ratings" not in self._tables:
+                ratings_sample = RatingsSample.from_csv_files(
+                    self.source_files["ratings"],
+                    fraction=self.config.sample_fraction,
+                    block_bytes=self.config.sample_block_bytes,
+                    seed=self.config.sampling_seed,
+                    schema=self.config.schema.get("ratings"),
+                    workers=self.ratings_workers
+                )
+                # The appended ratings are not in the CSV files, they are read in full on every rebuild
+                for appended_ratings_df in self._appended_ratings:
+                    ratings_sample.merge(RatingsSample.from_frame(appended_ratings_df, fraction=1.0))
+            else:
+                ratings_sample = RatingsSample.from_frame(
+                    self.ratings_df, fraction=self.config.sample_fraction, seed=self.config.sampling_seed
+                )
+
+            id_mapping = self.get_id_mapping()
+            if id_mapping is not None:
+                ratings_sample = ratings_sample.map_movie_ids(id_mapping)
+            self._ratings_sample = ratings_sample
+            logger.info(
+                f"Sampled {int(self._ratings_sample.strata_sampled_count.sum())} of "
+                f"{int(self._ratings_sample.strata_blocks_count.sum())} ratings blocks "
+                f"with {int(self._ratings_sample.rating_counts.sum())} ratings."
+            )
+
+        return self._ratings_sample
+
+    @requires_columns(links=["movieId", "tmdbId"])
+    def get_id_mapping(self) -> IdMapping:
+        """
+        Gets the index translating the MovieLens ids of the ratings to the TMDB ids of the movies metadata,
+        built once from the links table
+        :return: IdMapping object, None without a links table, when the rating ids are the movie ids
+        """
+        if self._id_mapping is None and self.links_df is not None:
+            self._id_mapping = IdMapping.from_frame(self.links_df)
+            logger.info(f"Built the id mapping of {int((self._id_mapping.target_ids >= 0).sum())} MovieLens ids.")
+        return self._id_mapping
+
+    @requires_columns(movies=["id"])
+    def get_movies_index(self) -> PrimaryKeyIndex:
+        """
+        Gets the primary key index of the movies, built once from the movies table.
+        The number of distinct movies is the length of the index.
+        :return: PrimaryKeyIndex object
+        """
+        if self._movies_index is None:
+            self._movies_index = PrimaryKeyIndex.from_frame(self.movies_df, "id")
+            logger.info(f"Built the primary key index of {len(self._movies_index)} movies.")
+        return self._movies_index
+
+    @requires_columns(movies=["id"], ratings=["movieId"], genres=["id"])
+    def get_foreign_key_positions(self, table_name: str) -> np.ndarray:
+        """
+        Gets the positions in the movies index of the movies of the ratings or genres rows, built once per table,
+        so the tables are joined with the movies by position. With a links table the MovieLens ids of the ratings
+        are translated to the TMDB ids of the movies first.
+        :param table_name: Table name - 'ratings' or 'genres'
+        :return: NumPy array with the int32 key position of every row, -1 for the rows without a movie
+        """
+        if table_name not in ("ratings", "genres"):
+            raise ValueError(f"Unknown foreign key table '{table_name}'. Available tables: ratings, genres")
+        if table_name not in self._foreign_key_positions:
+            if table_name == "ratings":
+                movie_ids = self.ratings_df["movieId"].to_numpy()
+                id_mapping = self.get_id_mapping()
+                if id_mapping is not None:
+                    movie_ids = np.where(id_mapping.map_ids(movie_ids) >= 0, id_mapping.map_ids(movie_ids), np.nan)
+            else:
+                movie_ids = self.genres_df["id"].to_numpy()
+            self._foreign_key_positions[table_name] = (
+                self.get_movies_index().get_key_positions(movie_ids).astype("int32")
+            )
+        return self._foreign_key_positions[table_name]
+
+    def _get_movie_titles(self, movie_ids) -> np.ndarray:
+        """
+        Gets the titles of movies by their row positions in the movies index
+        :param movie_ids: NumPy array or Pandas series with the movie ids
+        :return: NumPy array with the movie titles, NaN for the unknown movies
+        """
+        row_positions = self.get_movies_index().get_row_positions(movie_ids)
+        titles = np.full(len(row_positions), np.nan, dtype=object)
+        known_movies = row_positions >= 0
+        titles[known_movies] = self.movies_df["original_title"].to_numpy(dtype=object)[row_positions[known_movies]]
+        return titles
+
+    def get_dropped_rows_report(self) -> pd.DataFrame:
+        """
+        Gets the number of rows dropped at load for every duplicated primary key, by the keep policy
+        of the 'primary_key' of the table schema
+        :return: Pandas data frame with 'table', 'key' and 'dropped_rows' columns ordered by table and key
+        """
+        reports = []
+        for table_name, dropped_df in sorted(self.dropped_rows.items()):
+            key_column = self.config.schema[table_name]["primary_key"]["column"]
+            dropped_counts = dropped_df[key_column].value_counts(sort=False).sort_index()
+            reports.append(
+                pd.DataFrame(
+                    {
+                        "table": table_name,
+                        "key": dropped_counts.index.to_numpy(dtype=object),
+                        "dropped_rows": dropped_counts.to_numpy(dtype="int64")
+                    }
+                )
+            )
+        if not reports:
+            return pd.DataFrame({"table": [], "key": [], "dropped_rows": []}).astype({"dropped_rows": "int64"})
+        return pd.concat(reports, ignore_index=True)
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @requires_columns(ratings=["userId", "movieId", "rating"])
+    def get_user_ratings_matrix(self) -> UserRatingsMatrix:
+        """
+        Gets the sparse user x movie ratings matrix, built once from the ratings table.
+        With a links table the columns are the TMDB ids of the movies metadata, see get_id_mapping.
+        :return: UserRatingsMatrix object
+        """
+        if self._user_ratings_matrix is None:
+            self._user_ratings_matrix = UserRatingsMatrix.from_frame(self.ratings_df, self.get_id_mapping())
+            logger.info(
+                f"Built the ratings matrix of {len(self._user_ratings_matrix.user_ids)} users, "
+                f"{len(self._user_ratings_matrix.movie_ids)} movies and {len(self._user_ratings_matrix.data)} ratings."
+            )
+        return self._user_ratings_matrix
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @cached_query("ratings", "links")
+    @requires_columns(ratings=["userId", "movieId", "rating"])
+    def get_user_rating_stats(self) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average, minimal and maximal rating of every user
+        from the ratings matrix
+        :return: Pandas data frame with 'userId', 'rating_count', 'average_rating', 'min_rating' and 'max_rating'
+        columns ordered by user id
+        """
+        return self.get_user_ratings_matrix().get_user_stats()
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings"))
+    @cached_query("movies", "ratings", "links")
+    @requires_columns(movies=["id", "original_title"], ratings=["userId", "movieId", "rating"])
+    def get_similar_movies(self, movie_id: int, k: int = 10, min_ratings: int = 1) -> pd.DataFrame:
+        """
+        Gets the k movies most similar to a movie by the cosine similarity of their user ratings,
+        computed within the configured similarity memory budget
+        :param movie_id: Movie id
+        :param k: Number of similar movies
+        :param min_ratings: Minimal number of ratings of the similar movies
+        :return: Pandas data frame with 'id', 'title' and 'similarity' columns ordered by descending similarity
+        and id, empty for a movie without ratings
+        """
+        method_name = self.get_similar_movies.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with movie_id={movie_id}, k={k}, "
+                f"min_ratings={min_ratings}."
+            )
+            similar_movies = self.get_user_ratings_matrix().get_similar_movies(
+                movie_id, k=k, min_ratings=min_ratings,
+                memory_budget_bytes=self.config.similarity_memory_budget_bytes
+            )
+            df_query_result = pd.DataFrame(
+                {
+                    "id": similar_movies["movieId"].to_numpy(),
+                    "title": self._get_movie_titles(similar_movies["movieId"]),
+                    "similarity": similar_movies["similarity"].to_numpy()
+                }
+            )
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @cached_query("ratings", "links")
+    @requires_columns(ratings=["userId", "movieId", "rating"])
+    def get_movie_neighbours(self, k: int = 10, min_ratings: int = 1) -> pd.DataFrame:
+        """
+        Gets the k most similar movies of every movie with at least min_ratings ratings, computed in blocks
+        of movies within the configured similarity memory budget
+        :param k: Number of neighbours of every movie
+        :param min_ratings: Minimal number of ratings of the movies and their neighbours
+        :return: Pandas data frame with 'movieId', 'rank', 'neighbourId' and 'similarity' columns
+        ordered by movie id and rank
+        """
+        method_name = self.get_movie_neighbours.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with k={k}, min_ratings={min_ratings}."
+            )
+            df_query_result = self.get_user_ratings_matrix().get_top_k_neighbours(
+                k=k, min_ratings=min_ratings, memory_budget_bytes=self.config.similarity_memory_budget_bytes
+            )
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully with {len(df_query_result)} neighbours.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @requires_columns(ratings=["movieId", "rating", "timestamp"])
+    def get_rating_timeline(self) -> RatingTimeline:
+        """
+        Gets the ratings ordered by time with their timestamps converted to day numbers, built once from
+        the ratings table. With a links table the movie ids are the TMDB ids of the movies metadata.
+        :return: RatingTimeline object
+        """
+        if self._rating_timeline is None:
+            self._rating_timeline = RatingTimeline.from_frame(self.ratings_df, self.get_id_mapping())
+            logger.info(f"Built the rating timeline of {len(self._rating_timeline.days)} ratings.")
+        return self._rating_timeline
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @cached_query("ratings", "links")
+    @requires_columns(ratings=["movieId", "rating", "timestamp"])
+    def get_rating_trends(self, by: str = "month", movie_id: int = None, per_movie: bool = False) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average rating of every day, week or month with ratings,
+        of all movies, of one movie or of every movie
+        :param by: Time bucket - 'day', 'week' (starting on Monday) or 'month'
+        :param movie_id: Movie id to get the trend of, all movies by default
+        :param per_movie: If true, the ratings are grouped by movie and time bucket
+        :return: Pandas data frame with the 'period' start date, 'rating_count' and 'average_rating' columns,
+        and the 'movieId' column first when grouped by movie, ordered by movie and period
+        """
+        method_name = self.get_rating_trends.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with by={by}, movie_id={movie_id}, "
+                f"per_movie={per_movie}."
+            )
+            if by not in TIME_BUCKETS:
+                raise ValueError(f"Unknown time bucket '{by}'. Available buckets: {', '.join(TIME_BUCKETS)}")
+            df_query_result = self.get_rating_timeline().get_trends(by=by, movie_id=movie_id, per_movie=per_movie)
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("ratings"))
+    @cached_query("ratings", "links")
+    @requires_columns(ratings=["movieId", "rating", "timestamp"])
+    def get_rolling_rating_trends(self, by: str = "day", window: int = 7, movie_id: int = None) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average rating of rolling windows of days, weeks or months,
+        a window ending with every time bucket from the first to the last rating
+        :param by: Time bucket - 'day', 'week' (starting on Monday) or 'month'
+        :param window: Number of time buckets of every window
+        :param movie_id: Movie id to get the trend of, all movies by default
+        :return: Pandas data frame with the 'period' start date of the last time bucket of the window,
+        'rating_count' and 'average_rating' columns ordered by period
+        """
+        method_name = self.get_rolling_rating_trends.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with by={by}, window={window}, "
+                f"movie_id={movie_id}."
+            )
+            if by not in TIME_BUCKETS:
+                raise ValueError(f"Unknown time bucket '{by}'. Available buckets: {', '.join(TIME_BUCKETS)}")
+            if window < 1:
+                raise ValueError(f"The window must be at least one {by}, got {window}.")
+            df_query_result = self.get_rating_timeline().get_rolling_trends(by=by, window=window, movie_id=movie_id)
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings"))
+    @cached_query("movies", "ratings", "links")
+    @requires_columns(movies=["id", "original_title"], ratings=["movieId", "rating", "timestamp"])
+    def get_trending_movies(self, n: int = 10, days: int = 7, end: str = None, min_ratings: int = 1) -> pd.DataFrame:
+        """
+        Gets the n movies with the most ratings in the days up to a date, with their number of ratings
+        in the same number of days before
+        :param n: Number of movies
+        :param days: Number of days of the window
+        :param end: Last date of the window, e.g. '2017-08-04', the date of the latest rating by default
+        :param min_ratings: Minimal number of ratings of the movies in the window
+        :return: Pandas data frame with 'id', 'title', 'rating_count', 'average_rating' and 'previous_rating_count'
+        columns ordered by descending number of ratings and id
+        """
+        method_name = self.get_trending_movies.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with n={n}, days={days}, end={end}, "
+                f"min_ratings={min_ratings}."
+            )
+            if days < 1:
+                raise ValueError(f"The window must be at least one day, got {days}.")
+            rating_timeline = self.get_rating_timeline()
+            if end is not None:
+                last_day = pd.Timestamp(end).value // (SECONDS_PER_DAY * 10 ** 9)
+            else:
+                last_day = int(rating_timeline.days[-1]) if len(rating_timeline.days) else 0
+            trending_movies = rating_timeline.get_trending_movies(n, last_day - days + 1, last_day, min_ratings)
+            df_query_result = trending_movies.rename(columns={"movieId": "id"})
+            df_query_result.insert(1, "title", self._get_movie_titles(df_query_result["id"]))
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings"))
+    @requires_columns(movies=["id", "original_title", "release_date"], ratings=["movieId", "rating"])
+    def get_movie_ratings_summary(self) -> pd.DataFrame:
+        """
+        Gets the number of ratings, the average, minimal and maximal rating and the release year of the rated movies,
+        the precomputed per-movie aggregates the top rated movies are selected from
+        :return: Pandas data frame with 'id', 'title', 'release_year', 'rating_count', 'average_rating',
+        'min_rating' and 'max_rating' columns
+        """
+        # Callers get a copy, so changes to the returned data frame do not alter the maintained summary
+        return self._get_movie_ratings_summary().copy()
+
+    def _get_movie_ratings_summary(self) -> pd.DataFrame:
+        """
+        Gets the maintained rated movies summary, built on first access and updated by append_ratings
+        :return: Pandas data frame with the rated movies summary, see get_movie_ratings_summary
+        """
+        if self._movie_ratings_summary is None:
+            self._movie_ratings_summary = summarize_movie_ratings(self.get_ratings_aggregate(), self.movies_df)
+        return self._movie_ratings_summary
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings", "genres"))
+    @cached_query("movies", "ratings", "links", "genres")
+    @requires_columns(
+        movies=["id", "original_title", "release_date"], ratings=["movieId", "rating"], genres=["id", "genre_name"]
+    )
+    def get_top_n_rated_movies(self,
+                               n: int = 5,
+                               min_ratings: int = 1,
+                               genre: str = None,
+                               year_range: tuple = None
+                               ) -> pd.DataFrame:
+        """
+        Gets the n highest rated movies matching the filters. The movies with equal average rating are ordered by id.
+        :param n: Number of movies to be returned
+        :param min_ratings: Minimal number of ratings of a movie
+        :param genre: Genre name of the movies, all genres by default
+        :param year_range: Tuple with the first and the last release year of the movies, all years by default
+        :return: Pandas data frame with the n movies with highest average rating
+        """
+        method_name = self.get_top_n_rated_movies.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with n={n}, min_ratings={min_ratings}, "
+                f"genre={genre}, year_range={year_range}."
+            )
+            movie_ratings_summary = self._get_movie_ratings_summary()
+
+            selected_movies = (movie_ratings_summary["rating_count"] >= min_ratings).to_numpy()
+            if genre is not None:
+                genre_movie_ids = self.get_genre_index().get_movie_ids(genre)
+                selected_movies &= np.isin(movie_ratings_summary["id"].to_numpy(), genre_movie_ids)
+            if year_range is not None:
+                first_year, last_year = year_range
+                release_years = movie_ratings_summary["release_year"]
+                selected_movies &= ((release_years >= first_year) & (release_years <= last_year)).to_numpy()
+
+            selected_movies_summary = movie_ratings_summary[selected_movies]
+            top_n_positions = select_top_n(
+                selected_movies_summary["average_rating"].to_numpy(),
+                selected_movies_summary["id"].to_numpy(),
+                n
+            )
+            df_query_result = selected_movies_summary.iloc[top_n_positions][["id", "title", "average_rating"]]
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
-        # Load the movies dataframe from a CSV file
-        self.movies_df = read_csv(movies_file_path if movies_file_path else self.config.movies_metadata_csv)
-        # Load the ratings dataframe from a CSV file
-        self.ratings_df = read_csv(ratings_file_path if ratings_file_path else self.config.ratings_csv)
-        # Load the genres dataframe from a CSV file
-        self.genres_df = read_csv(genres_file_path if genres_file_path else self.config.genres_csv)
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result.reset_index(drop=True)
+
+    @instrumented(input_rows=count_table_rows("movies", "genres"))
+    @requires_columns(movies=["id"], genres=["id", "genre_name"])
+    def get_genre_index(self) -> GenreIndex:
+        """
+        Gets the genre index of the movies, built once from the genres table
+        :return: GenreIndex object
+        """
+        if self._genre_index is None:
+            # The genres are joined with the movies by their positions in the movies index
+            self._genre_index = GenreIndex.from_key_positions(
+                self.get_movies_index(), self.get_foreign_key_positions("genres"), self.genres_df["genre_name"]
+            )
+            logger.info(
+                f"Built the genre index of {len(self._genre_index.movie_ids)} movies "
+                f"and {len(self._genre_index.genre_names)} genres."
+            )
+        return self._genre_index
+
+    @instrumented(input_rows=count_table_rows("movies", "genres"))
+    @cached_query("movies", "genres")
+    @requires_columns(movies=["id", "original_title"], genres=["id", "genre_name"])
+    def get_movies_by_genres(self, genres: list, match: str = "any") -> pd.DataFrame:
+        """
+        Gets the movies with any or all of the genres from the genre index
+        :param genres: List with the genre names
+        :param match: 'any' for the movies with at least one of the genres, 'all' for the movies with every genre
+        :return: Pandas data frame with the 'id' and 'title' columns of the movies ordered by id
+        """
+        method_name = self.get_movies_by_genres.__name__
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with genres={genres}, match={match}."
+            )
+            movie_ids = self.get_genre_index().get_movies_with_genres(genres, match=match)
+            df_query_result = pd.DataFrame(
+                {"id": movie_ids, "title": self._get_movie_titles(movie_ids)}
+            )
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("movies", "genres"))
+    @cached_query("movies", "genres")
+    @requires_columns(movies=["id"], genres=["id", "genre_name"])
+    def get_genre_cooccurrence(self) -> pd.DataFrame:
+        """
+        Gets the number of movies of every pair of genres from the genre index
+        :return: Pandas data frame with the genre names as index and columns
+        """
+        return self.get_genre_index().get_cooccurrence()
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings", "genres"))
+    @cached_query("movies", "ratings", "links", "genres")
+    @requires_columns(movies=["id"], ratings=["movieId", "rating"], genres=["id", "genre_name"])
+    def get_average_rating_by_genre(self) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average of all ratings of the movies of every genre
+        from the genre index and the per-movie rating aggregates
+        :return: Pandas data frame with 'genre', 'rating_count' and 'average_rating' columns
+        """
+        return self.get_genre_index().get_average_ratings(self.get_ratings_aggregate())
 
+    @instrumented(input_rows=count_table_rows("movies"))
+    @cached_query("movies")
+    @requires_columns(movies=["id"])
     def get_unique_movies(self) -> pd.DataFrame:
         """
-        Gets the number of unique movies in movies dataframe from the class attribute
+        Gets the number of unique movies in movies dataframe from the class attribute.
+        The count is exact in approximate mode too, with a 'movies_count_error' column of 0.
         :return: Pandas data frame with count of unique movies
         """
         method_name = self.get_unique_movies.__name__
-        movies_table = self.movies_df
-        query = """
-            SELECT COUNT(DISTINCT id) AS movies_count 
-            FROM movies_table;
-        """
         try:
             logger.info(
-                f"Calling {self.__class__.__name__} method {method_name} with query: {query}"
+                f"Calling {self.__class__.__name__} method {method_name} with {self.backend.name} backend."
             )
-            df_query_result = sqldf(query)
+            df_query_result = self.backend.get_unique_movies(self)
+            if self.approximate:
+                # The count is exact, the error column gives the approximate mode results a single shape
+                df_query_result = df_query_result.assign(movies_count_error=0.0)
         except Exception as error:
-            error_msg = f"Error occurred in {method_name} method: {error}"
-            logger.error(error_msg)
-            raise error_msg
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
         logger.info(f"The {method_name} method finished successfully.")
         return df_query_result
 
+    @instrumented(input_rows=count_table_rows("movies", "ratings"))
+    @cached_query("movies", "ratings", "links")
+    @requires_columns(movies=["id", "original_title", "release_date"], ratings=["movieId", "rating"])
     def get_average_movie_rating(self) -> pd.DataFrame:
         """
-        Gets the average rating of all movies
+        Gets the average rating of all movies. In approximate mode the averages are estimated,
+        see _estimate_average_movie_rating.
         :return: Pandas data frame with average ratings grouped by movie id
         """
         method_name = self.get_average_movie_rating.__name__
-        movies_table = self.movies_df
-        ratings_table = self.ratings_df
-        query = """
-            SELECT 
-            ratings_table.movieId AS id, 
-            movies_table.original_title AS title, 
-            AVG(ratings_table.rating) AS average_rating
-            FROM ratings_table
-            INNER JOIN movies_table ON ratings_table.movieId = movies_table.id
-            GROUP BY id;
-        """
         try:
             logger.info(
-                f"Calling {self.__class__.__name__} method {method_name} with query: {query}"
+                f"Calling {self.__class__.__name__} method {method_name} with {self.backend.name} backend"
+                f"{' in approximate mode' if self.approximate else ''}."
             )
-            df_query_result = sqldf(query)
+            if self.approximate:
+                df_query_result = self._estimate_average_movie_rating()
+            else:
+                df_query_result = self.backend.get_average_movie_rating(self)
         except Exception as error:
-            error_msg = f"Error occurred in {method_name} method: {error}"
-            logger.error(error_msg)
-            raise error_msg
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
         logger.info(f"The {method_name} method finished successfully.")
         return df_query_result
 
+    @instrumented(input_rows=count_table_rows("movies", "ratings"))
+    @cached_query("movies", "ratings", "links")
+    @requires_columns(movies=["id", "original_title", "release_date"], ratings=["movieId", "rating"])
     def get_top_5_highest_rated_movies(self) -> pd.DataFrame:
         """
-        Gets the top 5 highest rated movies
+        Gets the top 5 highest rated movies. In approximate mode the averages are estimated,
+        see _estimate_average_movie_rating.
         :return: Pandas data frame with the 5 movies with highest average rating
         """
         method_name = self.get_top_5_highest_rated_movies.__name__
-        avg_ratings_table = self.get_average_movie_rating()
-        query = """
-            SELECT 
-            id, 
-            title, 
-            average_rating
-            FROM avg_ratings_table
-            ORDER BY average_rating DESC
-            LIMIT 5;
+        try:
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with {self.backend.name} backend"
+                f"{' in approximate mode' if self.approximate else ''}."
+            )
+            if self.approximate:
+                df_query_result = self._estimate_top_rated_movies(n=5)
+            else:
+                df_query_result = self.backend.get_top_rated_movies(self, n=5)
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return df_query_result
+
+    @instrumented(input_rows=count_table_rows("movies"))
+    @cached_query("movies")
+    @requires_columns(movies=["id", "release_date"])
+    def get_movies_released(self, by: str = "year") -> pd.DataFrame:
+        """
+        Gets the number of movies released in every year, month or decade from the release dates parsed at load.
+        The movies with missing or malformed release dates are not counted.
+        :param by: Release period - 'year', 'month' or 'decade'
+        :return: Pandas data frame with the period column, e.g. '1995', '1995-07' or '1990s', and the number
+        of movies released in it, ordered by descending number of movies and period
         """
+        method_name = self.get_movies_released.__name__
         try:
             logger.info(
-                f"Calling {self.__class__.__name__} method {method_name} with query: {query}"
+                f"Calling {self.__class__.__name__} method {method_name} with by={by} "
+                f"and {self.backend.name} backend."
             )
-            df_query_result = sqldf(query)
+            if by not in RELEASE_PERIODS:
+                raise ValueError(f"Unknown release period '{by}'. Available periods: {', '.join(RELEASE_PERIODS)}")
+            df_query_result = self.backend.get_movies_released(self, by=by)
         except Exception as error:
-            error_msg = f"Error occurred in {method_name} method: {error}"
-            logger.error(error_msg)
-            raise error_msg
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
         logger.info(f"The {method_name} method finished successfully.")
         return df_query_result
 
+    @instrumented(input_rows=count_table_rows("movies"))
+    @cached_query("movies")
+    @requires_columns(movies=["id", "release_date"])
     def get_movies_released_each_year(self) -> pd.DataFrame:
         """
         Gets the number of movies released each year
         :return: Pandas data frame with number of movies grouped by released year
         """
         method_name = self.get_movies_released_each_year.__name__
-        movies_table = self.movies_df
-        query = r"""
-            SELECT
-            STRFTIME('%Y', release_date) AS year,
-            COUNT(DISTINCT id) AS movies_released
-            FROM movies_table
-            WHERE release_date REGEXP '^\d{4}-\d{2}-\d{2}$'
-            GROUP BY year
-            ORDER BY movies_released DESC, year;
-        """
         try:
             logger.info(
-                f"Calling {self.__class__.__name__} method {method_name} with query: {query}"
+                f"Calling {self.__class__.__name__} method {method_name} with {self.backend.name} backend."
             )
-            df_query_result = sqldf(query)
+            df_query_result = self.backend.get_movies_released_each_year(self)
         except Exception as error:
-            error_msg = f"Error occurred in {method_name} method: {error}"
-            logger.error(error_msg)
-            raise error_msg
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
         logger.info(f"The {method_name} method finished successfully.")
         return df_query_result
 
+    @instrumented(input_rows=count_table_rows("movies", "genres"))
+    @cached_query("movies", "genres")
+    @requires_columns(movies=["id"], genres=["id", "genre_name"])
     def get_movies_count_by_genre(self) -> pd.DataFrame:
         """
-        Gets the number of movies for each genre
+        Gets the number of movies for each genre.
+        The counts are exact in approximate mode too, with a 'movies_count_error' column of 0.
         :return: Pandas data frame with the number of movies grouped by genre
         """
         method_name = self.get_movies_count_by_genre.__name__
-        movies_table = self.movies_df
-        genres_table = self.genres_df
-        query = """
-            SELECT
-            genres_table.genre_name AS genre,
-            COUNT(DISTINCT movies_table.id) AS movies_count
-            FROM movies_table
-            LEFT JOIN genres_table ON movies_table.id = genres_table.id
-            GROUP BY genre
-            ORDER BY movies_count DESC, genre;
-        """
         try:
             logger.info(
-                f"Calling {self.__class__.__name__} method {method_name} with query: {query}"
+                f"Calling {self.__class__.__name__} method {method_name} with {self.backend.name} backend."
             )
-            df_query_result = sqldf(query)
+            df_query_result = self.backend.get_movies_count_by_genre(self)
+            if self.approximate:
+                # The counts are exact, the error column gives the approximate mode results a single shape
+                df_query_result = df_query_result.assign(movies_count_error=0.0)
         except Exception as error:
-            error_msg = f"Error occurred in {method_name} method: {error}"
-            logger.error(error_msg)
-            raise error_msg
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
         logger.info(f"The {method_name} method finished successfully.")
         return df_query_result
 
-    def save_to_json_movies_dataset(self) -> None:
+    def _estimate_average_movie_rating(self) -> pd.DataFrame:
+        """
+        Estimates the average rating of the rated movies of the movies metadata from the ratings blocks sample.
+        The movies without ratings in the sampled blocks are missing from the result.
+        :return: Pandas data frame with 'id', 'title', 'average_rating' and 'average_rating_error' columns
+        ordered by id, the error is the standard error of the estimate, see RatingsSample.get_average_ratings
+        """
+        average_ratings = self.get_ratings_sample().get_average_ratings()
+        # The ratings of the movies missing from the movies metadata are dropped, the same as by the inner join
+        average_ratings = average_ratings[
+            self.get_movies_index().get_key_positions(average_ratings["movieId"].to_numpy()) >= 0
+        ]
+        movie_ids = average_ratings["movieId"].to_numpy()
+        return pd.DataFrame(
+            {
+                "id": movie_ids,
+                "title": self._get_movie_titles(movie_ids),
+                "average_rating": average_ratings["average_rating"].to_numpy(),
+                "average_rating_error": average_ratings["average_rating_error"].to_numpy()
+            }
+        )
+
+    def _estimate_top_rated_movies(self, n: int) -> pd.DataFrame:
+        """
+        Estimates the n highest rated movies from the average ratings of the ratings blocks sample
+        :param n: Number of movies to be returned
+        :return: Pandas data frame with 'id', 'title', 'average_rating' and 'average_rating_error' columns,
+        see _estimate_average_movie_rating
+        """
+        average_ratings = self._estimate_average_movie_rating()
+        top_n_positions = select_top_n(
+            average_ratings["average_rating"].to_numpy(), average_ratings["id"].to_numpy(), n
+        )
+        return average_ratings.iloc[top_n_positions].reset_index(drop=True)
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings", "genres"))
+    @requires_columns(
+        movies=["id", "original_title", "release_date"], ratings=["movieId", "rating"], genres=["id", "genre_name"]
+    )
+    def run_reports(self, report_names: list = None) -> dict:
+        """
+        Gets the results of several reports planned together, so the movies are deduplicated, the ratings are
+        joined with the movies and the genres are joined with the movies once for all of them.
+        The results are the same as the ones of the report query methods, estimated in approximate mode.
+        :param report_names: List with the report names - 'unique_movies', 'average_movies_rating',
+        'top_5_rated_movies', 'movies_released_by_year' and 'movies_by_genre', all reports by default
+        :return: Dictionary with the report names and their Pandas data frame results
+        """
+        method_name = self.run_reports.__name__
+        try:
+            report_names = list(REPORTS) if report_names is None else list(dict.fromkeys(report_names))
+            logger.info(
+                f"Calling {self.__class__.__name__} method {method_name} with report_names={report_names} "
+                f"and {self.backend.name} backend."
+            )
+            unknown_reports = [report_name for report_name in report_names if report_name not in REPORTS]
+            if unknown_reports:
+                raise ValueError(
+                    f"Unknown reports {', '.join(unknown_reports)}. Available reports: {', '.join(REPORTS)}"
+                )
+            planned_report_names = [
+                report_name for report_name in report_names
+                if not (self.approximate and report_name in APPROXIMATE_REPORTS)
+            ]
+            reports = self.backend.run_reports(self, planned_report_names) if planned_report_names else {}
+            # In approximate mode the reports with an error column are queried on their own
+            reports = {
+                report_name: reports[report_name] if report_name in reports
+                else getattr(self, APPROXIMATE_REPORTS[report_name])()
+                for report_name in report_names
+            }
+        except Exception as error:
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
+
+        logger.info(f"The {method_name} method finished successfully.")
+        return reports
+
+    def get_memory_usage_report(self) -> pd.DataFrame:
         """
-        Saves all MoviesDataSet data frames to JSON files
+        Gets the memory saved by loading the movies dataset tables with the configured schema
+        :return: Pandas data frame with the memory usage in bytes and the bytes saved per table
+        """
+        return get_memory_usage_report(self.source_files, self.config.schema)
+
+    @instrumented(input_rows=count_table_rows("movies", "ratings", "genres"))
+    def save_to_json_movies_dataset(self, reports: dict = None) -> dict:
+        """
+        Saves all MoviesDataSet data frames to JSON files, or to the export file formats configured per file.
+        Every result is computed once and the files are written concurrently by a thread pool.
+        In streaming mode the ratings CSV files are exported in chunks without loading the ratings table.
+        :param reports: Dictionary with the results of run_reports, the missing reports are computed
+        :return: Dictionary with the export file attribute names and the written file paths
         """
         method_name = self.save_to_json_movies_dataset.__name__
         try:
             logger.info(
                 f"Calling {self.__class__.__name__} method {method_name}."
             )
-            save_to_json(df=self.movies_df, file_path=self.config.movies_metadata_json)
-            save_to_json(df=self.ratings_df, file_path=self.config.ratings_json)
-            save_to_json(df=self.genres_df, file_path=self.config.genres_json)
-            save_to_json(df=self.get_unique_movies(), file_path=self.config.unique_movies_json)
-            save_to_json(df=self.get_average_movie_rating(), file_path=self.config.average_movies_rating_json)
-            save_to_json(df=self.get_top_5_highest_rated_movies(), file_path=self.config.top_5_rated_movies_json)
-            save_to_json(df=self.get_movies_released_each_year(), file_path=self.config.movies_released_by_year_json)
-            save_to_json(df=self.get_movies_count_by_genre(), file_path=self.config.movies_by_genre_json)
+            # The reports are planned together, as they share the deduplicated movies and the table joins
+            reports = dict(reports) if reports else {}
+            reports.update(self.run_reports([report_name for report_name in REPORTS if report_name not in reports]))
+            export_data = {
+                "movies_metadata_json": self.movies_df,
+                "ratings_json": self._get_ratings_export_data(),
+                "genres_json": self.genres_df,
+                **{f"{report_name}_json": reports[report_name] for report_name in REPORTS}
+            }
+            export_file_paths = {
+                attribute_name: get_export_file_path(
+                    getattr(self.config, attribute_name), self.config.export_formats.get(attribute_name, "json")
+                )
+                for attribute_name in export_data
+            }
+            with ThreadPoolExecutor(max_workers=self.config.export_workers) as executor:
+                futures = [
+                    executor.submit(
+                        save_to_file,
+                        data,
+                        export_file_paths[attribute_name],
+                        self.config.export_formats.get(attribute_name, "json"),
+                        self.config.export_chunksize
+                    )
+                    for attribute_name, data in export_data.items()
+                ]
+                for future in futures:
+                    future.result()
         except Exception as error:
-            error_msg = f"Error occurred in {method_name} method: {error}"
-            logger.error(error_msg)
-            raise error_msg
+            logger.error(f"Error occurred in {method_name} method: {error}")
+            raise
 
         logger.info(f"The {method_name} method finished successfully.")
+        return export_file_paths
+
+    def _get_ratings_export_data(self):
+        """
+        Gets the ratings to be exported. In streaming mode, when the ratings table is not loaded,
+        the ratings are exported as CSV chunks, so only one chunk is in memory at a time.
+        :return: Pandas data frame with the ratings or an iterator of ratings data frame chunks
+        """
+        if not self.ratings_chunksize or "ratings" in self._tables or self._appended_ratings or self.store is not None:
+            return self.ratings_df
+
+        return (
+            ratings_chunk
+            for file_path in resolve_file_paths(self.source_files["ratings"])
+            for ratings_chunk in read_csv_chunks(
+                file_path, chunksize=self.ratings_chunksize, schema=self.config.schema.get("ratings")
+            )
+        )
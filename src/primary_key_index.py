@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Rows kept of the duplicated primary keys
+KEEP_POLICIES = ("first", "last")
+
+
+class PrimaryKeyIndex:
+    """
+    A class for the sorted primary key index of a table - the sorted unique integer keys and the row of every key,
+    so the rows of keys are found by binary search and the number of distinct keys is known without counting
+    ...
+
+    Attributes
+    ----------
+    keys : np.ndarray
+        sorted unique integer keys of the table
+    row_positions : np.ndarray
+        table row position of every key, the first row of a duplicated key
+    unparsed_keys_count : int
+        number of distinct keys which are not integers, the missing keys are not counted
+
+    Methods
+    -------
+    from_frame(df, column):
+        Builds the primary key index of a table
+    get_key_positions(values):
+        Gets the positions in keys of key values
+    get_row_positions(values):
+        Gets the table row positions of key values
+    """
+
+    def __init__(self, keys: np.ndarray, row_positions: np.ndarray, unparsed_keys_count: int = 0):
+        self.keys = keys
+        self.row_positions = row_positions
+        self.unparsed_keys_count = unparsed_keys_count
+
+    def __len__(self) -> int:
+        """
+        Gets the number of distinct keys, the same as the nunique of the key column
+        :return: Number of distinct keys
+        """
+        return len(self.keys) + self.unparsed_keys_count
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = "id"):
+        """
+        Builds the primary key index of a table
+        :param df: Pandas data frame with the key column
+        :param column: Name of the key column
+        :return: PrimaryKeyIndex object
+        """
+        keys = pd.to_numeric(df[column], errors="coerce")
+        integer_keys = (keys.notna() & (keys % 1 == 0)).to_numpy()
+        unparsed_keys_count = df.loc[~integer_keys, column].nunique()
+
+        keys, first_positions = np.unique(keys[integer_keys].to_numpy(dtype="int64"), return_index=True)
+        return cls(keys, np.flatnonzero(integer_keys)[first_positions], unparsed_keys_count)
+
+    def get_key_positions(self, values) -> np.ndarray:
+        """
+        Gets the positions in keys of key values, e.g. of the foreign keys of another table
+        :param values: NumPy array or Pandas series with the key values, missing values are NaN
+        :return: NumPy array with the int64 key positions, -1 for the values without a key
+        """
+        values = pd.to_numeric(pd.Series(np.asarray(values)), errors="coerce").to_numpy(dtype="float64")
+        integer_values = ~np.isnan(values) & (values % 1 == 0)
+        integer_keys = values[integer_values].astype("int64")
+
+        positions = np.full(len(values), -1, dtype="int64")
+        key_positions = np.searchsorted(self.keys, integer_keys)
+        found = key_positions < len(self.keys)
+        found[found] = self.keys[key_positions[found]] == integer_keys[found]
+        positions[np.flatnonzero(integer_values)[found]] = key_positions[found]
+        return positions
+
+    def get_row_positions(self, values) -> np.ndarray:
+        """
+        Gets the table row positions of key values
+        :param values: NumPy array or Pandas series with the key values, missing values are NaN
+        :return: NumPy array with the int64 row positions, -1 for the values without a key
+        """
+        key_positions = self.get_key_positions(values)
+        row_positions = np.full(len(key_positions), -1, dtype="int64")
+        row_positions[key_positions >= 0] = self.row_positions[key_positions[key_positions >= 0]]
+        return row_positions
+
+
+def drop_duplicate_keys(df: pd.DataFrame, column: str, keep: str = "first") -> tuple:
+    """
+    Drops the rows with a duplicated primary key
+    :param df: Pandas data frame with the key column
+    :param column: Name of the key column
+    :param keep: Row kept of every duplicated key - 'first' or 'last'
+    :return: Tuple with the Pandas data frames of the kept rows and of the dropped rows
+    """
+    if keep not in KEEP_POLICIES:
+        raise ValueError(f"Unknown keep policy '{keep}'. Available policies: {', '.join(KEEP_POLICIES)}")
+    duplicated_rows = df[column].duplicated(keep=keep).to_numpy()
+    if not duplicated_rows.any():
+        return df, df.iloc[:0]
+    return df[~duplicated_rows].reset_index(drop=True), df[duplicated_rows]
@@ -0,0 +1,540 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+from pandasql import sqldf
+from ratings_aggregation import select_top_n
+from utils import (
+    logger,
+    parse_dates,
+    format_date_columns
+)
+
+# Periods the release dates are grouped by
+RELEASE_PERIODS = ("year", "month", "decade")
+# Reports answered together by run_reports - the backend query methods, their arguments and the tables they read
+REPORTS = {
+    "unique_movies": ("get_unique_movies", {}, ("movies",)),
+    "average_movies_rating": ("get_average_movie_rating", {}, ("movies", "ratings")),
+    "top_5_rated_movies": ("get_top_rated_movies", {"n": 5}, ("movies", "ratings")),
+    "movies_released_by_year": ("get_movies_released", {"by": "year"}, ("movies",)),
+    "movies_by_genre": ("get_movies_count_by_genre", {}, ("movies", "genres"))
+}
+
+
+class QueryBackend:
+    """
+    Base class for the MoviesDataSet query backends
+    ...
+
+    Attributes
+    ----------
+    name : str
+        backend name used in the query backends registry
+
+    Methods
+    -------
+    get_unique_movies(dataset):
+        Gets the number of unique movies
+    get_average_movie_rating(dataset):
+        Gets the average rating of all movies
+    get_top_rated_movies(dataset, n):
+        Gets the n highest rated movies
+    get_movies_released(dataset, by):
+        Gets the number of movies released in every year, month or decade
+    get_movies_released_each_year(dataset):
+        Gets the number of movies released each year
+    get_movies_count_by_genre(dataset):
+        Gets the number of movies for each genre
+    run_reports(dataset, report_names):
+        Gets the results of several reports
+    """
+
+    name = None
+
+    def get_unique_movies(self, dataset) -> pd.DataFrame:
+        """
+        Gets the number of unique movies
+        :param dataset: MoviesDataSet object with the source tables
+        :return: Pandas data frame with count of unique movies
+        """
+        raise NotImplementedError
+
+    def get_average_movie_rating(self, dataset) -> pd.DataFrame:
+        """
+        Gets the average rating of all movies
+        :param dataset: MoviesDataSet object with the source tables
+        :return: Pandas data frame with average ratings grouped by movie id
+        """
+        raise NotImplementedError
+
+    def get_top_rated_movies(self, dataset, n: int) -> pd.DataFrame:
+        """
+        Gets the n highest rated movies
+        :param dataset: MoviesDataSet object with the source tables
+        :param n: Number of movies to be returned
+        :return: Pandas data frame with the n movies with highest average rating
+        """
+        raise NotImplementedError
+
+    def get_movies_released(self, dataset, by: str = "year") -> pd.DataFrame:
+        """
+        Gets the number of movies released in every year, month or decade. The movies with missing
+        or malformed release dates are not counted.
+        :param dataset: MoviesDataSet object with the source tables
+        :param by: Release period - 'year', 'month' or 'decade'
+        :return: Pandas data frame with the period column, e.g. '1995', '1995-07' or '1990s',
+        and the number of movies released in it, ordered by descending number of movies and period
+        """
+        raise NotImplementedError
+
+    def get_movies_released_each_year(self, dataset) -> pd.DataFrame:
+        """
+        Gets the number of movies released each year
+        :param dataset: MoviesDataSet object with the source tables
+        :return: Pandas data frame with number of movies grouped by released year
+        """
+        return self.get_movies_released(dataset, by="year")
+
+    def get_movies_count_by_genre(self, dataset) -> pd.DataFrame:
+        """
+        Gets the number of movies for each genre
+        :param dataset: MoviesDataSet object with the source tables
+        :return: Pandas data frame with the number of movies grouped by genre
+        """
+        raise NotImplementedError
+
+    def run_reports(self, dataset, report_names: list) -> dict:
+        """
+        Gets the results of several reports, see REPORTS. The backends override it to compute the intermediate
+        results shared by the reports once, by default every report is queried on its own.
+        :param dataset: MoviesDataSet object with the source tables
+        :param report_names: List with the report names
+        :return: Dictionary with the report names and their results
+        """
+        return {
+            report_name: getattr(self, REPORTS[report_name][0])(dataset, **REPORTS[report_name][1])
+            for report_name in report_names
+        }
+
+
+class PandasQueryBackend(QueryBackend):
+    """
+    Query backend implementing the MoviesDataSet queries with vectorized pandas/NumPy operations.
+    The results match the ones of the SQL backend (column names, dtypes and ordering).
+    """
+
+    name = "pandas"
+
+    def get_unique_movies(self, dataset) -> pd.DataFrame:
+        # The number of distinct movies is the length of the primary key index built once
+        movies_count = len(dataset.get_movies_index())
+        return pd.DataFrame(data={"movies_count": movies_count}, index=[0])
+
+    def get_average_movie_rating(self, dataset) -> pd.DataFrame:
+        # Per-movie ratings aggregated once and joined with the movie titles
+        movie_ratings_summary = dataset.get_movie_ratings_summary()
+        return movie_ratings_summary[["id", "title", "average_rating"]]
+
+    def get_top_rated_movies(self, dataset, n: int) -> pd.DataFrame:
+        return dataset.get_top_n_rated_movies(n=n)
+
+    def get_movies_released(self, dataset, by: str = "year") -> pd.DataFrame:
+        movies_df = dataset.movies_df
+        # The release dates are parsed at load by the table schema, so they are only grouped here
+        release_dates = parse_dates(movies_df["release_date"])
+        released_movies = release_dates.notna().to_numpy()
+        release_dates = release_dates[released_movies]
+
+        # Integer period keys, ordered like the period labels
+        years = release_dates.dt.year.to_numpy(dtype="int64")
+        if by == "month":
+            period_keys = years * 100 + release_dates.dt.month.to_numpy(dtype="int64")
+        elif by == "decade":
+            period_keys = years // 10 * 10
+        else:
+            period_keys = years
+
+        movies = pd.DataFrame({"period": period_keys, "id": movies_df["id"].to_numpy()[released_movies]})
+        movies_released = movies.groupby("period", sort=False)["id"].nunique()
+        movies_released.index = self._format_release_periods(movies_released.index.to_numpy(), by)
+
+        return self._sort_counts(movies_released, key_column=by, count_column="movies_released")
+
+    def get_movies_count_by_genre(self, dataset) -> pd.DataFrame:
+        # Movie counts from the genre index built once, instead of joining the movies with the genres
+        return dataset.get_genre_index().get_counts()
+
+    def run_reports(self, dataset, report_names: list) -> dict:
+        # The distinct movies are counted by the primary key index, the ratings are joined with the movies once
+        # by the rated movies summary and the genres once by the genre index
+        reports = {}
+        movie_codes, unique_movie_ids = pd.factorize(dataset.movies_df["id"]) if (
+            "movies_released_by_year" in report_names
+        ) else (None, None)
+        movie_ratings_summary = dataset.get_movie_ratings_summary() if any(
+            report_name in report_names for report_name in ["average_movies_rating", "top_5_rated_movies"]
+        ) else None
+
+        for report_name in report_names:
+            if report_name == "unique_movies":
+                reports[report_name] = self.get_unique_movies(dataset)
+            elif report_name == "average_movies_rating":
+                reports[report_name] = movie_ratings_summary[["id", "title", "average_rating"]]
+            elif report_name == "top_5_rated_movies":
+                top_5_positions = select_top_n(
+                    movie_ratings_summary["average_rating"].to_numpy(), movie_ratings_summary["id"].to_numpy(), 5
+                )
+                reports[report_name] = movie_ratings_summary.iloc[top_5_positions][
+                    ["id", "title", "average_rating"]
+                ].reset_index(drop=True)
+            elif report_name == "movies_released_by_year":
+                reports[report_name] = self._count_released_movies(
+                    dataset.movies_df["release_date"], movie_codes, len(unique_movie_ids)
+                )
+            else:
+                reports[report_name] = getattr(self, REPORTS[report_name][0])(dataset, **REPORTS[report_name][1])
+        return reports
+
+    def _count_released_movies(self, release_dates: pd.Series, movie_codes: np.ndarray,
+                               movies_count: int) -> pd.DataFrame:
+        """
+        Counts the distinct movies released every year from the deduplicated movie codes
+        :param release_dates: Pandas series with the release dates of the movies table rows
+        :param movie_codes: NumPy array with the distinct movie position of every row, -1 for a missing id
+        :param movies_count: Number of distinct movies
+        :return: Pandas data frame with the number of movies released every year, see get_movies_released
+        """
+        release_years = parse_dates(release_dates).dt.year.to_numpy(dtype="float64")
+        released_movies = ~np.isnan(release_years) & (movie_codes >= 0)
+        # Every distinct movie and release year pair is counted once
+        movie_years = np.unique(
+            release_years[released_movies].astype("int64") * max(movies_count, 1) + movie_codes[released_movies]
+        )
+        years, movies_released = np.unique(movie_years // max(movies_count, 1), return_counts=True)
+        return self._sort_counts(
+            pd.Series(movies_released, index=self._format_release_periods(years, "year")),
+            key_column="year",
+            count_column="movies_released"
+        )
+
+    @staticmethod
+    def _format_release_periods(period_keys: np.ndarray, by: str) -> list:
+        """
+        Formats the integer release period keys as the period labels of the SQL backends
+        :param period_keys: NumPy array with the years, the decade start years or the months as year * 100 + month
+        :param by: Release period - 'year', 'month' or 'decade'
+        :return: List with the period labels
+        """
+        if by == "month":
+            return [f"{period_key // 100:04d}-{period_key % 100:02d}" for period_key in period_keys]
+        if by == "decade":
+            return [f"{period_key:04d}s" for period_key in period_keys]
+        return [f"{period_key:04d}" for period_key in period_keys]
+
+    @staticmethod
+    def _sort_counts(counts: pd.Series, key_column: str, count_column: str) -> pd.DataFrame:
+        """
+        Converts grouped counts to a data frame ordered by descending count and ascending key
+        :param counts: Pandas series with counts indexed by the group key
+        :param key_column: Name of the group key column
+        :param count_column: Name of the count column
+        :return: Pandas data frame with the ordered counts
+        """
+        df_counts = pd.DataFrame(
+            {
+                key_column: counts.index.to_numpy(dtype=object),
+                count_column: counts.to_numpy(dtype="int64")
+            }
+        )
+        df_counts = df_counts.sort_values(
+            [count_column, key_column], ascending=[False, True], na_position="first", kind="mergesort"
+        ).reset_index(drop=True)
+        # Missing group keys are returned as None like the SQL NULL values
+        df_counts[key_column] = df_counts[key_column].where(df_counts[key_column].notna(), None)
+        return df_counts
+
+
+class SqlQueryBackend(QueryBackend):
+    """
+    Query backend running the MoviesDataSet queries with pandasql.
+    Every query copies the source data frames into a new SQLite database, so it is kept for comparison only.
+    """
+
+    name = "sql"
+
+    # Names of the dataset tables in the SQL queries and the MoviesDataSet data frames they refer to
+    table_names = {
+        "movies": "movies_table",
+        "ratings": "ratings_table",
+        "genres": "genres_table",
+        "links": "links_table"
+    }
+
+    # Release period labels of the ISO release dates
+    release_period_expressions = {
+        "year": "STRFTIME('%Y', release_date)",
+        "month": "STRFTIME('%Y-%m', release_date)",
+        "decade": "PRINTF('%04ds', CAST(STRFTIME('%Y', release_date) AS INTEGER) / 10 * 10)"
+    }
+
+    def get_unique_movies(self, dataset) -> pd.DataFrame:
+        return self._run_query(dataset, self._get_unique_movies_query(), "movies")
+
+    def get_average_movie_rating(self, dataset) -> pd.DataFrame:
+        return self._run_query(
+            dataset, f"{self._get_average_movie_rating_query(dataset)};", *self._get_rating_tables(dataset)
+        )
+
+    def get_top_rated_movies(self, dataset, n: int) -> pd.DataFrame:
+        query = self._get_top_rated_movies_query(n).format(average_ratings="avg_ratings_table")
+        logger.info(f"Running {self.name} backend query: {query}")
+        return sqldf(query, {"avg_ratings_table": dataset.get_average_movie_rating()})
+
+    def get_movies_released(self, dataset, by: str = "year") -> pd.DataFrame:
+        return self._run_query(dataset, self._get_movies_released_query(by), "movies")
+
+    def get_movies_count_by_genre(self, dataset) -> pd.DataFrame:
+        return self._run_query(dataset, self._get_movies_count_by_genre_query(), "movies", "genres")
+
+    def run_reports(self, dataset, report_names: list) -> dict:
+        # The reports run on one connection, the distinct movies and the average ratings are materialized once
+        # as temporary tables
+        table_names = {
+            table_name for report_name in report_names for table_name in REPORTS[report_name][2]
+        }
+        if "ratings" in table_names:
+            table_names.update(self._get_rating_tables(dataset))
+        connection, tables = self._open_report_connection(dataset, sorted(table_names))
+        temporary_tables = []
+        try:
+            def run_query(query: str) -> pd.DataFrame:
+                logger.info(f"Running {self.name} backend report query: {query}")
+                return pd.read_sql_query(query, connection)
+
+            def create_temporary_table(name: str, query: str) -> None:
+                connection.execute(f"DROP TABLE IF EXISTS temp.{name}")
+                connection.execute(f"CREATE TEMP TABLE {name} AS {query}")
+                temporary_tables.append(name)
+
+            # The counting queries read the distinct movies instead of the movies table
+            distinct_tables = dict(tables, movies="report_movies")
+            create_temporary_table("report_movies", "SELECT DISTINCT id, release_date FROM {movies}".format(**tables))
+            if "ratings" in table_names:
+                create_temporary_table(
+                    "report_average_ratings", self._get_average_movie_rating_query(dataset).format(**tables)
+                )
+
+            reports = {}
+            for report_name in report_names:
+                if report_name == "unique_movies":
+                    query = self._get_unique_movies_query().format(**distinct_tables)
+                elif report_name == "average_movies_rating":
+                    query = "SELECT id, title, average_rating FROM report_average_ratings ORDER BY id;"
+                elif report_name == "top_5_rated_movies":
+                    query = self._get_top_rated_movies_query(5).format(average_ratings="report_average_ratings")
+                elif report_name == "movies_released_by_year":
+                    query = self._get_movies_released_query("year").format(**distinct_tables)
+                else:
+                    query = self._get_movies_count_by_genre_query().format(**distinct_tables)
+                reports[report_name] = run_query(query)
+        finally:
+            for name in temporary_tables:
+                connection.execute(f"DROP TABLE IF EXISTS temp.{name}")
+            self._close_report_connection(connection)
+        return reports
+
+    @staticmethod
+    def _get_unique_movies_query() -> str:
+        """
+        Gets the query of the number of unique movies
+        :return: SQL query template with the dataset table names as format fields
+        """
+        return """
+            SELECT COUNT(DISTINCT id) AS movies_count
+            FROM {movies};
+        """
+
+    @staticmethod
+    def _get_top_rated_movies_query(n: int) -> str:
+        """
+        Gets the query of the n highest rated movies from a table of average ratings
+        :param n: Number of movies to be returned
+        :return: SQL query template with the 'average_ratings' table name as format field
+        """
+        return f"""
+            SELECT
+            id,
+            title,
+            average_rating
+            FROM {{average_ratings}}
+            ORDER BY average_rating DESC, id
+            LIMIT {int(n)};
+        """
+
+    def _get_movies_released_query(self, by: str) -> str:
+        """
+        Gets the query of the number of movies released in every year, month or decade.
+        DATE returns the ISO date of the valid dates only, so the malformed dates are filtered without REGEXP.
+        :param by: Release period - 'year', 'month' or 'decade'
+        :return: SQL query template with the dataset table names as format fields
+        """
+        return f"""
+            SELECT
+            {self.release_period_expressions[by]} AS {by},
+            COUNT(DISTINCT id) AS movies_released
+            FROM {{movies}}
+            WHERE DATE(release_date) = release_date
+            GROUP BY {by}
+            ORDER BY movies_released DESC, {by};
+        """
+
+    @staticmethod
+    def _get_movies_count_by_genre_query() -> str:
+        """
+        Gets the query of the number of movies for each genre
+        :return: SQL query template with the dataset table names as format fields
+        """
+        return """
+            SELECT
+            {genres}.genre_name AS genre,
+            COUNT(DISTINCT {movies}.id) AS movies_count
+            FROM {movies}
+            LEFT JOIN {genres} ON {movies}.id = {genres}.id
+            GROUP BY genre
+            ORDER BY movies_count DESC, genre;
+        """
+
+    @staticmethod
+    def _get_rating_tables(dataset) -> list:
+        """
+        Gets the tables the movie ratings are joined from
+        :param dataset: MoviesDataSet object with the source tables
+        :return: List with the movies and ratings table names and the links table name when it is configured
+        """
+        return ["movies", "ratings", "links"] if dataset.links_df is not None else ["movies", "ratings"]
+
+    def _get_average_movie_rating_query(self, dataset) -> str:
+        """
+        Gets the query of the average rating of every rated movie. With a links table the MovieLens ids
+        of the ratings are joined with the links to get the TMDB ids of the movies.
+        :param dataset: MoviesDataSet object with the source tables
+        :return: SQL query template without the terminating semicolon
+        """
+        rated_movies = "{ratings}"
+        if dataset.links_df is not None:
+            rated_movies = """(
+                SELECT {links}.tmdbId AS movieId, {ratings}.rating AS rating
+                FROM {ratings}
+                INNER JOIN {links} ON {ratings}.movieId = {links}.movieId
+            )"""
+        return f"""
+            SELECT
+            rated_movies.movieId AS id,
+            {{movies}}.original_title AS title,
+            AVG(rated_movies.rating) AS average_rating
+            FROM {rated_movies} AS rated_movies
+            INNER JOIN {{movies}} ON rated_movies.movieId = {{movies}}.id
+            GROUP BY id
+        """
+
+    def _open_report_connection(self, dataset, tables: list) -> tuple:
+        """
+        Opens the connection the reports run on - a new in-memory SQLite database with a copy of every table
+        :param dataset: MoviesDataSet object with the source tables
+        :param tables: Names of the dataset tables read by the reports
+        :return: Tuple with the SQLite connection and the dictionary with the names of the tables in the database
+        """
+        connection = sqlite3.connect(":memory:")
+        for table in tables:
+            # Dates are passed as ISO date strings, the format expected by the queries
+            format_date_columns(getattr(dataset, f"{table}_df")).to_sql(
+                self.table_names[table], connection, index=False
+            )
+        return connection, self.table_names
+
+    @staticmethod
+    def _close_report_connection(connection: sqlite3.Connection) -> None:
+        """
+        Closes the connection the reports ran on
+        :param connection: SQLite connection opened by _open_report_connection
+        """
+        connection.close()
+
+    def _run_query(self, dataset, query: str, *tables) -> pd.DataFrame:
+        """
+        Runs a SQL query with pandasql over the MoviesDataSet data frames
+        :param dataset: MoviesDataSet object with the source tables
+        :param query: SQL query template with the dataset table names as format fields
+        :param tables: Names of the dataset tables referenced in the query
+        :return: Pandas data frame with the query result
+        """
+        query = query.format(**self.table_names)
+        logger.info(f"Running {self.name} backend query: {query}")
+        # Dates are passed as ISO date strings, the format expected by the queries
+        return sqldf(
+            query,
+            {self.table_names[table]: format_date_columns(getattr(dataset, f"{table}_df")) for table in tables}
+        )
+
+
+class SqliteStoreBackend(SqlQueryBackend):
+    """
+    Query backend running the MoviesDataSet queries against the indexed tables of the persistent SQLite store,
+    so the data frames are not copied into a new database on every query.
+    """
+
+    name = "sqlite"
+
+    table_names = {
+        "movies": "movies",
+        "ratings": "ratings",
+        "genres": "genres",
+        "links": "links"
+    }
+
+    def get_top_rated_movies(self, dataset, n: int) -> pd.DataFrame:
+        query = self._get_top_rated_movies_query(n).format(
+            average_ratings=f"({self._get_average_movie_rating_query(dataset)})"
+        )
+        return self._run_query(dataset, query)
+
+    def _open_report_connection(self, dataset, tables: list) -> tuple:
+        # The tables are already in the store, the temporary tables of the reports are private to the connection
+        return dataset.store.connection, self.table_names
+
+    @staticmethod
+    def _close_report_connection(connection: sqlite3.Connection) -> None:
+        pass
+
+    def _run_query(self, dataset, query: str, *tables) -> pd.DataFrame:
+        """
+        Runs a SQL query against the MoviesDataSet persistent store
+        :param dataset: MoviesDataSet object with the persistent store
+        :param query: SQL query template with the dataset table names as format fields
+        :param tables: Names of the dataset tables referenced in the query
+        :return: Pandas data frame with the query result
+        """
+        query = query.format(**self.table_names)
+        logger.info(f"Running {self.name} backend query: {query}")
+        return dataset.store.query(query)
+
+
+QUERY_BACKENDS = {
+    PandasQueryBackend.name: PandasQueryBackend,
+    SqlQueryBackend.name: SqlQueryBackend,
+    SqliteStoreBackend.name: SqliteStoreBackend
+}
+
+
+def get_query_backend(name: str) -> QueryBackend:
+    """
+    Creates a query backend object by its registry name
+    :param name: Query backend name
+    :return: Query backend object
+    """
+    if name not in QUERY_BACKENDS:
+        error_msg = f"Unknown query backend '{name}'. Available backends: {', '.join(QUERY_BACKENDS)}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+    return QUERY_BACKENDS[name]()
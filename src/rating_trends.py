@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+from id_mapping import IdMapping
+from ratings_aggregation import select_top_n
+
+TIME_BUCKETS = ("day", "week", "month")
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday, the weeks start on Monday 1969-12-29
+WEEK_START_OFFSET = 3
+
+
+class RatingTimeline:
+    """
+    A class for the ratings ordered by time, with the Unix timestamps converted once to day numbers.
+    The day, week and month buckets are derived from the day numbers with integer arithmetic, and as the ratings
+    are ordered by day the buckets of a time range are a slice and the buckets of all ratings are runs of equal values,
+    so the rating counts and averages per bucket are computed without sorting or grouping.
+    ...
+
+    Attributes
+    ----------
+    movie_ids : np.ndarray
+        sorted ids of the rated movies
+    movie_codes : np.ndarray
+        positions in movie_ids of the movies of the ratings ordered by time
+    days : np.ndarray
+        days since 1970-01-01 of the ratings ordered by time
+    ratings : np.ndarray
+        ratings ordered by time
+
+    Methods
+    -------
+    from_frame(ratings_df, id_mapping):
+        Builds the rating timeline of a ratings data frame
+    get_buckets(by):
+        Gets the day, week or month bucket of every rating
+    get_trends(by, movie_id, per_movie):
+        Gets the number of ratings and the average rating of every bucket
+    get_rolling_trends(by, window, movie_id):
+        Gets the number of ratings and the average rating of rolling windows of buckets
+    get_trending_movies(n, first_day, last_day, min_ratings):
+        Gets the n movies with the most ratings in a range of days
+    """
+
+    def __init__(self, movie_ids: np.ndarray, movie_codes: np.ndarray, days: np.ndarray, ratings: np.ndarray):
+        self.movie_ids = movie_ids
+        self.movie_codes = movie_codes
+        self.days = days
+        self.ratings = ratings
+        self._buckets = {}
+        self._movie_order = None
+        self._movie_indptr = None
+
+    @classmethod
+    def from_frame(cls, ratings_df: pd.DataFrame, id_mapping: IdMapping = None):
+        """
+        Builds the rating timeline of a ratings data frame. The ratings with missing values are ignored.
+        :param ratings_df: Pandas data frame with 'movieId', 'rating' and 'timestamp' columns
+        :param id_mapping: IdMapping object translating the rating movie ids to the movie ids, None to use them as is
+        :return: RatingTimeline object
+        """
+        movie_keys = ratings_df["movieId"].to_numpy(dtype="float64")
+        ratings = ratings_df["rating"].to_numpy(dtype="float32")
+        timestamps = ratings_df["timestamp"].to_numpy(dtype="float64")
+        valid_ratings = ~(np.isnan(movie_keys) | np.isnan(ratings) | np.isnan(timestamps))
+        if id_mapping is not None:
+            movie_keys = id_mapping.map_ids(movie_keys).astype("float64")
+            valid_ratings &= movie_keys >= 0
+        days = (timestamps[valid_ratings].astype("int64") // SECONDS_PER_DAY).astype("int32")
+        movie_ids, movie_codes = encode_ids(movie_keys[valid_ratings].astype("int64"))
+
+        # The stable sort of 16-bit integers is a radix sort, the day numbers fit until 2059
+        sort_keys = days - days.min() if len(days) else days
+        order = np.argsort(sort_keys.astype("uint16") if sort_keys.max(initial=0) <= np.iinfo("uint16").max
+                           else sort_keys, kind="stable")
+        return cls(movie_ids, movie_codes[order], days[order], ratings[valid_ratings][order])
+
+    def get_buckets(self, by: str) -> np.ndarray:
+        """
+        Gets the day, week or month bucket of every rating, computed once per bucket size
+        :param by: Bucket size - 'day', 'week' or 'month'
+        :return: NumPy array with the non-decreasing bucket numbers of the ratings ordered by time
+        """
+        if by not in self._buckets:
+            self._buckets[by] = days_to_buckets(self.days, by)
+        return self._buckets[by]
+
+    def get_trends(self, by: str = "month", movie_id: int = None, per_movie: bool = False) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average rating of every bucket with ratings
+        :param by: Bucket size - 'day', 'week' or 'month'
+        :param movie_id: Movie id to get the trend of, all movies by default
+        :param per_movie: If true, the ratings are grouped by movie and bucket
+        :return: Pandas data frame with the 'period' start date, 'rating_count' and 'average_rating' columns,
+        and the 'movieId' column first when grouped by movie, ordered by movie and period
+        """
+        positions = self._get_movie_positions(movie_id, per_movie)
+        buckets = self.get_buckets(by)[positions]
+        movie_codes = self.movie_codes[positions]
+        # The buckets are non-decreasing within every movie, so the groups are the runs of equal keys
+        group_ends = buckets[1:] != buckets[:-1]
+        if per_movie:
+            group_ends |= movie_codes[1:] != movie_codes[:-1]
+        group_starts = np.flatnonzero(np.concatenate([[len(buckets) > 0], group_ends]))
+        rating_counts = np.diff(np.append(group_starts, len(buckets)))
+        rating_sums = np.add.reduceat(self.ratings[positions].astype("float64"), group_starts) if len(buckets) else 0
+
+        df_trends = pd.DataFrame(
+            {
+                "period": buckets_to_dates(buckets[group_starts], by),
+                "rating_count": rating_counts,
+                "average_rating": rating_sums / np.maximum(rating_counts, 1)
+            }
+        )
+        if per_movie:
+            df_trends.insert(0, "movieId", self.movie_ids[movie_codes[group_starts]])
+        return df_trends
+
+    def get_rolling_trends(self, by: str = "day", window: int = 7, movie_id: int = None) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average rating of rolling windows of buckets, every window ending
+        with one of the buckets from the first to the last rating, including the buckets without ratings
+        :param by: Bucket size - 'day', 'week' or 'month'
+        :param window: Number of buckets of every window
+        :param movie_id: Movie id to get the trend of, all movies by default
+        :return: Pandas data frame with the 'period' start date of the last bucket of the window, 'rating_count'
+        and 'average_rating' columns ordered by period, the average is NaN for the windows without ratings
+        """
+        positions = self._get_movie_positions(movie_id, False)
+        buckets = self.get_buckets(by)[positions]
+        if len(buckets) == 0:
+            return pd.DataFrame(
+                {"period": buckets_to_dates(buckets, by), "rating_count": buckets.astype("int64"),
+                 "average_rating": np.zeros(0)}
+            )
+
+        offsets = buckets - buckets[0]
+        rating_counts = np.cumsum(np.bincount(offsets))
+        rating_sums = np.cumsum(np.bincount(offsets, weights=self.ratings[positions]))
+        # The window sums are the differences of the cumulative sums window buckets apart
+        rating_counts[window:] = rating_counts[window:] - rating_counts[:-window]
+        rating_sums[window:] = rating_sums[window:] - rating_sums[:-window]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average_ratings = np.where(rating_counts > 0, rating_sums / rating_counts, np.nan)
+        return pd.DataFrame(
+            {
+                "period": buckets_to_dates(np.arange(buckets[0], buckets[-1] + 1), by),
+                "rating_count": rating_counts,
+                "average_rating": average_ratings
+            }
+        )
+
+    def get_trending_movies(self, n: int, first_day: int, last_day: int, min_ratings: int = 1) -> pd.DataFrame:
+        """
+        Gets the n movies with the most ratings in a range of days, with their number of ratings
+        in the range of days of the same length before it
+        :param n: Number of movies
+        :param first_day: First day of the range, days since 1970-01-01
+        :param last_day: Last day of the range, days since 1970-01-01
+        :param min_ratings: Minimal number of ratings of the movies in the range
+        :return: Pandas data frame with 'movieId', 'rating_count', 'average_rating' and 'previous_rating_count'
+        columns ordered by descending number of ratings and movie id
+        """
+        range_start, range_end, previous_start = np.searchsorted(
+            self.days, [first_day, last_day + 1, 2 * first_day - last_day - 1]
+        )
+        movies_count = len(self.movie_ids)
+        rating_counts = np.bincount(self.movie_codes[range_start:range_end], minlength=movies_count)
+        rating_sums = np.bincount(
+            self.movie_codes[range_start:range_end], weights=self.ratings[range_start:range_end],
+            minlength=movies_count
+        )
+        previous_rating_counts = np.bincount(self.movie_codes[previous_start:range_start], minlength=movies_count)
+
+        candidates = np.flatnonzero(rating_counts >= max(min_ratings, 1))
+        top_n = candidates[select_top_n(rating_counts[candidates], self.movie_ids[candidates], n)]
+        return pd.DataFrame(
+            {
+                "movieId": self.movie_ids[top_n],
+                "rating_count": rating_counts[top_n],
+                "average_rating": rating_sums[top_n] / rating_counts[top_n],
+                "previous_rating_count": previous_rating_counts[top_n]
+            }
+        )
+
+    def _get_movie_positions(self, movie_id: int, per_movie: bool):
+        """
+        Gets the positions of the ratings of one movie or of all movies ordered by movie, from the movie-major
+        order of the ratings built on first use. The ratings of every movie stay ordered by time.
+        :param movie_id: Movie id, None for all movies
+        :param per_movie: If true, the positions of all ratings are ordered by movie
+        :return: NumPy array or slice with the positions of the ratings
+        """
+        if movie_id is None and not per_movie:
+            return slice(None)
+        if self._movie_order is None:
+            self._movie_order = np.argsort(
+                self.movie_codes.astype("uint16") if len(self.movie_ids) <= np.iinfo("uint16").max + 1
+                else self.movie_codes, kind="stable"
+            )
+            self._movie_indptr = np.concatenate(
+                [[0], np.cumsum(np.bincount(self.movie_codes, minlength=len(self.movie_ids)))]
+            )
+        if movie_id is None:
+            return self._movie_order
+
+        position = np.searchsorted(self.movie_ids, movie_id)
+        if position == len(self.movie_ids) or self.movie_ids[position] != movie_id:
+            return self._movie_order[:0]
+        return self._movie_order[self._movie_indptr[position]:self._movie_indptr[position + 1]]
+
+
+def encode_ids(ids: np.ndarray) -> tuple:
+    """
+    Encodes non-negative integer ids as positions in their sorted unique ids, with a dense lookup array
+    instead of sorting the ids when their range is not much larger than their number
+    :param ids: NumPy array with the ids
+    :return: Tuple with NumPy arrays of the sorted unique ids and the int32 codes of the ids
+    """
+    if len(ids) == 0 or ids.min() < 0 or ids.max() > 4 * len(ids):
+        unique_ids, codes = np.unique(ids, return_inverse=True)
+        return unique_ids, codes.astype("int32")
+    present = np.zeros(ids.max() + 1, dtype=bool)
+    present[ids] = True
+    unique_ids = np.flatnonzero(present)
+    codes = np.cumsum(present, dtype="int32") - 1
+    return unique_ids, codes[ids]
+
+
+def days_to_buckets(days: np.ndarray, by: str) -> np.ndarray:
+    """
+    Converts day numbers to day, week or month bucket numbers
+    :param days: NumPy array with the days since 1970-01-01
+    :param by: Bucket size - 'day', 'week' or 'month'
+    :return: NumPy array with the days, the weeks since 1969-12-29 or the months since 1970-01
+    """
+    if by == "day":
+        return days.astype("int64")
+    if by == "week":
+        return (days.astype("int64") + WEEK_START_OFFSET) // 7
+    if by == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+    raise ValueError(f"Unknown time bucket '{by}'. Available buckets: {', '.join(TIME_BUCKETS)}")
+
+
+def buckets_to_dates(buckets: np.ndarray, by: str) -> np.ndarray:
+    """
+    Converts bucket numbers to the start dates of the buckets
+    :param buckets: NumPy array with the bucket numbers, see days_to_buckets
+    :param by: Bucket size - 'day', 'week' or 'month'
+    :return: NumPy array with the start dates of the buckets
+    """
+    buckets = np.asarray(buckets, dtype="int64")
+    if by == "week":
+        return (buckets * 7 - WEEK_START_OFFSET).astype("datetime64[D]").astype("datetime64[ns]")
+    if by == "month":
+        return buckets.astype("datetime64[M]").astype("datetime64[ns]")
+    return buckets.astype("datetime64[D]").astype("datetime64[ns]")
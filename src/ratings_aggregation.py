@@ -0,0 +1,290 @@
+import numpy as np
+import pandas as pd
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from id_mapping import IdMapping
+from utils import (
+    logger,
+    read_csv,
+    parse_dates,
+    read_csv_chunks,
+    resolve_file_paths
+)
+
+
+class RatingsAggregate:
+    """
+    A class for the per-movie rating sums, counts, minimums and maximums kept in compact NumPy arrays indexed by movie id,
+    so the memory usage is proportional to the number of movies and not to the number of ratings
+    ...
+
+    Attributes
+    ----------
+    rating_sums : np.ndarray
+        sum of the ratings of every movie id
+    rating_counts : np.ndarray
+        number of ratings of every movie id
+    rating_mins : np.ndarray
+        minimal rating of every movie id
+    rating_maxs : np.ndarray
+        maximal rating of every movie id
+
+    Methods
+    -------
+    from_frame(ratings_df):
+        Creates the aggregate of a ratings data frame
+    from_csv(file_path, chunksize, schema):
+        Creates the aggregate of a ratings CSV file read in chunks
+    from_csv_files(file_paths, chunksize, schema, workers):
+        Creates the aggregate of ratings CSV shards, aggregated in parallel by a process pool
+    update(movie_ids, ratings):
+        Adds ratings to the aggregate
+    merge(other):
+        Adds the ratings of another aggregate
+    map_movie_ids(id_mapping):
+        Gets the aggregate of the ratings with translated movie ids
+    get_average_ratings(movie_ids):
+        Gets the number of ratings, the average, minimal and maximal rating of the rated movies
+    """
+
+    def __init__(self):
+        self.rating_sums = np.zeros(0, dtype="float64")
+        self.rating_counts = np.zeros(0, dtype="int64")
+        self.rating_mins = np.zeros(0, dtype="float64")
+        self.rating_maxs = np.zeros(0, dtype="float64")
+
+    @classmethod
+    def from_frame(cls, ratings_df: pd.DataFrame):
+        """
+        Creates the aggregate of a ratings data frame
+        :param ratings_df: Pandas data frame with 'movieId' and 'rating' columns
+        :return: RatingsAggregate object
+        """
+        ratings_aggregate = cls()
+        ratings_aggregate.update(ratings_df["movieId"].to_numpy(), ratings_df["rating"].to_numpy())
+        return ratings_aggregate
+
+    @classmethod
+    def from_csv(cls, file_path: str, chunksize: int, schema: dict = None):
+        """
+        Creates the aggregate of a ratings CSV file read in chunks, so only one chunk is in memory at a time
+        :param file_path: Ratings CSV file path
+        :param chunksize: Number of ratings per chunk
+        :param schema: Ratings table schema dictionary, see read_csv
+        :return: RatingsAggregate object
+        """
+        schema = dict(schema if schema else {}, usecols=["movieId", "rating"])
+        ratings_aggregate = cls()
+        for ratings_chunk in read_csv_chunks(file_path, chunksize=chunksize, schema=schema):
+            ratings_aggregate.update(ratings_chunk["movieId"].to_numpy(), ratings_chunk["rating"].to_numpy())
+
+        logger.info(f"Aggregated the ratings of {len(ratings_aggregate.get_movie_ids())} movies from {file_path}.")
+        return ratings_aggregate
+
+    @classmethod
+    def from_csv_files(cls, file_paths, chunksize: int = None, schema: dict = None, workers: int = None):
+        """
+        Creates the aggregate of ratings CSV shards. Every shard is aggregated by a worker process
+        and the partial aggregates are merged in the shards order, so the result does not depend on the workers.
+        :param file_paths: CSV file path, glob pattern or list of them, see resolve_file_paths
+        :param chunksize: Number of ratings per chunk, None to read every shard at once
+        :param schema: Ratings table schema dictionary, see read_csv
+        :param workers: Number of worker processes, None or 1 to aggregate the shards serially
+        :return: RatingsAggregate object
+        """
+        resolved_file_paths = resolve_file_paths(file_paths)
+        if workers and workers > 1 and len(resolved_file_paths) > 1:
+            logger.info(f"Aggregating {len(resolved_file_paths)} ratings shards with {workers} worker processes.")
+            with ProcessPoolExecutor(max_workers=min(workers, len(resolved_file_paths))) as executor:
+                partial_aggregates = list(
+                    executor.map(aggregate_ratings_file, resolved_file_paths, repeat(chunksize), repeat(schema))
+                )
+        else:
+            partial_aggregates = [
+                aggregate_ratings_file(file_path, chunksize, schema) for file_path in resolved_file_paths
+            ]
+
+        ratings_aggregate = cls()
+        for partial_aggregate in partial_aggregates:
+            ratings_aggregate.merge(partial_aggregate)
+
+        return ratings_aggregate
+
+    def update(self, movie_ids: np.ndarray, ratings: np.ndarray) -> None:
+        """
+        Adds ratings to the aggregate. The missing ratings are ignored, the same as by SQL AVG.
+        :param movie_ids: NumPy array with the movie ids of the ratings
+        :param ratings: NumPy array with the ratings
+        """
+        movie_ids = np.asarray(movie_ids)
+        ratings = np.asarray(ratings, dtype="float64")
+        valid_ratings = ~np.isnan(ratings)
+        if np.issubdtype(movie_ids.dtype, np.floating):
+            valid_ratings &= ~np.isnan(movie_ids)
+        movie_ids = movie_ids[valid_ratings].astype("int64")
+        ratings = ratings[valid_ratings]
+        if len(movie_ids) == 0:
+            return
+        if movie_ids.min() < 0:
+            raise ValueError("Movie ids must not be negative.")
+
+        size = int(movie_ids.max()) + 1
+        self._resize(size)
+        self.rating_sums[:size] += np.bincount(movie_ids, weights=ratings, minlength=size)
+        self.rating_counts[:size] += np.bincount(movie_ids, minlength=size)
+        np.minimum.at(self.rating_mins, movie_ids, ratings)
+        np.maximum.at(self.rating_maxs, movie_ids, ratings)
+
+    def merge(self, other) -> None:
+        """
+        Adds the ratings of another aggregate, e.g. the partial aggregate of a ratings shard
+        :param other: RatingsAggregate object
+        """
+        size = len(other.rating_counts)
+        self._resize(size)
+        self.rating_sums[:size] += other.rating_sums
+        self.rating_counts[:size] += other.rating_counts
+        np.minimum(self.rating_mins[:size], other.rating_mins, out=self.rating_mins[:size])
+        np.maximum(self.rating_maxs[:size], other.rating_maxs, out=self.rating_maxs[:size])
+
+    def map_movie_ids(self, id_mapping: IdMapping):
+        """
+        Gets the aggregate of the ratings with translated movie ids, e.g. the MovieLens ids of the ratings translated
+        to the TMDB ids of the movies metadata. The per-movie aggregates are translated instead of the ratings,
+        so the cost depends on the number of movies. The ratings of ids without a translation are dropped
+        and the ratings of ids translated to the same id are merged.
+        :param id_mapping: IdMapping object
+        :return: RatingsAggregate object
+        """
+        movie_ids = self.get_movie_ids()
+        mapped_ids = id_mapping.map_ids(movie_ids)
+        movie_ids, mapped_ids = movie_ids[mapped_ids >= 0], mapped_ids[mapped_ids >= 0]
+
+        ratings_aggregate = self.__class__()
+        if len(mapped_ids) == 0:
+            return ratings_aggregate
+        size = int(mapped_ids.max()) + 1
+        ratings_aggregate._resize(size)
+        ratings_aggregate.rating_sums[:size] += np.bincount(
+            mapped_ids, weights=self.rating_sums[movie_ids], minlength=size
+        )
+        ratings_aggregate.rating_counts[:size] += np.bincount(
+            mapped_ids, weights=self.rating_counts[movie_ids], minlength=size
+        ).astype("int64")
+        np.minimum.at(ratings_aggregate.rating_mins, mapped_ids, self.rating_mins[movie_ids])
+        np.maximum.at(ratings_aggregate.rating_maxs, mapped_ids, self.rating_maxs[movie_ids])
+        return ratings_aggregate
+
+    def get_movie_ids(self) -> np.ndarray:
+        """
+        Gets the ids of the rated movies
+        :return: Sorted NumPy array with movie ids
+        """
+        return np.flatnonzero(self.rating_counts)
+
+    def get_average_ratings(self, movie_ids: np.ndarray = None) -> pd.DataFrame:
+        """
+        Gets the number of ratings, the average, minimal and maximal rating of the rated movies
+        :param movie_ids: Sorted NumPy array with the ids of rated movies, all rated movies by default
+        :return: Pandas data frame with 'movieId', 'rating_count', 'average_rating', 'min_rating' and 'max_rating'
+        columns ordered by movie id
+        """
+        movie_ids = self.get_movie_ids() if movie_ids is None else movie_ids
+        rating_counts = self.rating_counts[movie_ids]
+        return pd.DataFrame(
+            {
+                "movieId": movie_ids,
+                "rating_count": rating_counts,
+                "average_rating": self.rating_sums[movie_ids] / rating_counts,
+                "min_rating": self.rating_mins[movie_ids],
+                "max_rating": self.rating_maxs[movie_ids]
+            }
+        )
+
+    def _resize(self, size: int) -> None:
+        """
+        Grows the aggregate arrays to cover the movie ids below size
+        :param size: Minimal arrays size
+        """
+        if size <= len(self.rating_counts):
+            return
+        # Growing geometrically, so the arrays are reallocated only a few times while streaming
+        new_size = max(size, 2 * len(self.rating_counts))
+        self.rating_sums = np.concatenate([self.rating_sums, np.zeros(new_size - len(self.rating_sums))])
+        self.rating_counts = np.concatenate(
+            [self.rating_counts, np.zeros(new_size - len(self.rating_counts), dtype="int64")]
+        )
+        self.rating_mins = np.concatenate([self.rating_mins, np.full(new_size - len(self.rating_mins), np.inf)])
+        self.rating_maxs = np.concatenate([self.rating_maxs, np.full(new_size - len(self.rating_maxs), -np.inf)])
+
+
+def aggregate_ratings_file(file_path: str, chunksize: int = None, schema: dict = None) -> RatingsAggregate:
+    """
+    Aggregates the ratings of a CSV file, the task of a worker process aggregating ratings shards
+    :param file_path: Ratings CSV file path
+    :param chunksize: Number of ratings per chunk, None to read the file at once
+    :param schema: Ratings table schema dictionary, see read_csv
+    :return: RatingsAggregate object
+    """
+    if chunksize:
+        return RatingsAggregate.from_csv(file_path, chunksize=chunksize, schema=schema)
+
+    schema = dict(schema if schema else {}, usecols=["movieId", "rating"])
+    return RatingsAggregate.from_frame(read_csv(file_path, schema=schema))
+
+
+def summarize_movie_ratings(ratings_aggregate: RatingsAggregate, movies_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Joins the per-movie rating aggregates with the movies metadata. Only the rated movies present in the
+    movies metadata are returned and the first row of the duplicated movie ids is used.
+    :param ratings_aggregate: RatingsAggregate object
+    :param movies_df: Pandas data frame with the movies 'id', 'original_title' and 'release_date' columns
+    :return: Pandas data frame with 'id', 'title', 'release_year', 'rating_count', 'average_rating', 'min_rating'
+    and 'max_rating' columns ordered by movie id
+    """
+    average_ratings = ratings_aggregate.get_average_ratings()
+
+    # Movies metadata indexed by the numeric movie id
+    movies = movies_df.set_axis(pd.to_numeric(movies_df["id"], errors="coerce"))
+    movies = movies[movies.index.notna() & ~movies.index.duplicated(keep="first")]
+    release_dates = parse_dates(movies["release_date"])
+
+    # Inner join semantics - only the ratings of known movies are returned
+    average_ratings = average_ratings[average_ratings["movieId"].isin(movies.index)]
+    movie_ids = average_ratings["movieId"].to_numpy()
+
+    return pd.DataFrame(
+        {
+            "id": movie_ids.astype("int64"),
+            "title": movies["original_title"].reindex(movie_ids).to_numpy(),
+            "release_year": release_dates.dt.year.reindex(movie_ids).to_numpy(dtype="float64"),
+            "rating_count": average_ratings["rating_count"].to_numpy(),
+            "average_rating": average_ratings["average_rating"].to_numpy(),
+            "min_rating": average_ratings["min_rating"].to_numpy(),
+            "max_rating": average_ratings["max_rating"].to_numpy()
+        }
+    )
+
+
+def select_top_n(values: np.ndarray, tie_breakers: np.ndarray, n: int) -> np.ndarray:
+    """
+    Selects the positions of the n highest values with partial selection instead of sorting all the values.
+    Equal values are ordered by ascending tie breaker.
+    :param values: NumPy array with the values
+    :param tie_breakers: NumPy array with the tie breakers of the values, e.g. the movie ids
+    :param n: Number of positions to be selected
+    :return: NumPy array with the positions of the n highest values in descending order
+    """
+    if n <= 0 or len(values) == 0:
+        return np.zeros(0, dtype="int64")
+
+    if n < len(values):
+        # All the values equal to the n-th highest one are candidates, so the ties are resolved by the tie breaker
+        kth_position = len(values) - n
+        threshold = np.partition(values, kth_position)[kth_position]
+        candidates = np.flatnonzero(values >= threshold)
+    else:
+        candidates = np.arange(len(values))
+
+    order = np.lexsort((tie_breakers[candidates], -values[candidates]))
+    return candidates[order[:n]]
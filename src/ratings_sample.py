@@ -0,0 +1,304 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from id_mapping import IdMapping
+from utils import (
+    logger,
+    read_csv,
+    resolve_file_paths
+)
+
+# Number of rows of the blocks of a ratings data frame
+FRAME_BLOCK_ROWS = 65536
+
+
+class RatingsSample:
+    """
+    A class for the block sample of a ratings table - the per-movie rating sums and counts of a simple random sample
+    of the blocks of every ratings shard, e.g. byte ranges of the ratings CSV files, so only the sampled blocks
+    are read and parsed. Every shard is a stratum and the samples of the shards are merged into one stratified sample.
+    The average rating of every movie is the ratio of its estimated rating sum and count, with the standard error
+    of a cluster sample, as the ratings of a block are not independent.
+    ...
+
+    Attributes
+    ----------
+    strata_blocks_count : np.ndarray
+        number of blocks of every stratum
+    strata_sampled_count : np.ndarray
+        number of sampled blocks of every stratum
+    block_strata : np.ndarray
+        stratum of every sampled block
+    movie_ids : np.ndarray
+        movie id of every sampled block and movie pair
+    block_codes : np.ndarray
+        sampled block of every pair, its position in block_strata
+    rating_sums : np.ndarray
+        sum of the ratings of every pair
+    rating_counts : np.ndarray
+        number of ratings of every pair
+
+    Methods
+    -------
+    from_frame(ratings_df, fraction, block_rows, seed):
+        Samples the row blocks of a ratings data frame
+    from_csv_files(file_paths, fraction, block_bytes, seed, schema, workers):
+        Samples the byte blocks of ratings CSV shards, sampled in parallel by a process pool
+    add_stratum(blocks_count, sampled_blocks):
+        Adds a stratum with the ratings of its sampled blocks
+    merge(other):
+        Adds the strata of another sample
+    map_movie_ids(id_mapping):
+        Gets the sample with translated movie ids
+    get_average_ratings():
+        Gets the estimated number of ratings and average rating of the sampled movies and the standard error
+    """
+
+    def __init__(self):
+        self.strata_blocks_count = np.zeros(0, dtype="int64")
+        self.strata_sampled_count = np.zeros(0, dtype="int64")
+        self.block_strata = np.zeros(0, dtype="int64")
+        self.movie_ids = np.zeros(0, dtype="int64")
+        self.block_codes = np.zeros(0, dtype="int64")
+        self.rating_sums = np.zeros(0, dtype="float64")
+        self.rating_counts = np.zeros(0, dtype="int64")
+
+    @classmethod
+    def from_frame(cls, ratings_df: pd.DataFrame, fraction: float = 0.1, block_rows: int = FRAME_BLOCK_ROWS,
+                   seed=0):
+        """
+        Samples the row blocks of a ratings data frame as one stratum
+        :param ratings_df: Pandas data frame with 'movieId' and 'rating' columns
+        :param fraction: Fraction of the blocks to be sampled, 1 to read all of them
+        :param block_rows: Number of rows of every block
+        :param seed: Seed of the blocks sample
+        :return: RatingsSample object
+        """
+        blocks_count = max(-(-len(ratings_df) // block_rows), 1)
+        movie_ids = ratings_df["movieId"].to_numpy()
+        ratings = ratings_df["rating"].to_numpy()
+        ratings_sample = cls()
+        block_slices = [
+            slice(block * block_rows, (block + 1) * block_rows) for block in sample_blocks(blocks_count, fraction, seed)
+        ]
+        ratings_sample.add_stratum(blocks_count, [(movie_ids[rows], ratings[rows]) for rows in block_slices])
+        return ratings_sample
+
+    @classmethod
+    def from_csv_files(cls, file_paths, fraction: float = 0.1, block_bytes: int = 1048576, seed: int = 0,
+                       schema: dict = None, workers: int = None):
+        """
+        Samples the byte blocks of ratings CSV shards, every shard as one stratum. Every shard is sampled by a worker
+        process with its own seed and the shard samples are merged in the shards order, so the result does not
+        depend on the workers.
+        :param file_paths: CSV file path, glob pattern or list of them, see resolve_file_paths
+        :param fraction: Fraction of the blocks of every shard to be sampled, 1 to read all of them
+        :param block_bytes: Number of bytes of every block
+        :param seed: Seed of the blocks sample, the seeds of the shards are spawned from it
+        :param schema: Ratings table schema dictionary, see read_csv
+        :param workers: Number of worker processes, None or 1 to sample the shards serially
+        :return: RatingsSample object
+        """
+        resolved_file_paths = resolve_file_paths(file_paths)
+        shard_seeds = np.random.SeedSequence(seed).spawn(len(resolved_file_paths))
+        arguments = (resolved_file_paths, repeat(fraction), repeat(block_bytes), shard_seeds, repeat(schema))
+        if workers and workers > 1 and len(resolved_file_paths) > 1:
+            logger.info(f"Sampling {len(resolved_file_paths)} ratings shards with {workers} worker processes.")
+            with ProcessPoolExecutor(max_workers=min(workers, len(resolved_file_paths))) as executor:
+                shard_samples = list(executor.map(sample_ratings_file, *arguments))
+        else:
+            shard_samples = list(map(sample_ratings_file, *arguments))
+
+        ratings_sample = cls()
+        for shard_sample in shard_samples:
+            ratings_sample.merge(shard_sample)
+        return ratings_sample
+
+    def merge(self, other) -> None:
+        """
+        Adds the strata of another sample, e.g. the sample of a shard or of appended ratings
+        :param other: RatingsSample object
+        """
+        self.movie_ids = np.concatenate([self.movie_ids, other.movie_ids])
+        self.block_codes = np.concatenate([self.block_codes, other.block_codes + len(self.block_strata)])
+        self.rating_sums = np.concatenate([self.rating_sums, other.rating_sums])
+        self.rating_counts = np.concatenate([self.rating_counts, other.rating_counts])
+        self.block_strata = np.concatenate([self.block_strata, other.block_strata + len(self.strata_blocks_count)])
+        self.strata_blocks_count = np.concatenate([self.strata_blocks_count, other.strata_blocks_count])
+        self.strata_sampled_count = np.concatenate([self.strata_sampled_count, other.strata_sampled_count])
+
+    def map_movie_ids(self, id_mapping: IdMapping):
+        """
+        Gets the sample with translated movie ids. The ratings of ids without a translation are dropped
+        and the ratings of a block of ids translated to the same id are added up.
+        :param id_mapping: IdMapping object
+        :return: RatingsSample object
+        """
+        ratings_sample = self.__class__()
+        ratings_sample.strata_blocks_count = self.strata_blocks_count
+        ratings_sample.strata_sampled_count = self.strata_sampled_count
+        ratings_sample.block_strata = self.block_strata
+        mapped_ids = id_mapping.map_ids(self.movie_ids)
+        mapped = mapped_ids >= 0
+        pairs, pair_codes = np.unique(
+            np.stack([self.block_codes[mapped], mapped_ids[mapped]]), axis=1, return_inverse=True
+        )
+        ratings_sample.block_codes, ratings_sample.movie_ids = pairs
+        ratings_sample.rating_sums = np.bincount(
+            pair_codes, weights=self.rating_sums[mapped], minlength=pairs.shape[1]
+        )
+        ratings_sample.rating_counts = np.bincount(
+            pair_codes, weights=self.rating_counts[mapped], minlength=pairs.shape[1]
+        ).astype("int64")
+        return ratings_sample
+
+    def get_average_ratings(self) -> pd.DataFrame:
+        """
+        Gets the estimated number of ratings and average rating of the sampled movies. The ratings of a stratum are
+        weighted by its blocks count divided by its sampled blocks count. The standard error is the one of a ratio
+        estimator of a stratified cluster sample - 0 for the movies of the fully read strata and NaN for the movies
+        sampled from a single block of the partially read strata, whose error cannot be estimated.
+        :return: Pandas data frame with 'movieId', 'rating_count', 'sample_count', 'average_rating'
+        and 'average_rating_error' columns ordered by movie id
+        """
+        movie_ids, movie_codes = np.unique(self.movie_ids, return_inverse=True)
+        movies_count = len(movie_ids)
+        pair_strata = self.block_strata[self.block_codes]
+        weights = (self.strata_blocks_count / np.maximum(self.strata_sampled_count, 1))[pair_strata]
+        estimated_counts = np.bincount(movie_codes, weights=weights * self.rating_counts, minlength=movies_count)
+        estimated_sums = np.bincount(movie_codes, weights=weights * self.rating_sums, minlength=movies_count)
+        average_ratings = estimated_sums / np.maximum(estimated_counts, 1)
+
+        # Linearized variance of the ratio, from the residuals of the blocks of every stratum and movie,
+        # the blocks without ratings of the movie have a residual of 0
+        residuals = self.rating_sums - average_ratings[movie_codes] * self.rating_counts
+        strata_count = len(self.strata_blocks_count)
+        group_codes = movie_codes * strata_count + pair_strata
+        residual_sums = np.bincount(group_codes, weights=residuals, minlength=movies_count * strata_count)
+        squared_residual_sums = np.bincount(
+            group_codes, weights=residuals ** 2, minlength=movies_count * strata_count
+        )
+        sampled_count = np.tile(self.strata_sampled_count, movies_count)
+        blocks_count = np.tile(self.strata_blocks_count, movies_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            residual_variances = (squared_residual_sums - residual_sums ** 2 / sampled_count) / (sampled_count - 1)
+            strata_variances = np.where(
+                sampled_count < blocks_count,
+                blocks_count ** 2 * (1 - sampled_count / blocks_count) / sampled_count * residual_variances,
+                0
+            )
+        variances = (
+            strata_variances.reshape(movies_count, strata_count).sum(axis=1) / np.maximum(estimated_counts, 1) ** 2
+        )
+
+        partially_read = (self.strata_sampled_count < self.strata_blocks_count)[pair_strata]
+        single_block = np.bincount(movie_codes, weights=partially_read, minlength=movies_count) == 1
+        return pd.DataFrame(
+            {
+                "movieId": movie_ids,
+                "rating_count": np.round(estimated_counts).astype("int64"),
+                "sample_count": np.bincount(movie_codes, weights=self.rating_counts, minlength=movies_count)
+                .astype("int64"),
+                "average_rating": average_ratings,
+                "average_rating_error": np.where(single_block, np.nan, np.sqrt(variances))
+            }
+        )
+
+    def add_stratum(self, blocks_count: int, sampled_blocks: list) -> None:
+        """
+        Adds a stratum with the ratings of its sampled blocks, aggregated per block and movie.
+        The missing ratings are ignored, the same as by SQL AVG.
+        :param blocks_count: Number of blocks of the stratum
+        :param sampled_blocks: List with a tuple of the movie ids and ratings NumPy arrays of every sampled block
+        """
+        stratum = len(self.strata_blocks_count)
+        block_code = len(self.block_strata)
+        movie_ids, block_codes = [self.movie_ids], [self.block_codes]
+        rating_sums, rating_counts = [self.rating_sums], [self.rating_counts]
+        for block_movie_ids, block_ratings in sampled_blocks:
+            block_ratings = np.asarray(block_ratings, dtype="float64")
+            block_movie_ids = np.asarray(block_movie_ids, dtype="float64")
+            valid_ratings = ~(np.isnan(block_ratings) | np.isnan(block_movie_ids))
+            unique_movie_ids, codes = np.unique(block_movie_ids[valid_ratings].astype("int64"), return_inverse=True)
+            movie_ids.append(unique_movie_ids)
+            block_codes.append(np.full(len(unique_movie_ids), block_code, dtype="int64"))
+            rating_sums.append(
+                np.bincount(codes, weights=block_ratings[valid_ratings], minlength=len(unique_movie_ids))
+            )
+            rating_counts.append(np.bincount(codes, minlength=len(unique_movie_ids)))
+            block_code += 1
+
+        self.movie_ids = np.concatenate(movie_ids)
+        self.block_codes = np.concatenate(block_codes)
+        self.rating_sums = np.concatenate(rating_sums)
+        self.rating_counts = np.concatenate(rating_counts).astype("int64")
+        self.block_strata = np.concatenate(
+            [self.block_strata, np.full(len(sampled_blocks), stratum, dtype="int64")]
+        )
+        self.strata_blocks_count = np.append(self.strata_blocks_count, blocks_count)
+        self.strata_sampled_count = np.append(self.strata_sampled_count, len(sampled_blocks))
+
+
+def sample_blocks(blocks_count: int, fraction: float, seed) -> np.ndarray:
+    """
+    Draws a simple random sample of blocks. At least 2 blocks are sampled, so the sampling error can be estimated.
+    :param blocks_count: Number of blocks
+    :param fraction: Fraction of the blocks to be sampled
+    :param seed: Seed of the sample
+    :return: Sorted NumPy array with the sampled block numbers
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"The sample fraction must be in (0, 1], got {fraction}.")
+    sampled_count = min(max(int(round(fraction * blocks_count)), 2), blocks_count)
+    if sampled_count == blocks_count:
+        return np.arange(blocks_count)
+    return np.sort(np.random.default_rng(seed).choice(blocks_count, sampled_count, replace=False))
+
+
+def read_csv_block(file_path: str, header: bytes, block_start: int, block_bytes: int, schema: dict = None):
+    """
+    Reads the rows of a CSV file starting in a byte range, the rows are assumed to have no quoted line breaks
+    :param file_path: CSV file path
+    :param header: Header line of the file
+    :param block_start: Offset of the block in the file, at least the header length
+    :param block_bytes: Number of bytes of the block
+    :param schema: Table schema dictionary, see read_csv
+    :return: Pandas data frame with the rows starting in the block
+    """
+    with open(file_path, "rb") as csv_file:
+        # The byte before the block tells if a row starts at its first byte
+        csv_file.seek(block_start - 1)
+        block = csv_file.read(block_bytes + 1)
+        if block and not block.endswith(b"\n"):
+            block += csv_file.readline()
+    first_row_start = block.find(b"\n") + 1
+    return read_csv(io.BytesIO(header + block[first_row_start:] if first_row_start else header), schema=schema)
+
+
+def sample_ratings_file(file_path: str, fraction: float, block_bytes: int, seed,
+                        schema: dict = None) -> RatingsSample:
+    """
+    Samples the byte blocks of a ratings CSV file, the task of a worker process sampling ratings shards
+    :param file_path: Ratings CSV file path
+    :param fraction: Fraction of the blocks to be sampled
+    :param block_bytes: Number of bytes of every block
+    :param seed: Seed of the blocks sample of the shard
+    :param schema: Ratings table schema dictionary, see read_csv
+    :return: RatingsSample object
+    """
+    schema = dict(schema if schema else {}, usecols=["movieId", "rating"])
+    with open(file_path, "rb") as csv_file:
+        header = csv_file.readline()
+    data_bytes = os.path.getsize(file_path) - len(header)
+    blocks_count = max(-(-data_bytes // block_bytes), 1)
+
+    sampled_blocks = []
+    for block in sample_blocks(blocks_count, fraction, seed):
+        ratings_df = read_csv_block(file_path, header, len(header) + block * block_bytes, block_bytes, schema)
+        sampled_blocks.append((ratings_df["movieId"].to_numpy(), ratings_df["rating"].to_numpy()))
+    ratings_sample = RatingsSample()
+    ratings_sample.add_stratum(blocks_count, sampled_blocks)
+    return ratings_sample
@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import inspect
+import tempfile
+import functools
+import pandas as pd
+from collections import OrderedDict
+from utils import (
+    logger,
+    files_fingerprint
+)
+
+# Version of the query implementations, increased when a change alters the results cached on disk
+QUERY_VERSION = 1
+
+
+class ResultCache:
+    """
+    A class for the size-bounded LRU cache of the MoviesDataSet query results
+    ...
+
+    Attributes
+    ----------
+    max_entries : int
+        maximum number of cached results, the least recently used result is evicted first. 0 disables the cache
+    hits : int
+        number of results returned from the cache
+    misses : int
+        number of results which were not in the cache
+    entries : OrderedDict
+        cached results and the names of the tables they depend on, ordered from least to most recently used
+
+    Methods
+    -------
+    get(key):
+        Gets a cached result
+    put(key, result, tables):
+        Caches a result
+    invalidate(table_name):
+        Removes the cached results depending on a table
+    clear():
+        Removes all cached results
+    get_stats():
+        Gets the cache statistics
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def get(self, key: tuple):
+        """
+        Gets a cached result and marks it as the most recently used
+        :param key: Cache key
+        :return: Cached result or None if the key is not in the cache
+        """
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key: tuple, result, tables: tuple) -> None:
+        """
+        Caches a result and evicts the least recently used results above the size limit
+        :param key: Cache key
+        :param result: Result to be cached
+        :param tables: Names of the tables the result depends on
+        """
+        if self.max_entries <= 0:
+            return
+
+        self.entries[key] = (result, frozenset(tables))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            evicted_key, _ = self.entries.popitem(last=False)
+            logger.info(f"Evicted cached result {evicted_key}.")
+
+    def invalidate(self, table_name: str) -> None:
+        """
+        Removes the cached results depending on a table
+        :param table_name: Name of the changed table
+        """
+        invalidated_keys = [key for key, (_, tables) in self.entries.items() if table_name in tables]
+        for key in invalidated_keys:
+            del self.entries[key]
+
+        if invalidated_keys:
+            logger.info(f"Invalidated {len(invalidated_keys)} cached results depending on the {table_name} table.")
+
+    def clear(self) -> None:
+        """
+        Removes all cached results
+        """
+        self.entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Gets the cache statistics
+        :return: Dictionary with the number of hits, misses, cached entries and the size limit
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries
+        }
+
+
+class DiskResultCache:
+    """
+    A class for the on-disk cache of the MoviesDataSet query results, shared between runs on unchanged input files
+    ...
+
+    Attributes
+    ----------
+    cache_dir : str
+        directory with the cached result files
+    max_bytes : int
+        maximum total size of the cached result files, the least recently used files are evicted first
+    max_age_seconds : int
+        maximum age of a cached result file, None for no age limit
+    verify_hash : bool
+        if true, the content hash of the input files is part of their fingerprint
+
+    Methods
+    -------
+    get_key(method_name, arguments, source_files, schema):
+        Gets the cache key of a query result
+    get(key):
+        Gets a cached result
+    put(key, result):
+        Writes a result to the cache
+    evict():
+        Removes the expired and the least recently used result files above the size limit
+    """
+
+    file_extension = ".pkl"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 ** 3, max_age_seconds: int = None,
+                 verify_hash: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.verify_hash = verify_hash
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, method_name: str, arguments: str, source_files: dict, schema: dict) -> str:
+        """
+        Gets the cache key of a query result from the query and the fingerprints of its input files
+        :param method_name: Query method name
+        :param arguments: Query method arguments representation
+        :param source_files: Dictionary with the names and the CSV files of the tables the result depends on
+        :param schema: Dictionary with the schema of the tables the result depends on
+        :return: Cache key
+        """
+        key_data = {
+            "query_version": QUERY_VERSION,
+            "method_name": method_name,
+            "arguments": arguments,
+            "sources": {
+                table_name: files_fingerprint(file_paths, with_hash=self.verify_hash)
+                for table_name, file_paths in sorted(source_files.items())
+            },
+            "schema": schema
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Gets a cached result
+        :param key: Cache key
+        :return: Cached result or None if the key is not in the cache or the result expired
+        """
+        file_path = self._file_path(key)
+        try:
+            if self.max_age_seconds is not None and time.time() - os.path.getmtime(file_path) > self.max_age_seconds:
+                return None
+            with open(file_path, "rb") as result_file:
+                result = pickle.load(result_file)
+            # The access time is tracked with the modification time for the least recently used eviction
+            os.utime(file_path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        return result
+
+    def put(self, key: str, result) -> None:
+        """
+        Writes a result to the cache. The file is written to a temporary file and renamed,
+        so concurrent runs never read a partially written result.
+        :param key: Cache key
+        :param result: Result to be cached
+        """
+        file_descriptor, temp_file_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as result_file:
+                pickle.dump(result, result_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file_path, self._file_path(key))
+        except Exception as error:
+            logger.error(f"Error occurred in {self.put.__name__} method: {error}")
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the expired and the least recently used result files above the size limit
+        """
+        result_files = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(self.file_extension):
+                continue
+            file_stat = os.stat(os.path.join(self.cache_dir, file_name))
+            result_files.append((file_stat.st_mtime, file_stat.st_size, file_name))
+
+        total_bytes = sum(file_size for _, file_size, _ in result_files)
+        now = time.time()
+        for modified_time, file_size, file_name in sorted(result_files):
+            expired = self.max_age_seconds is not None and now - modified_time > self.max_age_seconds
+            if not expired and total_bytes <= self.max_bytes:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except OSError:
+                continue
+            total_bytes -= file_size
+            logger.info(f"Evicted cached result file {file_name}.")
+
+    def _file_path(self, key: str) -> str:
+        """
+        Gets the path of a cached result file
+        :param key: Cache key
+        :return: File path
+        """
+        return os.path.join(self.cache_dir, f"{key}{self.file_extension}")
+
+
+def cached_query(*tables):
+    """
+    Decorator caching the results of a MoviesDataSet method in the object result cache
+    and, when it is enabled, in the on-disk result cache.
+    The results are cached by method name and arguments, and by the sample settings in approximate mode,
+    and are invalidated when one of the tables changes.
+    :param tables: Names of the tables the method result depends on
+    :return: Decorated method
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound_arguments = signature.bind(self, *args, **kwargs)
+            bound_arguments.apply_defaults()
+            query_arguments = list(bound_arguments.arguments.items())[1:]
+            if self.approximate:
+                # The estimates depend on the sample settings, so they are cached apart from the exact results
+                sample_settings = (
+                    self.config.sample_fraction, self.config.sample_block_bytes, self.config.sampling_seed
+                )
+                query_arguments.append(("approximate", sample_settings))
+            arguments = repr(query_arguments)
+            key = (method.__name__, arguments)
+
+            result = self.result_cache.get(key)
+            if result is not None:
+                logger.info(f"Returning cached result of {self.__class__.__name__} method {method.__name__}.")
+            else:
+                # The on-disk results are valid only for tables loaded from the unchanged source files
+                disk_key = None
+                if self.disk_cache is not None and not self.modified_tables.intersection(tables):
+                    disk_key = self.disk_cache.get_key(
+                        method_name=method.__name__,
+                        arguments=arguments,
+                        source_files={
+                            table_name: self.source_files[table_name]
+                            for table_name in tables if table_name in self.source_files
+                        },
+                        schema={
+                            table_name: self.config.schema.get(table_name)
+                            for table_name in tables if table_name in self.source_files
+                        }
+                    )
+                    result = self.disk_cache.get(disk_key)
+                    if result is not None:
+                        logger.info(
+                            f"Returning on-disk cached result of {self.__class__.__name__} method {method.__name__}."
+                        )
+
+                if result is None:
+                    result = method(self, *args, **kwargs)
+                    if disk_key is not None:
+                        self.disk_cache.put(disk_key, result)
+                self.result_cache.put(key, result, tables)
+
+            # Callers get a copy, so changes to the returned data frame do not alter the cached one
+            return result.copy() if isinstance(result, (pd.DataFrame, pd.Series)) else result
+
+        wrapper.tables = tables
+        return wrapper
+
+    return decorator
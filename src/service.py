@@ -0,0 +1,255 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+from movies_dataset_class import MoviesDataSet
+from utils import logger
+
+# Endpoint paths, the MoviesDataSet query methods they call and the types of their query string parameters
+ENDPOINTS = {
+    "/unique-movies": ("get_unique_movies", {}),
+    "/average-rating": ("get_average_movie_rating", {}),
+    "/top-rated": ("get_top_n_rated_movies", {"n": int, "min_ratings": int, "genre": str}),
+    "/movies-released": ("get_movies_released", {"by": str}),
+    "/movies-by-genre": ("get_movies_count_by_genre", {}),
+    "/rating-trends": ("get_rating_trends", {"by": str, "movie_id": int}),
+    "/trending-movies": ("get_trending_movies", {"n": int, "days": int, "end": str, "min_ratings": int})
+}
+METRICS_PATH = "/metrics"
+LATENCY_PERCENTILES = [50, 90, 99]
+
+
+class QueryService:
+    """
+    A class for the asyncio HTTP service answering the MoviesDataSet queries as JSON endpoints.
+    The dataset is loaded once and the queries run on a worker thread, so the event loop keeps accepting requests
+    while pandas computes. Identical concurrent requests are coalesced into one computation.
+    ...
+
+    Attributes
+    ----------
+    dataset : MoviesDataSet
+        movies dataset the queries are answered from
+    host : str
+        host the service listens on
+    port : int
+        port the service listens on, 0 to pick a free port
+    executor : ThreadPoolExecutor
+        single worker thread running the queries, as MoviesDataSet is not thread-safe
+    in_flight : dict
+        dictionary with the keys of the running queries and their futures, shared by the coalesced requests
+    latencies : dict
+        dictionary with the endpoint paths and the latencies in seconds of their latest requests
+    request_counts : dict
+        dictionary with the endpoint paths and their numbers of requests
+    coalesced_counts : dict
+        dictionary with the endpoint paths and their numbers of requests answered by a running query
+    server : asyncio.Server
+        listening server, None until started
+
+    Methods
+    -------
+    start():
+        Starts listening for requests
+    serve_forever():
+        Starts the service and serves requests until cancelled
+    stop():
+        Stops the service
+    handle_request(method, target):
+        Answers a request
+    get_latency_metrics():
+        Gets the number of requests and the latency percentiles of every endpoint
+    """
+
+    def __init__(self, dataset: MoviesDataSet, host: str = None, port: int = None, latency_window: int = None):
+        self.dataset = dataset
+        self.host = host if host else dataset.config.service_host
+        self.port = dataset.config.service_port if port is None else port
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="movies-query")
+        self.in_flight = {}
+        latency_window = latency_window if latency_window else dataset.config.service_latency_window
+        self.latencies = {path: deque(maxlen=latency_window) for path in ENDPOINTS}
+        self.request_counts = dict.fromkeys(ENDPOINTS, 0)
+        self.coalesced_counts = dict.fromkeys(ENDPOINTS, 0)
+        self.server = None
+
+    async def start(self) -> int:
+        """
+        Starts listening for requests
+        :return: Port the service listens on
+        """
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Query service listening on http://{self.host}:{self.port}")
+        return self.port
+
+    async def serve_forever(self) -> None:
+        """
+        Starts the service and serves requests until cancelled
+        """
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """
+        Stops listening and shuts down the query worker thread
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Query service stopped.")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Reads an HTTP request from a connection, answers it and closes the connection
+        :param reader: Stream reader of the connection
+        :param writer: Stream writer of the connection
+        """
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            # The request headers are not used
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if len(request_line) != 3:
+                status, body = HTTPStatus.BAD_REQUEST, {"error": "Malformed request line."}
+            else:
+                status, body = await self.handle_request(request_line[0], request_line[1])
+
+            body = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except ConnectionError as error:
+            logger.warning(f"Query service connection error: {error}")
+        finally:
+            writer.close()
+
+    async def handle_request(self, method: str, target: str) -> tuple:
+        """
+        Answers a request of a query endpoint or of the latency metrics
+        :param method: HTTP method, only GET is supported
+        :param target: Request target - the endpoint path and the query string, e.g. '/top-rated?n=10'
+        :return: Tuple with the HTTP status and the JSON response body - bytes or a JSON serializable object
+        """
+        url = urlsplit(target)
+        if url.path != METRICS_PATH and url.path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint '{url.path}'."}
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Method {method} is not allowed."}
+        if url.path == METRICS_PATH:
+            return HTTPStatus.OK, self.get_latency_metrics()
+
+        start_time = time.perf_counter()
+        try:
+            method_name, parameter_types = ENDPOINTS[url.path]
+            arguments = {}
+            for name, value in parse_qsl(url.query, keep_blank_values=True):
+                if name not in parameter_types:
+                    raise ValueError(f"Unknown parameter '{name}'. Available parameters: {', '.join(parameter_types)}")
+                arguments[name] = parameter_types[name](value)
+            status, body = HTTPStatus.OK, await self.run_query(url.path, method_name, arguments)
+        except ValueError as error:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except Exception as error:
+            logger.error(f"Error occurred in query service endpoint {url.path}: {error}")
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+
+        self.latencies[url.path].append(time.perf_counter() - start_time)
+        self.request_counts[url.path] += 1
+        return status, body
+
+    async def run_query(self, path: str, method_name: str, arguments: dict) -> bytes:
+        """
+        Runs a MoviesDataSet query method on the worker thread. A request identical to a running query
+        waits for its result instead of running the query again.
+        :param path: Endpoint path
+        :param method_name: MoviesDataSet query method name
+        :param arguments: Dictionary with the query method arguments
+        :return: JSON records of the query result
+        """
+        key = (method_name, tuple(sorted(arguments.items())))
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self.query, method_name, arguments)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced_counts[path] += 1
+
+        # A disconnected client does not cancel the query shared with the coalesced requests
+        return await asyncio.shield(future)
+
+    def query(self, method_name: str, arguments: dict) -> bytes:
+        """
+        Runs a MoviesDataSet query method and serializes its result, the task of the worker thread
+        :param method_name: MoviesDataSet query method name
+        :param arguments: Dictionary with the query method arguments
+        :return: JSON records of the query result
+        """
+        df_query_result = getattr(self.dataset, method_name)(**arguments)
+        return df_query_result.to_json(orient="records", date_format="iso").encode("utf-8")
+
+    def get_latency_metrics(self) -> dict:
+        """
+        Gets the number of requests and the latency percentiles of every endpoint
+        :return: Dictionary with the endpoint paths and their numbers of requests and coalesced requests,
+        and the percentiles and maximum of the latest requests latencies in milliseconds
+        """
+        metrics = {}
+        for path, latencies in self.latencies.items():
+            latencies_ms = np.array(latencies) * 1000
+            metrics[path] = {
+                "requests": self.request_counts[path],
+                "coalesced_requests": self.coalesced_counts[path],
+                **{
+                    f"p{percentile}_ms": float(np.percentile(latencies_ms, percentile)) if len(latencies_ms) else None
+                    for percentile in LATENCY_PERCENTILES
+                },
+                "max_ms": float(latencies_ms.max()) if len(latencies_ms) else None
+            }
+        return metrics
+
+
+def main(argv: list = None) -> int:
+    """
+    Query service command line entry point, e.g.:
+    python src/service.py --port 8080 --snapshot data/movies_dataset/snapshot
+    :param argv: List with the command line arguments, sys.argv by default
+    :return: Exit code
+    """
+    parser = argparse.ArgumentParser(description="Serve the MoviesDataSet queries as JSON endpoints.")
+    parser.add_argument("--host", help="host the service listens on, the configured host by default")
+    parser.add_argument("--port", type=int, help="port the service listens on, the configured port by default")
+    parser.add_argument("--backend", choices=["pandas", "sql", "sqlite"], help="query backend")
+    parser.add_argument("--snapshot", help="snapshot directory the dataset is loaded from instead of the CSV files")
+    parser.add_argument("--test", action="store_true", help="use the test configuration")
+    arguments = parser.parse_args(argv)
+
+    if arguments.snapshot:
+        dataset = MoviesDataSet.from_snapshot(arguments.snapshot, test=arguments.test, backend=arguments.backend)
+    else:
+        dataset = MoviesDataSet(test=arguments.test, backend=arguments.backend)
+    service = QueryService(dataset, host=arguments.host, port=arguments.port)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Version of the snapshot format, snapshots of other versions are rejected
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def save_snapshot(tables: dict, path: str) -> None:
+    """
+    Saves data frames to a snapshot directory with a NumPy .npy file per column and a JSON manifest
+    with the tables, their columns and number of rows. The snapshot is written to a temporary directory
+    and renamed, so a snapshot being written is never read.
+    :param tables: Dictionary with the table names and their data frames
+    :param path: Snapshot directory path, an existing snapshot is replaced
+    """
+    parent_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=f".{os.path.basename(path)}.")
+    try:
+        manifest = {"snapshot_version": SNAPSHOT_VERSION, "tables": {}}
+        for table_name, df in tables.items():
+            columns = []
+            for position, column in enumerate(df.columns):
+                file_name = f"{table_name}.{position}"
+                columns.append(
+                    dict(name=column, file=file_name, **save_column(df[column], os.path.join(temp_dir, file_name)))
+                )
+            manifest["tables"][table_name] = {"rows": len(df), "columns": columns}
+
+        with open(os.path.join(temp_dir, MANIFEST_FILE_NAME), "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        if os.path.isdir(path):
+            # The files of a replaced snapshot stay readable by the processes which mapped them
+            shutil.rmtree(path)
+        os.replace(temp_dir, path)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+
+def load_snapshot(path: str, mmap: bool = True) -> dict:
+    """
+    Loads the data frames of a snapshot directory, see save_snapshot. The numeric, datetime and category code columns
+    are memory-mapped, so the processes loading the same snapshot share its pages and only the string columns
+    are decoded.
+    :param path: Snapshot directory path
+    :param mmap: If true, the columns are memory-mapped read-only, otherwise they are read to memory
+    :return: Dictionary with the table names and their data frames
+    """
+    with open(os.path.join(path, MANIFEST_FILE_NAME), "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("snapshot_version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {manifest.get('snapshot_version')} of {path}, "
+            f"expected version {SNAPSHOT_VERSION}."
+        )
+
+    mmap_mode = "r" if mmap else None
+    tables = {}
+    for table_name, table in manifest["tables"].items():
+        columns = {
+            column["name"]: load_column(os.path.join(path, column["file"]), column, mmap_mode)
+            for column in table["columns"]
+        }
+        # copy=False keeps a block per memory-mapped column instead of consolidating them into new arrays
+        tables[table_name] = pd.DataFrame(columns, index=pd.RangeIndex(table["rows"]), copy=False)
+
+    return tables
+
+
+def save_column(values: pd.Series, file_path: str) -> dict:
+    """
+    Saves a data frame column to .npy files. NumPy dtype columns are saved as they are, category columns
+    as their codes and string columns as the UTF-8 bytes of all values with their offsets and missing values mask.
+    :param values: Pandas series with the column values
+    :param file_path: Path of the column files without the extension
+    :return: Dictionary with the column kind - 'array', 'category' or 'string', and the category attributes
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        np.save(f"{file_path}.codes.npy", values.cat.codes.to_numpy())
+        return {
+            "kind": "category",
+            "categories": values.cat.categories.tolist(),
+            "ordered": bool(values.cat.ordered)
+        }
+
+    if values.dtype == object:
+        if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+            raise ValueError(f"Column '{values.name}' has non-string objects, which cannot be saved to a snapshot.")
+        missing_values = values.isna().to_numpy()
+        encoded_values = [value.encode("utf-8") for value in values[~missing_values]]
+        lengths = np.zeros(len(values), dtype="int64")
+        lengths[~missing_values] = [len(encoded_value) for encoded_value in encoded_values]
+        np.save(f"{file_path}.offsets.npy", np.concatenate([[0], np.cumsum(lengths)]))
+        np.save(f"{file_path}.data.npy", np.frombuffer(b"".join(encoded_values), dtype="uint8"))
+        np.save(f"{file_path}.missing.npy", missing_values)
+        return {"kind": "string"}
+
+    if not isinstance(values.dtype, np.dtype):
+        raise ValueError(f"Column '{values.name}' has {values.dtype} dtype, which cannot be saved to a snapshot.")
+    np.save(f"{file_path}.npy", values.to_numpy())
+    return {"kind": "array"}
+
+
+def load_column(file_path: str, column: dict, mmap_mode: str = None):
+    """
+    Loads a data frame column saved by save_column
+    :param file_path: Path of the column files without the extension
+    :param column: Dictionary with the column manifest - its kind and category attributes
+    :param mmap_mode: NumPy memory-map mode, None to read the column to memory
+    :return: NumPy array or pandas Categorical with the column values
+    """
+    if column["kind"] == "category":
+        return pd.Categorical.from_codes(
+            load_array(f"{file_path}.codes.npy", mmap_mode),
+            categories=column["categories"],
+            ordered=column["ordered"],
+            validate=False
+        )
+
+    if column["kind"] == "string":
+        offsets = np.load(f"{file_path}.offsets.npy").tolist()
+        data = np.load(f"{file_path}.data.npy").tobytes()
+        values = np.array(
+            [data[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])], dtype=object
+        )
+        values[np.load(f"{file_path}.missing.npy")] = np.nan
+        return values
+
+    return load_array(f"{file_path}.npy", mmap_mode)
+
+
+def load_array(file_path: str, mmap_mode: str = None) -> np.ndarray:
+    """
+    Loads a .npy file as a plain NumPy array, a view of the memory map when it is memory-mapped
+    :param file_path: .npy file path
+    :param mmap_mode: NumPy memory-map mode, None to read the array to memory
+    :return: NumPy array
+    """
+    return np.asarray(np.load(file_path, mmap_mode=mmap_mode))
@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import pandas as pd
+from utils import (
+    logger,
+    apply_schema,
+    read_csv_files,
+    files_fingerprint,
+    format_date_columns
+)
+
+
+class SqliteStore:
+    """
+    A class for the persistent SQLite store of the movies dataset tables
+    ...
+
+    Attributes
+    ----------
+    db_path : str
+        SQLite database file path
+    verify_hash : bool
+        if true, the content hash of the source files is compared in addition to their size and modification time
+    schema : dict
+        dictionary with the tables schema used when ingesting the CSV files and reading the tables
+    connection : sqlite3.Connection
+        connection to the SQLite database
+
+    Methods
+    -------
+    sync(source_files):
+        Ingests the source CSV files which changed since the last ingestion
+    is_up_to_date(table_name, file_path):
+        Checks if a table was ingested from the current version of its CSV files
+    ingest(table_name, file_path):
+        Ingests CSV files into a store table
+    write_table(table_name, df):
+        Writes a data frame into a store table
+    append_rows(table_name, df):
+        Appends the rows of a data frame to a store table
+    read_table(table_name, columns):
+        Reads a store table into a data frame
+    query(query):
+        Runs a SQL query against the store
+    close():
+        Closes the store connection
+    """
+
+    # Indexed columns of the store tables
+    table_indexes = {
+        "movies": ["id"],
+        "ratings": ["movieId"],
+        "genres": ["id"],
+        "links": ["movieId"]
+    }
+
+    def __init__(self, db_path: str, verify_hash: bool = False, schema: dict = None):
+        self.db_path = db_path
+        self.verify_hash = verify_hash
+        self.schema = schema if schema else {}
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        # Table with the fingerprints of the ingested source files
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS source_files (
+                table_name TEXT PRIMARY KEY,
+                file_path TEXT,
+                fingerprint TEXT
+            );
+            """
+        )
+        self.connection.commit()
+
+    def sync(self, source_files: dict) -> list:
+        """
+        Ingests the source CSV files which changed since the last ingestion
+        :param source_files: Dictionary with table names and their CSV file paths or glob patterns
+        :return: List with the names of the ingested tables
+        """
+        ingested_tables = []
+        for table_name, file_path in source_files.items():
+            if self.is_up_to_date(table_name, file_path):
+                logger.info(f"The {table_name} store table is up to date with CSV file: {file_path}")
+                continue
+            self.ingest(table_name, file_path)
+            ingested_tables.append(table_name)
+
+        return ingested_tables
+
+    def is_up_to_date(self, table_name: str, file_path) -> bool:
+        """
+        Checks if a table was ingested from the current version of its CSV files
+        :param table_name: Store table name
+        :param file_path: CSV file path, glob pattern or list of them
+        :return: True if the stored fingerprint matches the files fingerprint
+        """
+        row = self.connection.execute(
+            "SELECT fingerprint FROM source_files WHERE table_name = ?;", (table_name,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return False
+
+        return json.loads(row[0]) == self._source_fingerprint(table_name, file_path)
+
+    def ingest(self, table_name: str, file_path) -> None:
+        """
+        Ingests CSV files into a store table
+        :param table_name: Store table name
+        :param file_path: CSV file path, glob pattern or list of them
+        """
+        df = read_csv_files(file_path, schema=self.schema.get(table_name))
+        self.write_table(table_name, df)
+        fingerprint = json.dumps(self._source_fingerprint(table_name, file_path))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO source_files (table_name, file_path, fingerprint) VALUES (?, ?, ?);",
+            (table_name, str(file_path), fingerprint)
+        )
+        self.connection.commit()
+        logger.info(f"The {table_name} store table was ingested from CSV file: {file_path}")
+
+    def write_table(self, table_name: str, df: pd.DataFrame) -> None:
+        """
+        Writes a data frame into a store table and creates its indexes.
+        The table is detached from its source file, so the next sync ingests the file again.
+        The dates are stored as ISO date strings.
+        :param table_name: Store table name
+        :param df: Pandas data frame to be written
+        """
+        function_name = self.write_table.__name__
+        try:
+            df = format_date_columns(df)
+            df.to_sql(name=table_name, con=self.connection, if_exists="replace", index=False, chunksize=100000)
+            for column in self.table_indexes.get(table_name, []):
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {table_name} ({column});"
+                )
+            self.connection.execute(
+                "UPDATE source_files SET fingerprint = NULL WHERE table_name = ?;", (table_name,)
+            )
+            self.connection.commit()
+        except Exception as error:
+            self.connection.rollback()
+            logger.error(f"Error occurred in {function_name} method: {error}")
+            raise
+
+    def append_rows(self, table_name: str, df: pd.DataFrame) -> None:
+        """
+        Appends the rows of a data frame to a store table.
+        The table is detached from its source file, so the next sync ingests the file again.
+        :param table_name: Store table name
+        :param df: Pandas data frame with the rows to be appended
+        """
+        function_name = self.append_rows.__name__
+        try:
+            df = format_date_columns(df)
+            df.to_sql(name=table_name, con=self.connection, if_exists="append", index=False, chunksize=100000)
+            self.connection.execute(
+                "UPDATE source_files SET fingerprint = NULL WHERE table_name = ?;", (table_name,)
+            )
+            self.connection.commit()
+        except Exception as error:
+            self.connection.rollback()
+            logger.error(f"Error occurred in {function_name} method: {error}")
+            raise
+
+    def read_table(self, table_name: str, columns: list = None) -> pd.DataFrame:
+        """
+        Reads a store table into a data frame with the dtypes of the table schema
+        :param table_name: Store table name
+        :param columns: List with the columns to be read, all columns by default
+        :return: Pandas data frame with the table data
+        """
+        selected_columns = ", ".join(columns) if columns else "*"
+        df = self.query(f"SELECT {selected_columns} FROM {table_name};")
+        return apply_schema(df, self.schema.get(table_name, {}))
+
+    def query(self, query: str) -> pd.DataFrame:
+        """
+        Runs a SQL query against the store
+        :param query: SQL query to be executed
+        :return: Pandas data frame with the query result
+        """
+        return pd.read_sql_query(query, self.connection)
+
+    def _source_fingerprint(self, table_name: str, file_path) -> dict:
+        """
+        Gets the fingerprint of a table source, so a table is ingested again when its files or schema change
+        :param table_name: Store table name
+        :param file_path: CSV file path, glob pattern or list of them
+        :return: Dictionary with the files fingerprint and the table schema
+        """
+        return {
+            "files": files_fingerprint(file_path, with_hash=self.verify_hash),
+            "schema": self.schema.get(table_name)
+        }
+
+    def close(self) -> None:
+        """
+        Closes the store connection
+        """
+        self.connection.close()
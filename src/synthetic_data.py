@@ -0,0 +1,167 @@
+import os
+import numpy as np
+import pandas as pd
+from utils import (
+    logger,
+    save_to_csv,
+    apply_schema,
+    explode_genres
+)
+
+# Genre names and ids of the movies metadata genres column
+GENRES = [
+    (28, "Action"), (12, "Adventure"), (16, "Animation"), (35, "Comedy"), (80, "Crime"), (99, "Documentary"),
+    (18, "Drama"), (10751, "Family"), (14, "Fantasy"), (36, "History"), (27, "Horror"), (10402, "Music"),
+    (9648, "Mystery"), (10749, "Romance"), (878, "Science Fiction"), (10770, "TV Movie"), (53, "Thriller"),
+    (10752, "War"), (37, "Western"), (10769, "Foreign")
+]
+LANGUAGES = ["en", "fr", "it", "ja", "de", "es", "ru", "hi", "ko", "zh"]
+RATINGS = np.arange(1, 11) / 2
+RATINGS_WEIGHTS = np.array([1.1, 2.8, 1.6, 7.2, 4.4, 19.8, 10.5, 28.7, 7.6, 15.1])
+FIRST_TIMESTAMP = 789652009
+LAST_TIMESTAMP = 1501829870
+
+
+def generate_synthetic_movies(movies_count: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a movies metadata data frame with the columns of movies_metadata.csv.
+    As in the real file, a few rows have malformed ids and missing or partial release dates.
+    :param movies_count: Number of movies
+    :param seed: Random generator seed, the same seed generates the same movies
+    :return: Pandas data frame with the movies metadata
+    """
+    rng = np.random.default_rng(seed)
+    movie_ids = rng.permutation(np.arange(2, 3 * movies_count + 2))[:movies_count]
+    ids = movie_ids.astype(str).astype(object)
+    # Every 10000th row has a shifted date in its id column, like the malformed rows of the real file
+    ids[::10000][1:] = "1997-08-20"
+
+    genres_counts = rng.integers(0, 4, size=movies_count)
+    # Distinct genres of every movie, as in the real genres column
+    genre_positions = np.argsort(rng.random((movies_count, len(GENRES))), axis=1)[:, :3]
+    genres = [
+        repr([{"id": GENRES[position][0], "name": GENRES[position][1]} for position in positions[:genres_count]])
+        for positions, genres_count in zip(genre_positions, genres_counts)
+    ]
+
+    release_dates = pd.Series(
+        pd.to_datetime("1900-01-01") + pd.to_timedelta(rng.integers(0, 43000, size=movies_count), unit="D")
+    ).dt.strftime("%Y-%m-%d").astype(object)
+    missing_release_dates = rng.random(movies_count) < 0.002
+    release_dates[missing_release_dates] = None
+    release_dates[1::5000] = release_dates[1::5000].str[:7]
+
+    titles = np.char.add("Movie ", movie_ids.astype(str))
+    vote_counts = rng.zipf(1.6, size=movies_count).clip(max=15000)
+    return pd.DataFrame(
+        {
+            "adult": "False",
+            "belongs_to_collection": None,
+            "budget": rng.integers(0, 10, size=movies_count) * 1000000,
+            "genres": genres,
+            "homepage": None,
+            "id": ids,
+            "imdb_id": np.char.add("tt", np.char.zfill(movie_ids.astype(str), 7)),
+            "original_language": rng.choice(LANGUAGES, size=movies_count),
+            "original_title": titles,
+            "overview": np.char.add("Overview of ", titles),
+            "popularity": rng.exponential(3.0, size=movies_count).round(6),
+            "poster_path": np.char.add(np.char.add("/", movie_ids.astype(str)), ".jpg"),
+            "production_companies": "[]",
+            "production_countries": "[{'iso_3166_1': 'US', 'name': 'United States of America'}]",
+            "release_date": release_dates,
+            "revenue": rng.integers(0, 10, size=movies_count) * 1000000,
+            "runtime": rng.integers(60, 180, size=movies_count).astype(float),
+            "spoken_languages": "[{'iso_639_1': 'en', 'name': 'English'}]",
+            "status": "Released",
+            "tagline": None,
+            "title": titles,
+            "video": "False",
+            "vote_average": rng.integers(0, 101, size=movies_count) / 10,
+            "vote_count": vote_counts
+        }
+    )
+
+
+def generate_synthetic_ratings(movie_ids: np.ndarray, ratings_count: int, users_count: int,
+                               rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generates a ratings data frame with the columns of ratings_small.csv.
+    The movie popularity follows a power law, so a few movies have most of the ratings.
+    :param movie_ids: NumPy array with the ids of the rated movies
+    :param ratings_count: Number of ratings
+    :param users_count: Number of users
+    :param rng: NumPy random generator
+    :return: Pandas data frame with 'userId', 'movieId', 'rating' and 'timestamp' columns
+    """
+    popularity = 1 / np.arange(1, len(movie_ids) + 1) ** 0.8
+    return pd.DataFrame(
+        {
+            "userId": rng.integers(1, users_count + 1, size=ratings_count),
+            "movieId": rng.choice(movie_ids, size=ratings_count, p=popularity / popularity.sum()),
+            "rating": rng.choice(RATINGS, size=ratings_count, p=RATINGS_WEIGHTS / RATINGS_WEIGHTS.sum()),
+            "timestamp": rng.integers(FIRST_TIMESTAMP, LAST_TIMESTAMP, size=ratings_count)
+        }
+    )
+
+
+def generate_synthetic_dataset(output_dir: str,
+                               ratings_count: int,
+                               movies_count: int = None,
+                               users_count: int = None,
+                               seed: int = 0,
+                               chunksize: int = 1000000
+                               ) -> dict:
+    """
+    Generates a synthetic movies dataset with the schemas of movies_metadata.csv, ratings_small.csv, genres.csv
+    and links_small.csv and saves it to CSV files. As in the real files, the ratings use MovieLens ids
+    translated to the TMDB ids of the movies by the links. The ratings are generated and saved in chunks,
+    so the memory usage does not depend on the number of ratings.
+    :param output_dir: Directory of the generated CSV files
+    :param ratings_count: Number of ratings
+    :param movies_count: Number of movies, one per 100 ratings (between 100 and 45466) by default
+    :param users_count: Number of users, one per 100 ratings by default
+    :param seed: Random generator seed, the same arguments generate the same files
+    :param chunksize: Number of ratings generated at once
+    :return: Dictionary with the table names and their CSV file paths
+    """
+    function_name = generate_synthetic_dataset.__name__
+    movies_count = movies_count if movies_count else min(max(ratings_count // 100, 100), 45466)
+    users_count = users_count if users_count else max(ratings_count // 100, 1)
+    source_files = {
+        "movies": os.path.join(output_dir, "movies_metadata.csv"),
+        "ratings": os.path.join(output_dir, "ratings.csv"),
+        "genres": os.path.join(output_dir, "genres.csv"),
+        "links": os.path.join(output_dir, "links.csv")
+    }
+    try:
+        logger.info(
+            f"Calling function {function_name} with {ratings_count} ratings, {movies_count} movies "
+            f"and {users_count} users."
+        )
+        os.makedirs(output_dir, exist_ok=True)
+        movies_df = generate_synthetic_movies(movies_count, seed=seed)
+        save_to_csv(movies_df, file_path=source_files["movies"])
+
+        valid_movies_df = apply_schema(movies_df[["id", "genres"]].copy(), {"ids": {"id": "int32"}})
+        save_to_csv(explode_genres(valid_movies_df), file_path=source_files["genres"])
+
+        tmdb_ids = valid_movies_df["id"].to_numpy()
+        movie_ids = np.arange(1, len(tmdb_ids) + 1)
+        links_df = pd.DataFrame(
+            {"movieId": movie_ids, "imdbId": np.char.zfill(movie_ids.astype(str), 7), "tmdbId": tmdb_ids}
+        )
+        save_to_csv(links_df, file_path=source_files["links"])
+
+        rng = np.random.default_rng([seed, ratings_count])
+        for chunk_start in range(0, ratings_count, chunksize):
+            ratings_df = generate_synthetic_ratings(
+                movie_ids, min(chunksize, ratings_count - chunk_start), users_count, rng
+            )
+            save_to_csv(ratings_df, file_path=source_files["ratings"], append=chunk_start > 0)
+    except Exception as error:
+        logger.error(f"Error occurred in {function_name} function: {error}")
+        raise
+
+    logger.info(f"The {function_name} function finished successfully. Dataset saved to: {output_dir}")
+    return source_files
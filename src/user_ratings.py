@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+from id_mapping import IdMapping
+
+# Bytes per expanded product of the similarity computation - the gathered positions, movie codes, weights and keys
+PRODUCT_BYTES = 40
+# Bytes per cell of a similarity block - the dot products, their chunk increment, the partition and the masks
+SIMILARITY_CELL_BYTES = 32
+
+
+class UserRatingsMatrix:
+    """
+    A class for the sparse user x movie ratings matrix in compressed sparse row (CSR) format built once from
+    the ratings table, with the per-user rating statistics and the item-item cosine similarity of the movies.
+    The similarities are computed in blocks of movies, so the memory usage stays within a fixed budget.
+    ...
+
+    Attributes
+    ----------
+    user_ids : np.ndarray
+        sorted ids of the users, the rows of the matrix
+    movie_ids : np.ndarray
+        sorted ids of the rated movies, the columns of the matrix
+    indptr : np.ndarray
+        positions of the first rating of every user in indices and data, followed by the number of ratings
+    indices : np.ndarray
+        column (movie) positions of the ratings ordered by user
+    data : np.ndarray
+        ratings ordered by user
+    movie_norms : np.ndarray
+        Euclidean norm of the ratings of every movie
+    movie_rating_counts : np.ndarray
+        number of ratings of every movie
+    movie_indptr : np.ndarray
+        positions of the first rating of every movie in movie_users and movie_data, the column-major (CSC) ratings
+    movie_users : np.ndarray
+        row (user) positions of the ratings ordered by movie
+    movie_data : np.ndarray
+        ratings ordered by movie
+
+    Methods
+    -------
+    from_frame(ratings_df, id_mapping):
+        Builds the ratings matrix of a ratings data frame
+    get_user_stats():
+        Gets the number of ratings and the average, minimal and maximal rating of every user
+    get_similar_movies(movie_id, k, min_ratings, memory_budget_bytes):
+        Gets the k movies most similar to a movie
+    get_top_k_neighbours(k, min_ratings, memory_budget_bytes):
+        Gets the k most similar movies of every movie
+    """
+
+    def __init__(self, user_ids: np.ndarray, movie_ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 data: np.ndarray):
+        self.user_ids = user_ids
+        self.movie_ids = movie_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.movie_norms = np.sqrt(
+            np.bincount(indices, weights=data.astype("float64") ** 2, minlength=len(movie_ids))
+        )
+        self.movie_rating_counts = np.bincount(indices, minlength=len(movie_ids))
+        # Column-major copy of the ratings, so the ratings of a block of movies are sliced instead of searched
+        movie_order = np.argsort(indices, kind="stable")
+        self.movie_indptr = np.concatenate([[0], np.cumsum(self.movie_rating_counts)])
+        self.movie_users = np.repeat(np.arange(len(user_ids), dtype="int32"), np.diff(indptr))[movie_order]
+        self.movie_data = data[movie_order]
+
+    @classmethod
+    def from_frame(cls, ratings_df: pd.DataFrame, id_mapping: IdMapping = None):
+        """
+        Builds the ratings matrix of a ratings data frame. The ratings with missing values are ignored
+        and the last rating of a user for a movie is used.
+        :param ratings_df: Pandas data frame with 'userId', 'movieId' and 'rating' columns
+        :param id_mapping: IdMapping object translating the rating movie ids to the movie ids, None to use them as is
+        :return: UserRatingsMatrix object
+        """
+        user_keys = ratings_df["userId"].to_numpy(dtype="float64")
+        movie_keys = ratings_df["movieId"].to_numpy(dtype="float64")
+        ratings = ratings_df["rating"].to_numpy(dtype="float32")
+        valid_ratings = ~(np.isnan(user_keys) | np.isnan(movie_keys) | np.isnan(ratings))
+        if id_mapping is not None:
+            movie_keys = id_mapping.map_ids(movie_keys).astype("float64")
+            valid_ratings &= movie_keys >= 0
+        user_keys = user_keys[valid_ratings].astype("int64")
+        movie_keys = movie_keys[valid_ratings].astype("int64")
+        ratings = ratings[valid_ratings]
+
+        user_ids, user_codes = np.unique(user_keys, return_inverse=True)
+        movie_ids, movie_codes = np.unique(movie_keys, return_inverse=True)
+        # Ratings ordered by user and movie, the stable sort keeps the last rating of a user for a movie last
+        keys = user_codes.astype("int64") * len(movie_ids) + movie_codes
+        order = np.argsort(keys, kind="stable")
+        last_ratings = np.append(keys[order][1:] != keys[order][:-1], True) if len(order) else np.zeros(0, bool)
+        order = order[last_ratings]
+
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(user_codes[order], minlength=len(user_ids)))])
+        return cls(user_ids, movie_ids, indptr, movie_codes[order].astype("int32"), ratings[order])
+
+    def get_user_stats(self) -> pd.DataFrame:
+        """
+        Gets the number of ratings and the average, minimal and maximal rating of every user
+        :return: Pandas data frame with 'userId', 'rating_count', 'average_rating', 'min_rating' and 'max_rating'
+        columns ordered by user id
+        """
+        if len(self.user_ids) == 0:
+            return pd.DataFrame(
+                {"userId": self.user_ids, "rating_count": self.user_ids, "average_rating": np.zeros(0),
+                 "min_rating": np.zeros(0), "max_rating": np.zeros(0)}
+            )
+        # Every user has a rating, so the rows are never empty
+        row_starts = self.indptr[:-1]
+        data = self.data.astype("float64")
+        rating_counts = np.diff(self.indptr)
+        return pd.DataFrame(
+            {
+                "userId": self.user_ids,
+                "rating_count": rating_counts,
+                "average_rating": np.add.reduceat(data, row_starts) / rating_counts,
+                "min_rating": np.minimum.reduceat(data, row_starts),
+                "max_rating": np.maximum.reduceat(data, row_starts)
+            }
+        )
+
+    def get_similar_movies(self, movie_id: int, k: int = 10, min_ratings: int = 1,
+                           memory_budget_bytes: int = 256 * 1024 ** 2) -> pd.DataFrame:
+        """
+        Gets the k movies most similar to a movie by the cosine similarity of their ratings
+        :param movie_id: Movie id
+        :param k: Number of similar movies
+        :param min_ratings: Minimal number of ratings of the similar movies
+        :param memory_budget_bytes: Memory budget of the similarity computation
+        :return: Pandas data frame with 'movieId' and 'similarity' columns ordered by descending similarity
+        and movie id, empty for an unknown movie
+        """
+        position = np.searchsorted(self.movie_ids, movie_id)
+        if position == len(self.movie_ids) or self.movie_ids[position] != movie_id:
+            return pd.DataFrame({"movieId": self.movie_ids[:0], "similarity": np.zeros(0)})
+
+        _, neighbour_positions, similarities = self._get_block_neighbours(
+            np.array([position]), k, min_ratings, memory_budget_bytes // PRODUCT_BYTES
+        )
+        return pd.DataFrame({"movieId": self.movie_ids[neighbour_positions], "similarity": similarities})
+
+    def get_top_k_neighbours(self, k: int = 10, min_ratings: int = 1,
+                             memory_budget_bytes: int = 256 * 1024 ** 2) -> pd.DataFrame:
+        """
+        Gets the k most similar movies of every movie. The similarities are computed for blocks of movies
+        sized so the dense block of similarities and the expanded rating products fit the memory budget.
+        :param k: Number of neighbours of every movie
+        :param min_ratings: Minimal number of ratings of the movies and their neighbours
+        :param memory_budget_bytes: Memory budget of the similarity computation
+        :return: Pandas data frame with 'movieId', 'rank', 'neighbourId' and 'similarity' columns
+        ordered by movie id and rank
+        """
+        movies_count = len(self.movie_ids)
+        # Half of the budget for the dense similarity block and its selection masks, half for the products
+        block_size = max(1, memory_budget_bytes // 2 // max(1, movies_count * SIMILARITY_CELL_BYTES))
+        max_products = memory_budget_bytes // 2 // PRODUCT_BYTES
+        positions = np.flatnonzero(self.movie_rating_counts >= min_ratings)
+
+        blocks = []
+        for block_start in range(0, len(positions), block_size):
+            rows, neighbour_positions, similarities = self._get_block_neighbours(
+                positions[block_start:block_start + block_size], k, min_ratings, max_products
+            )
+            blocks.append((positions[block_start:block_start + block_size][rows], neighbour_positions, similarities))
+
+        movie_positions = np.concatenate([block[0] for block in blocks]) if blocks else np.zeros(0, dtype="int64")
+        neighbour_positions = np.concatenate([block[1] for block in blocks]) if blocks else movie_positions
+        ranks = np.arange(len(movie_positions)) - np.searchsorted(movie_positions, movie_positions) + 1
+        return pd.DataFrame(
+            {
+                "movieId": self.movie_ids[movie_positions],
+                "rank": ranks.astype("int64"),
+                "neighbourId": self.movie_ids[neighbour_positions],
+                "similarity": np.concatenate([block[2] for block in blocks]) if blocks else np.zeros(0)
+            }
+        )
+
+    def _get_block_neighbours(self, positions: np.ndarray, k: int, min_ratings: int, max_products: int) -> tuple:
+        """
+        Gets the k most similar movies of a block of movies
+        :param positions: NumPy array with the sorted column positions of the movies
+        :param k: Number of neighbours of every movie
+        :param min_ratings: Minimal number of ratings of the neighbours
+        :param max_products: Maximal number of rating products expanded at once
+        :return: Tuple with NumPy arrays of the block rows, the neighbour positions and the similarities, ordered by
+        row, descending similarity and neighbour movie id
+        """
+        if k <= 0 or len(positions) == 0:
+            return np.zeros(0, dtype="int64"), np.zeros(0, dtype="int64"), np.zeros(0)
+
+        similarities = self._get_dot_products(positions, max_products)
+        # The movies with zero norm have zero dot products, so they are divided by one
+        norms = np.where(self.movie_norms > 0, self.movie_norms, 1)
+        similarities /= norms[positions][:, None]
+        similarities /= norms
+        # A movie is not its own neighbour and the movies without common ratings are not neighbours
+        similarities[np.arange(len(positions)), positions] = 0
+        similarities[:, self.movie_rating_counts < min_ratings] = 0
+
+        movies_count = len(self.movie_ids)
+        if k < movies_count:
+            thresholds = np.partition(similarities, movies_count - k, axis=1)[:, movies_count - k]
+            candidates = (similarities >= thresholds[:, None]) & (similarities > 0)
+        else:
+            candidates = similarities > 0
+        # The candidates include the ties of the k-th similarity, which are resolved by the movie id
+        rows, columns = np.nonzero(candidates)
+        candidate_similarities = similarities[rows, columns]
+        order = np.lexsort((self.movie_ids[columns], -candidate_similarities, rows))
+        rows, columns, candidate_similarities = rows[order], columns[order], candidate_similarities[order]
+        ranks = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        selected = ranks < k
+        return rows[selected], columns[selected], candidate_similarities[selected]
+
+    def _get_dot_products(self, positions: np.ndarray, max_products: int) -> np.ndarray:
+        """
+        Computes the dot products of the ratings of a block of movies with the ratings of all movies.
+        Every rating of a block movie is multiplied with the ratings of its user, and the products are expanded
+        in chunks of at most max_products.
+        :param positions: NumPy array with the sorted column positions of the movies
+        :param max_products: Maximal number of rating products expanded at once
+        :return: NumPy array with a row of dot products for every block movie
+        """
+        movies_count = len(self.movie_ids)
+        # Ratings of the block movies - their block rows, users and values
+        entry_lengths = self.movie_rating_counts[positions]
+        entries = gather_slices(self.movie_indptr[positions], entry_lengths)
+        entry_rows = np.repeat(np.arange(len(positions)), entry_lengths)
+        entry_users = self.movie_users[entries]
+        entry_ratings = self.movie_data[entries].astype("float64")
+
+        dot_products = np.zeros(len(positions) * movies_count)
+        row_lengths = np.diff(self.indptr)[entry_users]
+        products_ends = np.cumsum(row_lengths)
+        chunk_start = 0
+        while chunk_start < len(entry_rows):
+            # At least one rating per chunk, so a user with more ratings than the budget is still processed
+            chunk_end = max(
+                chunk_start + 1,
+                np.searchsorted(products_ends, products_ends[chunk_start] - row_lengths[chunk_start] + max_products,
+                                side="right")
+            )
+            lengths = row_lengths[chunk_start:chunk_end]
+            # Positions of the ratings of every entry user, the rows of the users concatenated
+            gathered = gather_slices(self.indptr[entry_users[chunk_start:chunk_end]], lengths)
+            dot_products += np.bincount(
+                np.repeat(entry_rows[chunk_start:chunk_end], lengths) * movies_count + self.indices[gathered],
+                weights=np.repeat(entry_ratings[chunk_start:chunk_end], lengths) * self.data[gathered],
+                minlength=len(dot_products)
+            )
+            chunk_start = chunk_end
+
+        return dot_products.reshape(len(positions), movies_count)
+
+
+def gather_slices(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Gets the positions of concatenated array slices without a Python loop
+    :param starts: NumPy array with the start positions of the slices
+    :param lengths: NumPy array with the lengths of the slices
+    :return: NumPy array with the positions of all slices in order
+    """
+    return np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
@@ -1,8 +1,17 @@
 import os
 import ast
+import glob
 import json
+import hashlib
 import logging
+import tempfile
+import importlib.util
 import pandas as pd
+from typing import Callable, Iterable, Iterator, Union
+from instrumentation import (
+    count_rows,
+    instrumented
+)
 
 # Logger setup
 logger = logging.getLogger()
@@ -11,10 +20,14 @@ logging.basicConfig(
 )
 
 
-def read_csv(file_path: str) -> pd.DataFrame:
+@instrumented()
+def read_csv(file_path: str, schema: dict = None) -> pd.DataFrame:
     """
     Read csv file and return a pandas data frame
     :param file_path: Input file path
+    :param schema: Table schema dictionary with the columns to load ('usecols'), their dtypes ('dtype'),
+    the id columns to be coerced to integers ('ids') and the date columns to be parsed ('parse_dates').
+    All the columns are loaded with inferred dtypes by default.
     :return: Pandas data frame
     """
     function_name = read_csv.__name__
@@ -22,11 +35,21 @@ def read_csv(file_path: str) -> pd.DataFrame:
         logger.info(
             f"Calling function {function_name} on file {file_path}."
         )
-        df = pd.read_csv(filepath_or_buffer=file_path, header=0, low_memory=False)
+        if schema:
+            usecols = schema.get("usecols")
+            df = pd.read_csv(
+                filepath_or_buffer=file_path,
+                header=0,
+                usecols=(lambda column: column in usecols) if usecols else None,
+                dtype=schema.get("dtype"),
+                low_memory=False
+            )
+            df = apply_schema(df, schema)
+        else:
+            df = pd.read_csv(filepath_or_buffer=file_path, header=0, low_memory=False)
     except Exception as error:
-        error_msg = f"Error occurred in {function_name} function: {error}"
-        logger.error(error_msg)
-        raise error_msg
+        logger.error(f"Error occurred in {function_name} function: {error}")
+        raise
 
     logger.info(
         f"The {function_name} function finished successfully. Data frame created from CSV file: {file_path}"
@@ -34,9 +57,142 @@ def read_csv(file_path: str) -> pd.DataFrame:
     return df
 
 
+def resolve_file_paths(file_paths) -> list:
+    """
+    Resolves a file path, a glob pattern or a list of them, e.g. of the CSV shards of a table
+    :param file_paths: File path, glob pattern or list of file paths and glob patterns
+    :return: List of the matching file paths, sorted within every glob pattern
+    """
+    file_paths = [file_paths] if isinstance(file_paths, str) else list(file_paths)
+    resolved_file_paths = []
+    for file_path in file_paths:
+        matching_file_paths = sorted(glob.glob(file_path)) if glob.has_magic(file_path) else [file_path]
+        if not matching_file_paths:
+            raise FileNotFoundError(f"No files match the pattern: {file_path}")
+        resolved_file_paths.extend(matching_file_paths)
+
+    return resolved_file_paths
+
+
+def read_csv_files(file_paths, schema: dict = None) -> pd.DataFrame:
+    """
+    Read one or more csv files with the same columns and return a single pandas data frame
+    :param file_paths: File path, glob pattern or list of them, see resolve_file_paths
+    :param schema: Table schema dictionary, see read_csv
+    :return: Pandas data frame
+    """
+    resolved_file_paths = resolve_file_paths(file_paths)
+    if len(resolved_file_paths) == 1:
+        return read_csv(resolved_file_paths[0], schema=schema)
+
+    return pd.concat([read_csv(file_path, schema=schema) for file_path in resolved_file_paths], ignore_index=True)
+
+
+def read_csv_chunks(file_path: str, chunksize: int, schema: dict = None) -> Iterator[pd.DataFrame]:
+    """
+    Read csv file in chunks, so files larger than the memory can be processed
+    :param file_path: Input file path
+    :param chunksize: Number of rows per chunk
+    :param schema: Table schema dictionary, see read_csv
+    :return: Iterator of pandas data frames with the schema dtypes
+    """
+    schema = schema if schema else {}
+    usecols = schema.get("usecols")
+    logger.info(f"Reading CSV file {file_path} in chunks of {chunksize} rows.")
+    with pd.read_csv(
+        filepath_or_buffer=file_path,
+        header=0,
+        usecols=(lambda column: column in usecols) if usecols else None,
+        dtype=schema.get("dtype"),
+        chunksize=chunksize
+    ) as chunks:
+        for df_chunk in chunks:
+            yield apply_schema(df_chunk.reset_index(drop=True), schema)
+
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """
+    Converts the data frame columns to the dtypes of a table schema.
+    The rows with malformed ids are dropped and the malformed dates are set to NaT.
+    :param df: Pandas data frame to be converted
+    :param schema: Table schema dictionary, see read_csv
+    :return: Pandas data frame with the schema dtypes
+    """
+    for column, dtype in schema.get("ids", {}).items():
+        if column not in df:
+            continue
+        ids = pd.to_numeric(df[column], errors="coerce")
+        malformed_ids = ids.isna() | (ids % 1 != 0)
+        if malformed_ids.any():
+            logger.warning(f"Dropping {malformed_ids.sum()} rows with malformed {column} values.")
+            df = df[~malformed_ids].reset_index(drop=True)
+            ids = ids[~malformed_ids].reset_index(drop=True)
+        df[column] = ids.astype(dtype)
+
+    for column, dtype in schema.get("dtype", {}).items():
+        if column in df and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+
+    for column, date_format in schema.get("parse_dates", {}).items():
+        if column in df:
+            df[column] = parse_dates(df[column], date_format=date_format)
+
+    return df
+
+
+def parse_dates(values: pd.Series, date_format: str = "%Y-%m-%d") -> pd.Series:
+    """
+    Parses date strings, the malformed and out of range dates are converted to NaT
+    :param values: Pandas series with date strings or datetimes
+    :param date_format: Date format of the strings
+    :return: Pandas series with datetimes, the series itself if it is already parsed
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format=date_format, errors="coerce")
+
+
+def format_date_columns(df: pd.DataFrame, date_format: str = "%Y-%m-%d") -> pd.DataFrame:
+    """
+    Converts the datetime columns of a data frame to strings, e.g. before writing them to SQLite
+    :param df: Pandas data frame
+    :param date_format: Date format of the converted columns
+    :return: Pandas data frame with the datetime columns formatted as strings
+    """
+    date_columns = [column for column in df if pd.api.types.is_datetime64_any_dtype(df[column])]
+    if not date_columns:
+        return df
+
+    return df.assign(**{column: df[column].dt.strftime(date_format) for column in date_columns})
+
+
+def get_memory_usage_report(source_files: dict, schema: dict) -> pd.DataFrame:
+    """
+    Compares the memory usage of the tables loaded with inferred dtypes and with their schema
+    :param source_files: Dictionary with table names and their CSV file paths or glob patterns
+    :param schema: Dictionary with table names and their schema, see read_csv
+    :return: Pandas data frame with the memory usage in bytes and the bytes saved by the schema per table
+    """
+    memory_usage = []
+    for table_name, file_path in source_files.items():
+        default_bytes = int(read_csv_files(file_path).memory_usage(deep=True).sum())
+        schema_bytes = int(read_csv_files(file_path, schema=schema.get(table_name)).memory_usage(deep=True).sum())
+        memory_usage.append(
+            {
+                "table": table_name,
+                "default_bytes": default_bytes,
+                "schema_bytes": schema_bytes,
+                "bytes_saved": default_bytes - schema_bytes
+            }
+        )
+
+    return pd.DataFrame(memory_usage)
+
+
+@instrumented(input_rows=lambda arguments: len(arguments["df"]))
 def save_to_json(df: pd.DataFrame, file_path: str) -> None:
     """
-    Saving Pandas data frame to a JSON file
+    Saving Pandas data frame to a JSON file. The file is written atomically, see write_atomically.
     :param df: Pandas data frame to be saved
     :param file_path: JSON file path where the data frame will be saved
     """
@@ -45,71 +201,269 @@ def save_to_json(df: pd.DataFrame, file_path: str) -> None:
         logger.info(
             f"Calling function {function_name} on file {file_path}."
         )
-        df.to_json(path_or_buf=file_path, indent=4, orient="table", index=False)
+        write_atomically(
+            file_path, lambda temp_file_path: df.to_json(
+                path_or_buf=temp_file_path, indent=4, orient="table", index=False
+            )
+        )
     except Exception as error:
-        error_msg = f"Error occurred in {function_name} function: {error}"
-        logger.error(error_msg)
-        raise error_msg
+        logger.error(f"Error occurred in {function_name} function: {error}")
+        raise
 
     logger.info(
         f"The {function_name} function finished successfully. Data frame saved to JSON file: {file_path}"
     )
 
 
-def save_to_csv(df: pd.DataFrame, file_path: str) -> None:
+# File extensions of the export file formats
+EXPORT_FILE_EXTENSIONS = {
+    "json": ".json",
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+    "feather": ".feather"
+}
+
+
+def write_atomically(file_path: str, write_function: Callable[[str], None]) -> None:
+    """
+    Writes a file to a temporary file in the same directory and renames it,
+    so readers never see a partially written file
+    :param file_path: Output file path
+    :param write_function: Function writing the file content to the given temporary file path
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_file_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(file_descriptor)
+    try:
+        write_function(temp_file_path)
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+
+@instrumented(input_rows=lambda arguments: count_rows(arguments["data"]))
+def save_to_jsonl(data: Union[pd.DataFrame, Iterable[pd.DataFrame]], file_path: str, chunksize: int = 100000) -> None:
+    """
+    Saving Pandas data frame or data frame chunks to a line-delimited JSON file with a compact record per line.
+    The data frame is written in chunks, so the serialized file is never held in memory at once.
+    The file is written atomically, see write_atomically.
+    :param data: Pandas data frame or iterable of data frame chunks, e.g. from read_csv_chunks
+    :param file_path: JSON lines file path where the data will be saved
+    :param chunksize: Number of rows serialized at once
+    """
+    function_name = save_to_jsonl.__name__
+    try:
+        logger.info(
+            f"Calling function {function_name} on file {file_path}."
+        )
+        chunks = data
+        if isinstance(data, pd.DataFrame):
+            chunks = (data.iloc[start:start + chunksize] for start in range(0, len(data), chunksize))
+
+        def write_chunks(temp_file_path: str) -> None:
+            with open(temp_file_path, "w", encoding="utf-8") as jsonl_file:
+                for chunk in chunks:
+                    if len(chunk) > 0:
+                        jsonl_file.write(chunk.to_json(orient="records", lines=True, date_format="iso"))
+                        jsonl_file.write("\n")
+
+        write_atomically(file_path, write_chunks)
+    except Exception as error:
+        logger.error(f"Error occurred in {function_name} function: {error}")
+        raise
+
+    logger.info(
+        f"The {function_name} function finished successfully. Data saved to JSON lines file: {file_path}"
+    )
+
+
+@instrumented(input_rows=lambda arguments: len(arguments["df"]))
+def save_to_columnar_file(df: pd.DataFrame, file_path: str, file_format: str) -> None:
+    """
+    Saving Pandas data frame to a Parquet or Feather file. Both formats need the optional pyarrow package.
+    The file is written atomically, see write_atomically.
+    :param df: Pandas data frame to be saved
+    :param file_path: Output file path
+    :param file_format: File format - 'parquet' or 'feather'
+    """
+    function_name = save_to_columnar_file.__name__
+    try:
+        logger.info(
+            f"Calling function {function_name} on file {file_path}."
+        )
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError(f"The {file_format} export format requires the pyarrow package: pip install pyarrow")
+        df = df.reset_index(drop=True)
+        if file_format == "parquet":
+            write_atomically(file_path, lambda temp_file_path: df.to_parquet(temp_file_path, index=False))
+        else:
+            write_atomically(file_path, lambda temp_file_path: df.to_feather(temp_file_path))
+    except Exception as error:
+        logger.error(f"Error occurred in {function_name} function: {error}")
+        raise
+
+    logger.info(
+        f"The {function_name} function finished successfully. Data frame saved to {file_format} file: {file_path}"
+    )
+
+
+def get_export_file_path(file_path: str, file_format: str) -> str:
+    """
+    Gets the path of an export file with the extension of its file format
+    :param file_path: Configured export file path
+    :param file_format: Export file format - 'json', 'jsonl', 'parquet' or 'feather'
+    :return: Export file path
+    """
+    if file_format not in EXPORT_FILE_EXTENSIONS:
+        raise ValueError(
+            f"Unknown export file format '{file_format}'. Available formats: {', '.join(EXPORT_FILE_EXTENSIONS)}"
+        )
+    return os.path.splitext(file_path)[0] + EXPORT_FILE_EXTENSIONS[file_format]
+
+
+def save_to_file(data: Union[pd.DataFrame, Iterable[pd.DataFrame]], file_path: str, file_format: str = "json",
+                 chunksize: int = 100000) -> None:
+    """
+    Saving Pandas data frame to a file in the given export format
+    :param data: Pandas data frame, or an iterable of data frame chunks for the 'jsonl' format
+    :param file_path: Output file path
+    :param file_format: Export file format - 'json', 'jsonl', 'parquet' or 'feather'
+    :param chunksize: Number of rows serialized at once by the 'jsonl' format
+    """
+    if file_format == "jsonl":
+        save_to_jsonl(data, file_path, chunksize=chunksize)
+        return
+
+    if not isinstance(data, pd.DataFrame):
+        data = pd.concat(list(data), ignore_index=True)
+    if file_format == "json":
+        save_to_json(data, file_path)
+    elif file_format in ("parquet", "feather"):
+        save_to_columnar_file(data, file_path, file_format)
+    else:
+        raise ValueError(
+            f"Unknown export file format '{file_format}'. Available formats: {', '.join(EXPORT_FILE_EXTENSIONS)}"
+        )
+
+
+def save_to_csv(df: pd.DataFrame, file_path: str, append: bool = False) -> None:
     """
     Saving Pandas data frame to a CSV file
     :param df: Pandas data frame to be saved
     :param file_path: CSV file path where the data frame will be saved
+    :param append: Boolean value, False by default. If true the rows are appended to the file without header
     """
-    function_name = save_to_json.__name__
+    function_name = save_to_csv.__name__
     try:
         logger.info(
             f"Calling function {function_name} on file {file_path}."
         )
-        df.to_csv(path_or_buf=file_path, sep=",", header=True, index=False)
+        df.to_csv(path_or_buf=file_path, sep=",", header=not append, index=False, mode="a" if append else "w")
     except Exception as error:
-        error_msg = f"Error occurred in {function_name} function: {error}"
-        logger.error(error_msg)
-        raise error_msg
+        logger.error(f"Error occurred in {function_name} function: {error}")
+        raise
 
     logger.info(
         f"The {function_name} function finished successfully. Data frame saved to CSV file: {file_path}"
     )
 
 
-def generate_genres_df(test: bool = False) -> None:
+def file_fingerprint(file_path: str, with_hash: bool = False) -> dict:
+    """
+    Gets a fingerprint of a file used to detect changes of the source files
+    :param file_path: Input file path
+    :param with_hash: Boolean value, False by default. If true the SHA-256 hash of the file content is included
+    :return: Dictionary with the file size, modification time and optionally the content hash
+    """
+    file_stat = os.stat(file_path)
+    fingerprint = {
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns
+    }
+    if with_hash:
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                sha256.update(block)
+        fingerprint["sha256"] = sha256.hexdigest()
+
+    return fingerprint
+
+
+def parse_genres(genres: str) -> list:
+    """
+    Parses a genres value of the movies metadata, e.g. "[{'id': 16, 'name': 'Animation'}]", to a list of genre names
+    :param genres: Genres string with a list of genre dictionaries
+    :return: List of genre names
+    """
+    if not isinstance(genres, str) or not genres:
+        return []
+    try:
+        # The values are Python literals, JSON parsing after swapping the quotes is much faster
+        genres_list = json.loads(genres.replace("'", '"'))
+    except ValueError:
+        # Genre names with quotes are parsed as Python literals
+        genres_list = ast.literal_eval(genres)
+
+    return [genre.get("name") for genre in genres_list]
+
+
+def explode_genres(movies_df: pd.DataFrame, genres_cache: dict = None) -> pd.DataFrame:
+    """
+    Creates the genres data frame with a row for every movie id and genre name from the movies metadata
+    :param movies_df: Pandas data frame with the movies 'id' and 'genres' columns
+    :param genres_cache: Dictionary with the already parsed genres strings, shared between the chunks of a file
+    :return: Pandas data frame with movie 'id' and 'genre_name' columns
+    """
+    genres_cache = genres_cache if genres_cache is not None else {}
+    # Every distinct genres string is parsed only once
+    for genres in movies_df["genres"].dropna().unique():
+        if genres not in genres_cache:
+            genres_cache[genres] = parse_genres(genres)
+
+    genre_names = movies_df["genres"].map(genres_cache)
+    movie_genres_df = pd.DataFrame({"id": movies_df["id"], "genre_name": genre_names})
+    movie_genres_df = movie_genres_df.explode("genre_name", ignore_index=True)
+
+    return movie_genres_df.dropna(subset=["genre_name"]).reset_index(drop=True)
+
+
+def files_fingerprint(file_paths, with_hash: bool = False) -> list:
+    """
+    Gets the fingerprints of one or more files, see file_fingerprint
+    :param file_paths: File path, glob pattern or list of them, see resolve_file_paths
+    :param with_hash: Boolean value, False by default. If true the SHA-256 hash of the files content is included
+    :return: List with the file path and the fingerprint of every file
+    """
+    return [
+        [file_path, file_fingerprint(file_path, with_hash=with_hash)]
+        for file_path in resolve_file_paths(file_paths)
+    ]
+
+
+def generate_genres_df(test: bool = False, chunksize: int = 100000) -> None:
     """
     Generates a new genre data frame grouped by movie id and saves it to a CSV file
     :param test: Boolean value, False by default. If true the test_dataset location will be used instead of movies_dataset
+    :param chunksize: Number of movies metadata rows processed at once
     """
     env = "test" if test else "main"
     config_parser = ConfigParser(env=env)
-    movies_df = read_csv(config_parser.movies_metadata_csv)
-    # Creating empty df for the new genres table
-    movie_genres_df = pd.DataFrame(
-        {
-            "id": [],
-            "genre_name": []
-        }
-    )
-
-    # Looping through the movies metadata rows
-    for i in movies_df.index:
-        if movies_df["genres"][i]:
-            # Converting string to a list
-            genres_list = ast.literal_eval(movies_df["genres"][i])
-            # Looping through the genres dictionaries in the list
-            for genre in genres_list:
-                new_row = {
-                    "id": movies_df["id"][i],
-                    "genre_name": genre.get("name")
-                }
-                # Adding the new row with movie id and genre name to the genres df
-                movie_genres_df = movie_genres_df.append(new_row, ignore_index=True)
+    movies_schema = {
+        "usecols": ["id", "genres"],
+        "ids": config_parser.schema.get("movies", {}).get("ids", {})
+    }
+    genres_cache = {}
 
-    # Saving the new genres df as CSV
-    save_to_csv(df=movie_genres_df, file_path=config_parser.genres_csv)
+    # Converting the movies metadata in chunks, so the memory usage is bounded by the chunk size
+    movies_chunks = read_csv_chunks(config_parser.movies_metadata_csv, chunksize=chunksize, schema=movies_schema)
+    for chunk_number, movies_chunk in enumerate(movies_chunks):
+        movie_genres_df = explode_genres(movies_chunk, genres_cache)
+        # Saving the new genres df as CSV
+        save_to_csv(df=movie_genres_df, file_path=config_parser.genres_csv, append=chunk_number > 0)
 
 
 def generate_test_df() -> None:
@@ -171,9 +525,12 @@ class ConfigParser:
     movies_metadata_csv : str
         movies metadata csv file path
     ratings_csv : str
-        movie ratings csv file path
+        movie ratings csv file path or glob pattern of the ratings csv shards
     genres_csv : str
         movie genres csv file path
+    links_csv : str
+        csv file path of the links between the MovieLens ids of the ratings and the TMDB ids of the movies,
+        None if the rating ids are the movie ids
     movies_metadata_json : str
         movies metadata json file path
     ratings_json : str
@@ -190,6 +547,59 @@ class ConfigParser:
         count of movies released by year json file path
     movies_by_genre_json : str
         count of movies by genre json file path
+    query_backend : str
+        query backend used by the MoviesDataSet query methods
+    movies_dataset_db : str
+        SQLite store file path used by the sqlite query backend
+    verify_hash : bool
+        if true, the SQLite store compares the content hash of the CSV files to detect changes
+    schema : dict
+        dictionary with the movies, ratings and genres tables schema used when reading the CSV files
+    result_cache_max_entries : int
+        maximum number of query results kept in the MoviesDataSet result cache, 0 disables the cache
+    ratings_chunksize : int
+        number of ratings read at once by the MoviesDataSet streaming mode, None to load the ratings in memory
+    ratings_workers : int
+        number of processes aggregating the ratings CSV shards in parallel, None to aggregate them serially
+    disk_cache_enabled : bool
+        if true, the MoviesDataSet query results are cached on disk
+    disk_cache_dir : str
+        directory of the on-disk result cache
+    disk_cache_max_bytes : int
+        maximum total size of the on-disk result cache
+    disk_cache_max_age_seconds : int
+        maximum age of the on-disk cached results, None for no age limit
+    export_workers : int
+        number of threads writing the export files concurrently
+    export_chunksize : int
+        number of rows serialized at once by the line-delimited JSON export
+    export_formats : dict
+        dictionary with the export file attribute names (e.g. 'ratings_json') and their file formats -
+        'json', 'jsonl', 'parquet' or 'feather'. The files missing in the dictionary are exported as 'json'.
+    instrumentation_enabled : bool
+        if true, the timing, row count and memory metrics of the instrumented operations are recorded
+    profile_json : str
+        JSON file path of the recorded metrics profile
+    lazy_loading : bool
+        if true, the MoviesDataSet tables are loaded on first access with the columns required by the query methods
+    release_tables_after_query : bool
+        if true, the tables loaded by a MoviesDataSet query method are released after it returns
+    service_host : str
+        host the HTTP query service listens on
+    service_port : int
+        port the HTTP query service listens on
+    service_latency_window : int
+        number of the latest requests of every endpoint the HTTP query service latency percentiles are computed from
+    similarity_memory_budget_bytes : int
+        memory budget in bytes of the movie similarity computation
+    approximate_enabled : bool
+        if true, the average ratings are estimated from a sample of the ratings blocks
+    sample_fraction : float
+        fraction of the blocks of every ratings shard read by the ratings sample
+    sample_block_bytes : int
+        number of bytes of the blocks of the ratings CSV files sampled by the ratings sample
+    sampling_seed : int
+        seed of the blocks sample of the ratings sample
 
     Methods
     -------
@@ -204,6 +614,8 @@ class ConfigParser:
         self.movies_metadata_csv = os.path.abspath(self.config_json["csv"]["movies_metadata_csv"])
         self.ratings_csv = os.path.abspath(self.config_json["csv"]["ratings_csv"])
         self.genres_csv = os.path.abspath(self.config_json["csv"]["genres_csv"])
+        links_csv = self.config_json["csv"].get("links_csv")
+        self.links_csv = os.path.abspath(links_csv) if links_csv else None
         self.movies_metadata_json = os.path.abspath(self.config_json["json"]["movies_metadata_json"])
         self.ratings_json = os.path.abspath(self.config_json["json"]["ratings_json"])
         self.genres_json = os.path.abspath(self.config_json["json"]["genres_json"])
@@ -212,6 +624,40 @@ class ConfigParser:
         self.top_5_rated_movies_json = os.path.abspath(self.config_json["json"]["top_5_rated_movies_json"])
         self.movies_released_by_year_json = os.path.abspath(self.config_json["json"]["movies_released_by_year_json"])
         self.movies_by_genre_json = os.path.abspath(self.config_json["json"]["movies_by_genre_json"])
+        self.query_backend = self.config_json.get("query_backend", "pandas")
+        sqlite_config = self.config_json.get("sqlite", {})
+        self.movies_dataset_db = os.path.abspath(sqlite_config.get("movies_dataset_db", "movies_dataset.db"))
+        self.verify_hash = sqlite_config.get("verify_hash", False)
+        self.schema = self.config_json.get("schema", {})
+        self.result_cache_max_entries = self.config_json.get("result_cache", {}).get("max_entries", 128)
+        self.ratings_chunksize = self.config_json.get("streaming", {}).get("ratings_chunksize")
+        self.ratings_workers = self.config_json.get("streaming", {}).get("ratings_workers")
+        disk_cache_config = self.config_json.get("disk_cache", {})
+        self.disk_cache_enabled = disk_cache_config.get("enabled", False)
+        self.disk_cache_dir = os.path.abspath(disk_cache_config.get("cache_dir", "cache"))
+        self.disk_cache_max_bytes = disk_cache_config.get("max_bytes", 1024 ** 3)
+        self.disk_cache_max_age_seconds = disk_cache_config.get("max_age_seconds")
+        export_config = self.config_json.get("export", {})
+        self.export_workers = export_config.get("workers", 4)
+        self.export_chunksize = export_config.get("chunksize", 100000)
+        self.export_formats = export_config.get("formats", {})
+        instrumentation_config = self.config_json.get("instrumentation", {})
+        self.instrumentation_enabled = instrumentation_config.get("enabled", False)
+        self.profile_json = os.path.abspath(instrumentation_config.get("profile_json", "profile.json"))
+        loading_config = self.config_json.get("loading", {})
+        self.lazy_loading = loading_config.get("lazy", True)
+        self.release_tables_after_query = loading_config.get("release_tables_after_query", False)
+        service_config = self.config_json.get("service", {})
+        self.service_host = service_config.get("host", "127.0.0.1")
+        self.service_port = service_config.get("port", 8080)
+        self.service_latency_window = service_config.get("latency_window", 10000)
+        similarity_config = self.config_json.get("similarity", {})
+        self.similarity_memory_budget_bytes = int(similarity_config.get("memory_budget_mb", 256) * 1024 ** 2)
+        approximate_config = self.config_json.get("approximate", {})
+        self.approximate_enabled = approximate_config.get("enabled", False)
+        self.sample_fraction = approximate_config.get("sample_fraction", 0.1)
+        self.sample_block_bytes = approximate_config.get("block_bytes", 1048576)
+        self.sampling_seed = approximate_config.get("seed", 0)
 
     def read_config_file(self, env) -> dict:
         """
@@ -0,0 +1,50 @@
+import pandas as pd
+from src.benchmark import (
+    BENCHMARK_QUERIES,
+    APPROXIMATE_QUERIES,
+    run_benchmarks,
+    compare_reports
+)
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def test_generate_synthetic_dataset(tmp_path):
+    """
+    Testing that generate_synthetic_dataset generates the same files for the same seed with the real files schema
+    """
+    source_files = generate_synthetic_dataset(str(tmp_path / "first"), ratings_count=2500, seed=1, chunksize=1000)
+    same_seed_source_files = generate_synthetic_dataset(str(tmp_path / "second"), ratings_count=2500, seed=1)
+
+    ratings_df = pd.read_csv(source_files["ratings"])
+    movies_df = pd.read_csv(source_files["movies"], low_memory=False)
+    genres_df = pd.read_csv(source_files["genres"])
+    links_df = pd.read_csv(source_files["links"])
+    assert ratings_df.columns.tolist() == ["userId", "movieId", "rating", "timestamp"]
+    assert len(ratings_df) == 2500
+    assert {"id", "original_title", "genres", "release_date"}.issubset(movies_df.columns)
+    assert genres_df.columns.tolist() == ["id", "genre_name"]
+    assert links_df.columns.tolist() == ["movieId", "imdbId", "tmdbId"]
+    assert ratings_df["movieId"].isin(links_df["movieId"]).all()
+    assert links_df["tmdbId"].astype(str).isin(movies_df["id"].astype(str)).all()
+    for table_name in ["movies", "genres", "links"]:
+        with open(source_files[table_name]) as file, open(same_seed_source_files[table_name]) as same_seed_file:
+            assert file.read() == same_seed_file.read()
+
+
+def test_run_benchmarks(tmp_path):
+    """
+    Testing that run_benchmarks times every benchmarked operation and the report can be compared with a baseline
+    """
+    report = run_benchmarks([1000], str(tmp_path), repeat=1)
+
+    result = report["results"][0]
+    assert result["rows"]["ratings"] == 1000
+    assert set(result["timings"]) == {"load", "save_to_json_movies_dataset", *BENCHMARK_QUERIES}
+    assert set(result["warm_timings"]) == set(BENCHMARK_QUERIES)
+    assert set(result["approximate_timings"]) == set(APPROXIMATE_QUERIES)
+    assert all(set(timings) == {"exact", "approximate"} for timings in result["approximate_timings"].values())
+    assert result["peak_rss_bytes"] > 0
+
+    comparison = compare_reports(report, report)
+    assert len(comparison) == len(result["timings"]) + 1
+    assert not any(row["regressed"] for row in comparison)
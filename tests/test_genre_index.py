@@ -0,0 +1,64 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.genre_index import GenreIndex
+from src.ratings_aggregation import RatingsAggregate
+from src.movies_dataset_class import MoviesDataSet
+
+movies_df = pd.DataFrame({"id": ["1", "2", "3", "4", "1997-08-20"]})
+genres_df = pd.DataFrame(
+    {
+        "id": [1, 1, 2, 3, 3, 9],
+        "genre_name": ["Drama", "Comedy", "Drama", "Drama", "Drama", "Horror"]
+    }
+)
+genre_index = GenreIndex.from_frames(movies_df, genres_df)
+
+
+def test_genre_index_counts():
+    """
+    Testing that the genre index counts the distinct movies of every genre with the left join semantics
+    """
+    expected_df = pd.DataFrame({"genre": ["Drama", None, "Comedy"], "movies_count": [3, 2, 1]})
+
+    assert_frame_equal(expected_df, genre_index.get_counts())
+
+
+def test_genre_index_movies_with_genres():
+    """
+    Testing that the genre index finds the movies with any or all of the genres
+    """
+    assert genre_index.get_movies_with_genres(["Comedy", "Drama"], match="any").tolist() == [1, 2, 3]
+    assert genre_index.get_movies_with_genres(["Comedy", "Drama"], match="all").tolist() == [1]
+    assert genre_index.get_movies_with_genres(["Drama", "Horror"], match="all").tolist() == []
+    assert genre_index.get_movie_ids("Horror").tolist() == []
+
+
+def test_genre_index_cooccurrence_and_average_ratings():
+    """
+    Testing the genre co-occurrence matrix and the average rating of every genre from the genre index
+    """
+    assert genre_index.get_cooccurrence().loc["Comedy"].tolist() == [1, 1]
+    assert genre_index.get_cooccurrence().loc["Drama"].tolist() == [1, 3]
+
+    ratings_aggregate = RatingsAggregate.from_frame(
+        pd.DataFrame({"movieId": [1, 1, 2, 4, 9], "rating": [4.0, 2.0, 5.0, 1.0, 1.0]})
+    )
+    expected_df = pd.DataFrame(
+        {"genre": ["Drama", "Comedy"], "rating_count": [3, 2], "average_rating": [11 / 3, 3.0]}
+    )
+
+    assert_frame_equal(expected_df, genre_index.get_average_ratings(ratings_aggregate))
+
+
+def test_movies_dataset_genre_queries():
+    """
+    Testing the genre queries of MoviesDataSet class answered from the genre index
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+
+    actual_df = movies_dataset_object.get_movies_by_genres(["genre1", "genre2"], match="all")
+    assert_frame_equal(pd.DataFrame({"id": [3], "title": ["title3"]}), actual_df)
+
+    actual_df = movies_dataset_object.get_average_rating_by_genre()
+    assert actual_df["genre"].tolist() == ["genre5", "genre1", "genre2", "genre3"]
+    assert actual_df["rating_count"].tolist() == [3, 9, 6, 3]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.id_mapping import IdMapping
+from src.ratings_aggregation import RatingsAggregate
+from src.movies_dataset_class import MoviesDataSet
+
+links_df = pd.DataFrame({"movieId": [1, 2, 3, 4, 5, 6, 2], "tmdbId": [2, 1, np.nan, 5, 5, 6, 9]})
+
+
+def test_id_mapping_map_ids():
+    """
+    Testing that the id mapping translates the linked ids and marks the other ids with -1
+    """
+    id_mapping = IdMapping.from_frame(links_df)
+
+    assert id_mapping.map_ids(np.array([1, 2, 3, 4, 5, 6, 7, -1])).tolist() == [2, 1, -1, 5, 5, 6, -1, -1]
+    assert id_mapping.map_ids(np.array([1.0, np.nan])).tolist() == [2, -1]
+
+
+def test_ratings_aggregate_map_movie_ids():
+    """
+    Testing that the translated aggregate matches the aggregate of the ratings with translated ids
+    """
+    ratings_df = pd.DataFrame({"movieId": [1, 1, 2, 3, 4, 5, 5], "rating": [2.0, 5.0, 4.0, 3.0, 1.0, 5.0, 4.0]})
+    id_mapping = IdMapping.from_frame(links_df)
+    mapped_ids = id_mapping.map_ids(ratings_df["movieId"].to_numpy())
+    expected_aggregate = RatingsAggregate.from_frame(
+        pd.DataFrame({"movieId": mapped_ids, "rating": ratings_df["rating"]})[mapped_ids >= 0]
+    )
+
+    actual_aggregate = RatingsAggregate.from_frame(ratings_df).map_movie_ids(id_mapping)
+
+    assert_frame_equal(expected_aggregate.get_average_ratings(), actual_aggregate.get_average_ratings())
+
+
+@pytest.mark.parametrize("backend", ["pandas", "sql"])
+def test_movies_dataset_with_links(tmp_path, backend):
+    """
+    Testing that the MovieLens ids of the ratings are translated to the TMDB ids of the movies with a links table
+    """
+    links_file_path = str(tmp_path / "links.csv")
+    links_df.iloc[:6].to_csv(links_file_path, index=False)
+    movies_dataset_object = MoviesDataSet(test=True, backend=backend, links_file_path=links_file_path)
+    expected_df = pd.DataFrame(
+        {
+            "id": [1, 2, 5, 6],
+            "title": ["title1", "title2", "title5", "title6"],
+            "average_rating": [2.0, 4.0, 3.0, 5.0]
+        }
+    )
+
+    assert_frame_equal(expected_df, movies_dataset_object.get_average_movie_rating())
+
+    movies_dataset_object.append_ratings(pd.DataFrame({"movieId": [2, 3], "rating": [5.0, 1.0]}))
+    assert movies_dataset_object.get_average_movie_rating()["average_rating"].tolist() == [2.75, 4.0, 3.0, 5.0]
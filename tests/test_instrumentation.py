@@ -0,0 +1,108 @@
+import json
+import pandas as pd
+from instrumentation import (
+    MetricsRegistry,
+    instrumented,
+    metrics_registry
+)
+from src.movies_dataset_class import MoviesDataSet
+
+
+@instrumented(input_rows=lambda arguments: len(arguments["df"]), name="double_rows")
+def double_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.concat([df, df])
+
+
+def test_instrumented_records_metrics_only_when_enabled():
+    """
+    Testing that the instrumented functions record their metrics only when the metrics registry is enabled
+    """
+    df = pd.DataFrame({"id": [1, 2, 3]})
+    metrics_registry.reset()
+    double_rows(df)
+    assert metrics_registry.metrics == {}
+
+    metrics_registry.enable()
+    try:
+        double_rows(df)
+        double_rows(df=df)
+    finally:
+        metrics_registry.disable()
+
+    operation_metrics = metrics_registry.metrics["double_rows"]
+    assert operation_metrics["calls"] == 2
+    assert operation_metrics["input_rows"] == 6
+    assert operation_metrics["output_rows"] == 12
+    assert operation_metrics["wall_seconds"] >= operation_metrics["max_wall_seconds"] > 0
+    metrics_registry.reset()
+
+
+@instrumented(name="allocate_bytes")
+def allocate_bytes(bytes_count: int) -> int:
+    return len(bytearray(bytes_count))
+
+
+@instrumented(name="allocate_nested_bytes")
+def allocate_nested_bytes(bytes_count: int) -> int:
+    buffer = bytearray(bytes_count)
+    return allocate_bytes(bytes_count // 4) + len(buffer)
+
+
+def test_instrumented_records_peak_memory_of_every_call():
+    """
+    Testing that the peak memory growth is recorded for a call below the earlier process peak
+    and that a nested call does not hide the peak of the calling function
+    """
+    metrics_registry.reset()
+    metrics_registry.enable()
+    try:
+        allocate_bytes(64 * 1024 ** 2)
+        metrics_registry.reset()
+        allocate_bytes(8 * 1024 ** 2)
+        allocate_nested_bytes(32 * 1024 ** 2)
+    finally:
+        metrics_registry.disable()
+
+    assert metrics_registry.metrics["allocate_bytes"]["calls"] == 2
+    assert metrics_registry.metrics["allocate_bytes"]["peak_memory_delta_bytes"] >= 8 * 1024 ** 2
+    assert metrics_registry.metrics["allocate_nested_bytes"]["peak_memory_delta_bytes"] >= 40 * 1024 ** 2
+    metrics_registry.reset()
+
+
+def test_movies_dataset_instrumentation(tmp_path):
+    """
+    Testing that the MoviesDataSet query methods and the lazily read CSV files are recorded and the profile is saved
+    """
+    metrics_registry.reset()
+    metrics_registry.enable()
+    try:
+        movies_dataset_object = MoviesDataSet(test=True)
+        movies_dataset_object.get_average_movie_rating()
+    finally:
+        metrics_registry.disable()
+
+    profile_json = str(tmp_path / "profile.json")
+    metrics_registry.save_to_json(profile_json)
+    with open(profile_json) as profile_file:
+        operations = json.load(profile_file)["operations"]
+    metrics_registry.reset()
+
+    assert operations["read_csv"]["calls"] == 2
+    # The 2 movies rows with a duplicated id are dropped at load
+    assert operations["MoviesDataSet.get_average_movie_rating"]["input_rows"] == 7 + 17
+    assert operations["MoviesDataSet.get_average_movie_rating"]["output_rows"] == 7
+    assert "MoviesDataSet.get_movie_ratings_summary" in operations
+
+
+def test_metrics_registry_format_summary():
+    """
+    Testing that format_summary formats a line per recorded operation
+    """
+    registry = MetricsRegistry(enabled=True)
+    registry.record("operation1", wall_seconds=1.0, cpu_seconds=0.5, input_rows=10, output_rows=5)
+    registry.record("operation2", wall_seconds=2.0, cpu_seconds=1.5)
+
+    summary_lines = registry.format_summary().splitlines()
+
+    assert len(summary_lines) == 4
+    assert summary_lines[1].startswith("operation2")
@@ -1,3 +1,5 @@
+import os
+import pytest
 import pandas as pd
 from pandas.testing import assert_frame_equal
 from src.movies_dataset_class import MoviesDataSet
@@ -64,6 +66,32 @@ def test_get_movies_released_each_year():
     assert_frame_equal(expected_df, actual_df)
 
 
+@pytest.mark.parametrize(
+    "by, expected_data",
+    [
+        (
+            "month",
+            {"month": ["1995-01", "1995-02", "1995-03", "2000-04", "2010-05"], "movies_released": [1, 1, 1, 1, 1]}
+        ),
+        ("decade", {"decade": ["1990s", "2000s", "2010s"], "movies_released": [3, 1, 1]})
+    ]
+)
+def test_get_movies_released(by, expected_data):
+    """
+    Testing the get_movies_released method from MoviesDataSet class
+    """
+    expected_df = pd.DataFrame(data=expected_data)
+    actual_df = test_movies_dataset_object.get_movies_released(by=by)
+
+    assert_frame_equal(expected_df, actual_df)
+    assert_frame_equal(
+        test_movies_dataset_object.get_movies_released_each_year(),
+        test_movies_dataset_object.get_movies_released(by="year")
+    )
+    with pytest.raises(ValueError):
+        test_movies_dataset_object.get_movies_released(by="week")
+
+
 def test_get_movies_count_by_genre():
     """
     Testing the get_movies_count_by_genre method from MoviesDataSet class
@@ -79,4 +107,134 @@ def test_get_movies_count_by_genre():
     assert_frame_equal(expected_df, actual_df)
 
 
+def test_get_top_n_rated_movies():
+    """
+    Testing the get_top_n_rated_movies method from MoviesDataSet class
+    """
+    expected_data = {
+        "id": [5, 1, 3],
+        "title": ["title5", "title1", "title3"],
+        "average_rating": [5.0, 4.0, 3.0]
+    }
+
+    expected_df = pd.DataFrame(data=expected_data)
+    actual_df = test_movies_dataset_object.get_top_n_rated_movies(n=3, min_ratings=3)
+
+    assert_frame_equal(expected_df, actual_df)
+
+
+def test_get_top_n_rated_movies_with_filters():
+    """
+    Testing the genre and release year filters of the get_top_n_rated_movies method from MoviesDataSet class
+    """
+    actual_df = test_movies_dataset_object.get_top_n_rated_movies(n=5, genre="genre1")
+    assert actual_df["id"].tolist() == [1, 3, 4]
+
+    actual_df = test_movies_dataset_object.get_top_n_rated_movies(n=2, year_range=(1995, 1995))
+    assert actual_df["id"].tolist() == [1, 3]
+
+
+@pytest.mark.parametrize("backend", ["pandas", "sql"])
+def test_append_ratings(backend):
+    """
+    Testing that the append_ratings method from MoviesDataSet class returns the same results as a full recomputation
+    """
+    movies_dataset_object = MoviesDataSet(test=True, backend=backend)
+    movies_dataset_object.movies_df = pd.concat(
+        [movies_dataset_object.movies_df, pd.DataFrame({"id": [8], "original_title": ["title8"]})],
+        ignore_index=True
+    )
+    movies_dataset_object.get_top_n_rated_movies(n=3)
+    new_ratings_df = pd.DataFrame({"movieId": [2, 2, 7, 8, 99], "rating": [5.0, 5.0, 1.0, 4.5, 3.0]})
+    movies_dataset_object.append_ratings(new_ratings_df.iloc[:3])
+    movies_dataset_object.append_ratings(new_ratings_df.iloc[3:])
+
+    recomputed_dataset_object = MoviesDataSet(test=True, backend=backend)
+    recomputed_dataset_object.movies_df = movies_dataset_object.movies_df
+    recomputed_dataset_object.ratings_df = pd.concat(
+        [recomputed_dataset_object.ratings_df, new_ratings_df.astype({"movieId": "int32", "rating": "float32"})],
+        ignore_index=True
+    )
+
+    for method_name in ["get_movie_ratings_summary", "get_average_movie_rating", "get_top_5_highest_rated_movies"]:
+        expected_df = getattr(recomputed_dataset_object, method_name)()
+        actual_df = getattr(movies_dataset_object, method_name)()
+        assert_frame_equal(expected_df, actual_df)
+    assert_frame_equal(
+        recomputed_dataset_object.get_top_n_rated_movies(n=3), movies_dataset_object.get_top_n_rated_movies(n=3)
+    )
+
+
+def test_append_ratings_streaming_with_links():
+    """
+    Testing that the ratings appended in streaming mode are kept when the ratings aggregate is rebuilt
+    after the links table is replaced
+    """
+    movies_dataset_object = MoviesDataSet(test=True, ratings_chunksize=2)
+    movies_dataset_object.get_average_movie_rating()
+    new_ratings_df = pd.DataFrame({"movieId": [2, 2, 7], "rating": [5.0, 5.0, 1.0]})
+    movies_dataset_object.append_ratings(new_ratings_df)
+    links_df = pd.DataFrame({"movieId": [1, 2, 3, 4, 5, 6, 7], "tmdbId": [1, 3, 2, 4, 5, 6, 7]})
+    movies_dataset_object._set_table("links", links_df)
+
+    recomputed_dataset_object = MoviesDataSet(test=True)
+    recomputed_dataset_object.ratings_df = pd.concat(
+        [recomputed_dataset_object.ratings_df, new_ratings_df.astype({"movieId": "int32", "rating": "float32"})],
+        ignore_index=True
+    )
+    recomputed_dataset_object._set_table("links", links_df)
+
+    assert_frame_equal(
+        recomputed_dataset_object.get_average_movie_rating(), movies_dataset_object.get_average_movie_rating()
+    )
+
+
+def test_save_to_json_movies_dataset(tmp_path):
+    """
+    Testing that the save_to_json_movies_dataset method from MoviesDataSet class writes every file
+    in its configured export format
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    for attribute_name in ["movies_metadata_json", "ratings_json", "genres_json", "unique_movies_json",
+                           "average_movies_rating_json", "top_5_rated_movies_json", "movies_released_by_year_json",
+                           "movies_by_genre_json"]:
+        setattr(movies_dataset_object.config, attribute_name, str(tmp_path / f"{attribute_name}.json"))
+    movies_dataset_object.config.export_formats = {"ratings_json": "jsonl"}
+    movies_dataset_object.config.export_chunksize = 5
+
+    export_file_paths = movies_dataset_object.save_to_json_movies_dataset()
+
+    assert export_file_paths["ratings_json"] == str(tmp_path / "ratings_json.jsonl")
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in export_file_paths.values())
+    ratings_df = pd.read_json(export_file_paths["ratings_json"], lines=True)
+    assert ratings_df["rating"].tolist() == movies_dataset_object.ratings_df["rating"].tolist()
+    unique_movies_df = pd.read_json(export_file_paths["unique_movies_json"], orient="table")
+    assert unique_movies_df["movies_count"].tolist() == [7]
+
+
+def test_lazy_loading():
+    """
+    Testing that MoviesDataSet reads only the tables and columns required by the called query methods
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    assert movies_dataset_object._tables == {}
+
+    actual_df = movies_dataset_object.get_movies_released_each_year()
+
+    assert list(movies_dataset_object._tables) == ["movies"]
+    assert movies_dataset_object._tables["movies"].columns.tolist() == ["id", "release_date"]
+    assert_frame_equal(MoviesDataSet(test=True, lazy_loading=False).get_movies_released_each_year(), actual_df)
+    assert movies_dataset_object.movies_df.columns.tolist() == ["id", "original_title", "genres", "release_date"]
+
+
+def test_release_tables_after_query():
+    """
+    Testing that the tables read by a query method are released after it returns when the release is enabled
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    movies_dataset_object.release_tables_after_query = True
+
+    actual_df = movies_dataset_object.get_movies_count_by_genre()
 
+    assert movies_dataset_object._tables == {}
+    assert_frame_equal(test_movies_dataset_object.get_movies_count_by_genre(), actual_df)
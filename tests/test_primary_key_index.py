@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.primary_key_index import PrimaryKeyIndex, drop_duplicate_keys
+from src.movies_dataset_class import MoviesDataSet
+
+movies_df = pd.DataFrame({"id": ["5", "2", "9", "2", "1997-08-20", None], "title": ["a", "b", "c", "d", "e", "f"]})
+
+
+def test_primary_key_index_lookups():
+    """
+    Testing that the primary key index finds the first row of every key and counts the distinct keys like nunique
+    """
+    movies_index = PrimaryKeyIndex.from_frame(movies_df, "id")
+
+    assert len(movies_index) == movies_df["id"].nunique()
+    assert movies_index.keys.tolist() == [2, 5, 9]
+    assert movies_index.get_row_positions(np.array([9, 2, 3, np.nan, 5.0])).tolist() == [2, 1, -1, -1, 0]
+    assert movies_index.get_key_positions(pd.Series([5, 7, 2])).tolist() == [1, -1, 0]
+
+
+@pytest.mark.parametrize(
+    "keep, expected_titles", [("first", ["a", "b", "c", "e", "f"]), ("last", ["a", "c", "d", "e", "f"])]
+)
+def test_drop_duplicate_keys(keep, expected_titles):
+    """
+    Testing that the rows with a duplicated key are dropped by the keep policy and returned
+    """
+    kept_df, dropped_df = drop_duplicate_keys(movies_df, "id", keep=keep)
+
+    assert kept_df["title"].tolist() == expected_titles
+    assert dropped_df["id"].tolist() == ["2"]
+    with pytest.raises(ValueError):
+        drop_duplicate_keys(movies_df, "id", keep="most_complete")
+
+
+def test_movies_dataset_primary_key():
+    """
+    Testing that the duplicated movies are dropped at load and reported, and the ratings and genres
+    are joined with the movies by their positions in the movies index
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+
+    movies_index = movies_dataset_object.get_movies_index()
+
+    assert movies_dataset_object.movies_df["id"].tolist() == [1, 2, 3, 4, 5, 6, 7]
+    assert movies_dataset_object.get_dropped_rows_report().to_dict("list") == {
+        "table": ["movies", "movies"], "key": [1, 2], "dropped_rows": [1, 1]
+    }
+    assert len(movies_index) == 7
+    ratings_positions = movies_dataset_object.get_foreign_key_positions("ratings")
+    assert (
+        movies_index.keys[ratings_positions] == movies_dataset_object.ratings_df["movieId"].to_numpy()
+    ).all()
+    assert movies_dataset_object.get_foreign_key_positions("genres").tolist() == [0, 1, 2, 2, 3, 3, 4]
+
+    movies_dataset_object.genres_df = pd.DataFrame({"id": [7, 8], "genre_name": ["genre7", "genre8"]})
+
+    assert movies_dataset_object.get_foreign_key_positions("genres").tolist() == [6, -1]
+    assert movies_dataset_object.get_movies_count_by_genre()["genre"].tolist() == [None, "genre7"]
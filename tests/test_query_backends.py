@@ -0,0 +1,109 @@
+import pytest
+from pandas.testing import assert_frame_equal
+from src.movies_dataset_class import MoviesDataSet
+
+pandas_movies_dataset_object = MoviesDataSet(test=True, backend="pandas")
+sql_movies_dataset_object = MoviesDataSet(test=True, backend="sql")
+sqlite_movies_dataset_object = MoviesDataSet(test=True, backend="sqlite")
+
+
+@pytest.mark.parametrize(
+    "method_name",
+    [
+        "get_unique_movies",
+        "get_average_movie_rating",
+        "get_top_5_highest_rated_movies",
+        "get_movies_released_each_year",
+        "get_movies_count_by_genre"
+    ]
+)
+def test_pandas_backend_matches_sql_backend(method_name):
+    """
+    Testing that the pandas query backend returns the same results as the SQL query backend
+    """
+    expected_df = getattr(sql_movies_dataset_object, method_name)()
+    actual_df = getattr(pandas_movies_dataset_object, method_name)()
+
+    assert_frame_equal(expected_df, actual_df)
+
+
+@pytest.mark.parametrize(
+    "method_name",
+    [
+        "get_unique_movies",
+        "get_average_movie_rating",
+        "get_top_5_highest_rated_movies",
+        "get_movies_released_each_year",
+        "get_movies_count_by_genre"
+    ]
+)
+def test_sqlite_backend_matches_sql_backend(method_name):
+    """
+    Testing that the SQLite store query backend returns the same results as the SQL query backend
+    """
+    expected_df = getattr(sql_movies_dataset_object, method_name)()
+    actual_df = getattr(sqlite_movies_dataset_object, method_name)()
+
+    assert_frame_equal(expected_df, actual_df)
+
+
+@pytest.mark.parametrize("backend_movies_dataset_object", [pandas_movies_dataset_object, sqlite_movies_dataset_object])
+@pytest.mark.parametrize("by", ["year", "month", "decade"])
+def test_movies_released_matches_sql_backend(backend_movies_dataset_object, by):
+    """
+    Testing that the release period counts of the pandas and SQLite store backends match the SQL backend
+    """
+    expected_df = sql_movies_dataset_object.get_movies_released(by=by)
+    actual_df = backend_movies_dataset_object.get_movies_released(by=by)
+
+    assert_frame_equal(expected_df, actual_df)
+
+
+@pytest.mark.parametrize(
+    "backend_movies_dataset_object",
+    [pandas_movies_dataset_object, sql_movies_dataset_object, sqlite_movies_dataset_object]
+)
+def test_run_reports_matches_query_methods(backend_movies_dataset_object):
+    """
+    Testing that the reports planned together return the same results as the query methods of every backend
+    """
+    expected_reports = {
+        "unique_movies": sql_movies_dataset_object.get_unique_movies(),
+        "average_movies_rating": sql_movies_dataset_object.get_average_movie_rating(),
+        "top_5_rated_movies": sql_movies_dataset_object.get_top_5_highest_rated_movies(),
+        "movies_released_by_year": sql_movies_dataset_object.get_movies_released_each_year(),
+        "movies_by_genre": sql_movies_dataset_object.get_movies_count_by_genre()
+    }
+
+    actual_reports = backend_movies_dataset_object.run_reports()
+
+    assert list(actual_reports) == list(expected_reports)
+    for report_name, expected_df in expected_reports.items():
+        assert_frame_equal(expected_df, actual_reports[report_name])
+    assert list(backend_movies_dataset_object.run_reports(["movies_by_genre", "unique_movies"])) == [
+        "movies_by_genre", "unique_movies"
+    ]
+    with pytest.raises(ValueError):
+        backend_movies_dataset_object.run_reports(["unique_movies", "top_10_rated_movies"])
+
+
+def test_unknown_query_backend():
+    """
+    Testing that an unknown query backend name is rejected
+    """
+    with pytest.raises(ValueError):
+        MoviesDataSet(test=True, backend="unknown")
+
+
+def test_backend_error_is_raised(monkeypatch):
+    """
+    Testing that an error of the query backend is raised by the query method as is
+    """
+    movies_dataset_object = MoviesDataSet(test=True, backend="sql")
+
+    def failing_query(dataset):
+        raise RuntimeError("no such table: movies")
+
+    monkeypatch.setattr(movies_dataset_object.backend, "get_unique_movies", failing_query)
+    with pytest.raises(RuntimeError, match="no such table"):
+        movies_dataset_object.get_unique_movies()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.rating_trends import RatingTimeline
+from src.movies_dataset_class import MoviesDataSet
+from src.synthetic_data import generate_synthetic_ratings
+
+
+@pytest.fixture(scope="module")
+def ratings_df() -> pd.DataFrame:
+    return generate_synthetic_ratings(np.arange(1, 51), 20000, 100, np.random.default_rng(0))
+
+
+@pytest.mark.parametrize("by, frequency", [("day", "D"), ("week", "W-SUN"), ("month", "M")])
+def test_rating_timeline_trends(ratings_df, by, frequency):
+    """
+    Testing that the rating trends of all movies and of every movie match a group by of the periods of the timestamps
+    """
+    periods = pd.to_datetime(ratings_df["timestamp"], unit="s").dt.to_period(frequency).dt.start_time
+    expected_df = (
+        ratings_df.assign(period=periods).groupby(["movieId", "period"])["rating"].agg(["count", "mean"])
+        .reset_index().set_axis(["movieId", "period", "rating_count", "average_rating"], axis=1)
+    )
+    rating_timeline = RatingTimeline.from_frame(ratings_df)
+
+    actual_df = rating_timeline.get_trends(by=by, per_movie=True)
+
+    assert_frame_equal(expected_df, actual_df, check_dtype=False)
+    assert_frame_equal(
+        expected_df[expected_df["movieId"] == 7].drop(columns="movieId").reset_index(drop=True),
+        rating_timeline.get_trends(by=by, movie_id=7),
+        check_dtype=False
+    )
+    assert rating_timeline.get_trends(by=by)["rating_count"].sum() == len(ratings_df)
+
+
+def test_rating_timeline_rolling_trends(ratings_df):
+    """
+    Testing that the rolling rating trends match the pandas rolling sums of the daily ratings
+    """
+    daily_ratings = (
+        ratings_df.set_index(pd.to_datetime(ratings_df["timestamp"], unit="s").dt.floor("D"))["rating"]
+        .groupby(level=0).agg(["count", "sum"]).asfreq("D", fill_value=0).rolling(30, min_periods=1).sum()
+    )
+
+    actual_df = RatingTimeline.from_frame(ratings_df).get_rolling_trends(by="day", window=30)
+
+    assert (actual_df["period"].to_numpy() == daily_ratings.index.to_numpy()).all()
+    assert (actual_df["rating_count"].to_numpy() == daily_ratings["count"].to_numpy()).all()
+    assert np.allclose(
+        actual_df["average_rating"].to_numpy(), daily_ratings["sum"] / daily_ratings["count"], equal_nan=True
+    )
+
+
+def test_movies_dataset_trending_movies():
+    """
+    Testing the trending movies of a MoviesDataSet object in a window of days ending at a date
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    day = 24 * 60 * 60
+    movies_dataset_object.ratings_df = pd.DataFrame(
+        {
+            "userId": np.arange(9),
+            "movieId": [1, 2, 2, 3, 3, 3, 1, 1, 2],
+            "rating": [5.0, 4.0, 2.0, 1.0, 2.0, 3.0, 4.0, 4.0, 5.0],
+            "timestamp": np.array([10, 10, 11, 12, 12, 12, 5, 6, 20]) * day
+        }
+    )
+
+    trending_movies = movies_dataset_object.get_trending_movies(n=2, days=5, end="1970-01-13")
+
+    assert trending_movies["id"].tolist() == [3, 2]
+    assert trending_movies["title"].tolist() == ["title3", "title2"]
+    assert trending_movies["average_rating"].tolist() == [2.0, 3.0]
+    assert trending_movies["previous_rating_count"].tolist() == [0, 0]
+    assert movies_dataset_object.get_trending_movies(n=1, days=7)["id"].tolist() == [2]
+    assert movies_dataset_object.get_trending_movies(days=3, end="1970-01-11")["previous_rating_count"].tolist() == [
+        2, 0
+    ]
+    with pytest.raises(ValueError):
+        movies_dataset_object.get_rating_trends(by="year")
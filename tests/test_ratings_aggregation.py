@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.movies_dataset_class import MoviesDataSet
+from src.ratings_aggregation import RatingsAggregate
+
+test_movies_dataset_object = MoviesDataSet(test=True)
+
+
+def test_ratings_aggregate_from_csv():
+    """
+    Testing that the RatingsAggregate of a CSV file read in chunks matches the one of the loaded ratings
+    """
+    expected_df = RatingsAggregate.from_frame(test_movies_dataset_object.ratings_df).get_average_ratings()
+    actual_df = RatingsAggregate.from_csv(
+        test_movies_dataset_object.source_files["ratings"], chunksize=4
+    ).get_average_ratings()
+
+    assert_frame_equal(expected_df, actual_df)
+
+
+def test_ratings_aggregate_ignores_missing_ratings():
+    """
+    Testing that the RatingsAggregate ignores the missing ratings
+    """
+    ratings_aggregate = RatingsAggregate()
+    ratings_aggregate.update(np.array([3, 3, 1]), np.array([4.0, np.nan, 2.0]))
+
+    expected_df = pd.DataFrame(
+        {
+            "movieId": [1, 3],
+            "rating_count": [1, 1],
+            "average_rating": [2.0, 4.0],
+            "min_rating": [2.0, 4.0],
+            "max_rating": [2.0, 4.0]
+        }
+    )
+
+    assert_frame_equal(expected_df, ratings_aggregate.get_average_ratings())
+
+
+def test_streaming_average_movie_rating():
+    """
+    Testing that the streaming mode returns the same average ratings without loading the ratings table
+    """
+    movies_dataset_object = MoviesDataSet(test=True, ratings_chunksize=5)
+
+    expected_df = test_movies_dataset_object.get_average_movie_rating()
+    actual_df = movies_dataset_object.get_average_movie_rating()
+
+    assert_frame_equal(expected_df, actual_df)
+    assert "ratings" not in movies_dataset_object._tables
+
+
+def test_parallel_ratings_aggregation(tmp_path):
+    """
+    Testing that the ratings shards aggregated by a process pool match the serial aggregation bit for bit
+    """
+    ratings_df = test_movies_dataset_object.ratings_df
+    for shard_number in range(3):
+        ratings_df.iloc[shard_number::3].to_csv(tmp_path / f"ratings_{shard_number}.csv", index=False)
+    shards_pattern = str(tmp_path / "ratings_*.csv")
+
+    serial_aggregate = RatingsAggregate.from_csv_files(shards_pattern, chunksize=2)
+    parallel_aggregate = RatingsAggregate.from_csv_files(shards_pattern, chunksize=2, workers=3)
+
+    assert np.array_equal(serial_aggregate.rating_sums, parallel_aggregate.rating_sums)
+    assert np.array_equal(serial_aggregate.rating_counts, parallel_aggregate.rating_counts)
+
+    movies_dataset_object = MoviesDataSet(test=True, ratings_file_path=shards_pattern, ratings_workers=3)
+    expected_df = test_movies_dataset_object.get_top_5_highest_rated_movies()
+    actual_df = movies_dataset_object.get_top_5_highest_rated_movies()
+
+    assert_frame_equal(expected_df, actual_df)
@@ -0,0 +1,110 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.movies_dataset_class import MoviesDataSet
+from src.ratings_aggregation import RatingsAggregate
+from src.ratings_sample import RatingsSample
+from src.synthetic_data import generate_synthetic_ratings
+
+
+@pytest.fixture(scope="module")
+def ratings_df() -> pd.DataFrame:
+    return generate_synthetic_ratings(np.arange(1, 501), 200000, 1000, np.random.default_rng(0))
+
+
+def test_ratings_sample_error(ratings_df):
+    """
+    Testing that the average ratings estimated from the blocks sample are within 3 standard errors of the exact
+    averages for almost every movie and that the sample reads only the sampled fraction of the ratings
+    """
+    expected_df = ratings_df.groupby("movieId")["rating"].agg(["count", "mean"]).reset_index()
+    actual_df = RatingsSample.from_frame(ratings_df, fraction=0.2, block_rows=2000, seed=0).get_average_ratings()
+
+    compared_df = expected_df.merge(actual_df, on="movieId")
+    errors = np.abs(compared_df["average_rating"] - compared_df["mean"])
+    with_error = compared_df["average_rating_error"].notna()
+    assert with_error.mean() >= 0.95
+    assert (errors <= 3 * compared_df["average_rating_error"])[with_error].mean() >= 0.95
+    assert actual_df["sample_count"].sum() == 20 * 2000
+    assert abs(actual_df["rating_count"].sum() - len(ratings_df)) <= 0.05 * len(ratings_df)
+
+
+def test_ratings_sample_full_fraction(ratings_df, tmp_path):
+    """
+    Testing that the sample of all the blocks of CSV shards is exact with a standard error of 0
+    and that the shard samples merge to the sample of all ratings
+    """
+    expected_df = RatingsSample.from_frame(ratings_df, fraction=1.0).get_average_ratings()
+    for shard_number, shard_positions in enumerate(np.array_split(np.arange(len(ratings_df)), 3)):
+        ratings_df.iloc[shard_positions].to_csv(tmp_path / f"ratings_{shard_number}.csv", index=False)
+
+    actual_df = RatingsSample.from_csv_files(
+        str(tmp_path / "ratings_*.csv"), fraction=1.0, block_bytes=10000, workers=2
+    ).get_average_ratings()
+
+    assert_frame_equal(expected_df, actual_df)
+    np.testing.assert_allclose(
+        actual_df["average_rating"], ratings_df.groupby("movieId")["rating"].mean().to_numpy()
+    )
+    assert (actual_df["average_rating_error"] == 0).all()
+    with pytest.raises(ValueError):
+        RatingsSample.from_frame(ratings_df, fraction=0)
+
+
+def test_ratings_sample_speedup(tmp_path):
+    """
+    Testing that sampling a tenth of the blocks of a ratings CSV file is faster than aggregating all its ratings
+    """
+    ratings_df = generate_synthetic_ratings(np.arange(1, 2001), 1000000, 10000, np.random.default_rng(1))
+    file_path = str(tmp_path / "ratings.csv")
+    ratings_df.to_csv(file_path, index=False)
+
+    start_time = time.perf_counter()
+    RatingsAggregate.from_csv_files(file_path, chunksize=len(ratings_df)).get_average_ratings()
+    exact_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    average_ratings = RatingsSample.from_csv_files(file_path, fraction=0.1, block_bytes=262144).get_average_ratings()
+    approximate_seconds = time.perf_counter() - start_time
+
+    assert average_ratings["sample_count"].sum() < 0.15 * len(ratings_df)
+    assert approximate_seconds < exact_seconds
+
+
+def test_movies_dataset_approximate_mode():
+    """
+    Testing that the approximate mode estimates the average ratings with an error column, returns the exact movie
+    counts with an error of 0, adds the appended ratings to the sample and caches its results apart from the exact ones
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    approximate_dataset_object = MoviesDataSet(test=True, approximate=True)
+    expected_df = movies_dataset_object.get_average_movie_rating()
+
+    actual_df = approximate_dataset_object.get_average_movie_rating()
+    reports = approximate_dataset_object.run_reports(["unique_movies", "top_5_rated_movies"])
+
+    # The test ratings file is a single block, so it is read in full and the averages are exact
+    assert_frame_equal(expected_df, actual_df[["id", "title", "average_rating"]])
+    assert (actual_df["average_rating_error"] == 0).all()
+    assert "ratings" not in approximate_dataset_object._tables
+    assert_frame_equal(movies_dataset_object.get_unique_movies(), reports["unique_movies"][["movies_count"]])
+    assert (reports["unique_movies"]["movies_count_error"] == 0).all()
+    genre_counts = approximate_dataset_object.get_movies_count_by_genre()
+    assert_frame_equal(movies_dataset_object.get_movies_count_by_genre(), genre_counts[["genre", "movies_count"]])
+    assert (genre_counts["movies_count_error"] == 0).all()
+    assert "movies_count_error" not in movies_dataset_object.get_movies_count_by_genre()
+    assert list(reports["top_5_rated_movies"].columns) == ["id", "title", "average_rating", "average_rating_error"]
+
+    new_ratings_df = pd.DataFrame({"movieId": [1, 1, 4], "rating": [1.0, 2.0, 5.0]})
+    approximate_dataset_object.get_ratings_sample()
+    approximate_dataset_object.append_ratings(new_ratings_df)
+    movies_dataset_object.append_ratings(new_ratings_df)
+    approximate_dataset_object.approximate = False
+    assert "average_rating_error" not in approximate_dataset_object.get_average_movie_rating()
+    approximate_dataset_object.approximate = True
+
+    assert_frame_equal(
+        movies_dataset_object.get_average_movie_rating(),
+        approximate_dataset_object.get_average_movie_rating()[["id", "title", "average_rating"]]
+    )
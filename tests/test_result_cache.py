@@ -0,0 +1,66 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.movies_dataset_class import MoviesDataSet
+from src.result_cache import (
+    ResultCache,
+    DiskResultCache
+)
+
+
+def test_result_cache_lru_eviction():
+    """
+    Testing that the ResultCache evicts the least recently used result above the size limit
+    """
+    result_cache = ResultCache(max_entries=2)
+    result_cache.put("a", 1, ("movies",))
+    result_cache.put("b", 2, ("ratings",))
+    result_cache.get("a")
+    result_cache.put("c", 3, ("genres",))
+
+    assert list(result_cache.entries) == ["a", "c"]
+    assert result_cache.get("b") is None
+    assert result_cache.get_stats() == {"hits": 1, "misses": 1, "entries": 2, "max_entries": 2}
+
+
+def test_result_cache_invalidation():
+    """
+    Testing that replacing a MoviesDataSet table invalidates only the cached results depending on it
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    movies_dataset_object.get_unique_movies()
+    movies_dataset_object.get_average_movie_rating()
+    movies_dataset_object.get_top_5_highest_rated_movies()
+    movies_dataset_object.get_unique_movies()
+    movies_dataset_object.get_movies_count_by_genre()
+    assert movies_dataset_object.result_cache.hits == 1
+
+    movies_dataset_object.ratings_df = pd.DataFrame({"movieId": [1], "rating": [1.0]})
+    cached_methods = [method_name for method_name, _ in movies_dataset_object.result_cache.entries]
+    assert cached_methods == ["get_unique_movies", "get_movies_count_by_genre"]
+
+    actual_df = movies_dataset_object.get_average_movie_rating()
+    assert actual_df["average_rating"].tolist() == [1.0]
+
+
+def test_disk_result_cache(tmp_path):
+    """
+    Testing that a new MoviesDataSet object returns the on-disk cached results without loading the CSV files
+    """
+    disk_cache_dir = str(tmp_path / "cache")
+    expected_df = MoviesDataSet(test=True, disk_cache_dir=disk_cache_dir).get_average_movie_rating()
+
+    movies_dataset_object = MoviesDataSet(test=True, disk_cache_dir=disk_cache_dir)
+    actual_df = movies_dataset_object.get_average_movie_rating()
+
+    assert_frame_equal(expected_df, actual_df)
+    assert movies_dataset_object._tables == {}
+
+
+def test_disk_result_cache_eviction(tmp_path):
+    """
+    Testing that the DiskResultCache evicts the least recently used results above the size limit
+    """
+    disk_cache = DiskResultCache(str(tmp_path), max_bytes=0)
+    disk_cache.put("key", pd.DataFrame({"movies_count": [7]}))
+
+    assert disk_cache.get("key") is None
@@ -0,0 +1,74 @@
+import json
+import time
+import asyncio
+from http import HTTPStatus
+from src.movies_dataset_class import MoviesDataSet
+from src.service import QueryService
+
+
+def test_query_service_endpoints():
+    """
+    Testing that the query service answers the query endpoints over HTTP and rejects the invalid requests
+    """
+    async def get(port: int, target: str) -> tuple:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        headers, body = response.split(b"\r\n\r\n", 1)
+        return int(headers.split()[1]), json.loads(body)
+
+    async def run_requests() -> list:
+        service = QueryService(MoviesDataSet(test=True), host="127.0.0.1", port=0)
+        port = await service.start()
+        try:
+            return [
+                await get(port, target)
+                for target in ["/unique-movies", "/top-rated?n=2", "/movies-released?by=decade",
+                               "/movies-released?by=week", "/top-rated?limit=2", "/unknown", "/metrics"]
+            ]
+        finally:
+            await service.stop()
+
+    responses = asyncio.run(run_requests())
+
+    assert responses[0] == (HTTPStatus.OK, [{"movies_count": 7}])
+    assert [movie["id"] for movie in responses[1][1]] == [5, 6]
+    assert responses[2] == (
+        HTTPStatus.OK,
+        [{"decade": "1990s", "movies_released": 3}, {"decade": "2000s", "movies_released": 1},
+         {"decade": "2010s", "movies_released": 1}]
+    )
+    assert [status for status, _ in responses[3:6]] == [HTTPStatus.BAD_REQUEST] * 2 + [HTTPStatus.NOT_FOUND]
+    metrics = responses[6][1]
+    assert metrics["/movies-released"]["requests"] == 2
+    assert metrics["/movies-by-genre"] == {
+        "requests": 0, "coalesced_requests": 0, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None
+    }
+
+
+def test_query_service_coalesces_requests():
+    """
+    Testing that identical concurrent requests are answered by a single query computation
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    calls = []
+
+    def slow_get_unique_movies():
+        calls.append(time.perf_counter())
+        time.sleep(0.2)
+        return MoviesDataSet.get_unique_movies(movies_dataset_object)
+
+    movies_dataset_object.get_unique_movies = slow_get_unique_movies
+    service = QueryService(movies_dataset_object, port=0)
+
+    async def run_requests() -> list:
+        return await asyncio.gather(*[service.handle_request("GET", "/unique-movies") for _ in range(5)])
+
+    responses = asyncio.run(run_requests())
+
+    assert len(calls) == 1
+    assert all(response == (HTTPStatus.OK, b'[{"movies_count":7}]') for response in responses)
+    assert service.get_latency_metrics()["/unique-movies"]["coalesced_requests"] == 4
+    assert service.in_flight == {}
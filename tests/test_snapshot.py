@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.movies_dataset_class import MoviesDataSet
+from src.snapshot import save_snapshot, load_snapshot
+
+
+def test_snapshot_round_trip(tmp_path):
+    """
+    Testing that the numeric, datetime, category and string columns are loaded from a snapshot unchanged
+    and the columns which are not decoded are memory-mapped read-only
+    """
+    expected_df = pd.DataFrame(
+        {
+            "id": np.arange(4, dtype="int32"),
+            "rating": np.array([0.5, 1.0, np.nan, 5.0], dtype="float32"),
+            "release_date": pd.to_datetime(["1995-01-01", None, "2000-04-04", "2010-05-05"]),
+            "genre_name": pd.Categorical(["Drama", "Comedy", "Drama", None]),
+            "title": ["title1", np.nan, "Amélie", ""]
+        }
+    )
+    snapshot_path = str(tmp_path / "snapshot")
+    save_snapshot({"movies": expected_df}, snapshot_path)
+    # An existing snapshot is replaced
+    save_snapshot({"movies": expected_df}, snapshot_path)
+
+    actual_df = load_snapshot(snapshot_path)["movies"]
+
+    assert_frame_equal(expected_df, actual_df)
+    assert not actual_df["id"].to_numpy().flags.writeable
+    assert not actual_df["release_date"].to_numpy().flags.writeable
+    assert_frame_equal(expected_df, load_snapshot(snapshot_path, mmap=False)["movies"])
+
+
+def test_snapshot_unsupported_column(tmp_path):
+    """
+    Testing that a column with non-string objects is rejected
+    """
+    with pytest.raises(ValueError):
+        save_snapshot({"movies": pd.DataFrame({"genres": [["Drama"], ["Comedy"]]})}, str(tmp_path / "snapshot"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_movies_dataset_from_snapshot(tmp_path):
+    """
+    Testing that a MoviesDataSet object created from a snapshot has the same tables and query results
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    snapshot_path = movies_dataset_object.save_snapshot(str(tmp_path / "snapshot"))
+
+    snapshot_dataset_object = MoviesDataSet.from_snapshot(snapshot_path, test=True)
+
+    for table_name in ["movies_df", "ratings_df", "genres_df"]:
+        assert_frame_equal(getattr(movies_dataset_object, table_name), getattr(snapshot_dataset_object, table_name))
+    for method_name in ["get_average_movie_rating", "get_movies_released_each_year", "get_movies_count_by_genre"]:
+        assert_frame_equal(
+            getattr(movies_dataset_object, method_name)(), getattr(snapshot_dataset_object, method_name)()
+        )
+    assert snapshot_dataset_object.release_tables() == []
+    with pytest.raises(ValueError):
+        MoviesDataSet.from_snapshot(snapshot_path, test=True, backend="sqlite")
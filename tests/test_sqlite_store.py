@@ -0,0 +1,43 @@
+import os
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.sqlite_store import SqliteStore
+
+
+def test_sync_ingests_only_changed_files(tmp_path):
+    """
+    Testing that the SqliteStore sync method skips the CSV files which did not change since the last ingestion
+    """
+    csv_file_path = str(tmp_path / "ratings.csv")
+    pd.DataFrame({"movieId": [1, 2], "rating": [4.0, 3.0]}).to_csv(csv_file_path, index=False)
+
+    store = SqliteStore(str(tmp_path / "store.db"))
+    assert store.sync({"ratings": csv_file_path}) == ["ratings"]
+    assert store.sync({"ratings": csv_file_path}) == []
+
+    pd.DataFrame({"movieId": [1, 2, 3], "rating": [4.0, 3.0, 5.0]}).to_csv(csv_file_path, index=False)
+    os.utime(csv_file_path, ns=(0, 0))
+    assert store.sync({"ratings": csv_file_path}) == ["ratings"]
+
+    expected_df = pd.DataFrame({"movieId": [1, 2, 3], "rating": [4.0, 3.0, 5.0]})
+    assert_frame_equal(expected_df, store.read_table("ratings"))
+    store.close()
+
+
+def test_store_is_reused_across_connections(tmp_path):
+    """
+    Testing that a new SqliteStore connection reuses the tables ingested by a previous one
+    """
+    csv_file_path = str(tmp_path / "genres.csv")
+    db_path = str(tmp_path / "store.db")
+    pd.DataFrame({"id": [1, 1], "genre_name": ["genre1", "genre2"]}).to_csv(csv_file_path, index=False)
+
+    store = SqliteStore(db_path)
+    store.sync({"genres": csv_file_path})
+    store.close()
+
+    store = SqliteStore(db_path)
+    assert store.is_up_to_date("genres", csv_file_path)
+    indexes = store.query("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'genres';")
+    assert indexes["name"].tolist() == ["idx_genres_id"]
+    store.close()
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.user_ratings import UserRatingsMatrix
+from src.movies_dataset_class import MoviesDataSet
+
+
+def get_ratings_df(seed: int = 0, ratings_count: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "userId": rng.integers(1, 60, ratings_count),
+            "movieId": rng.integers(1, 120, ratings_count) * 10,
+            "rating": rng.choice(np.arange(1, 11) / 2, ratings_count).astype("float32")
+        }
+    )
+
+
+def test_user_ratings_matrix_neighbours():
+    """
+    Testing that the neighbours computed in small blocks match the dense cosine similarity of the ratings matrix
+    """
+    ratings_df = get_ratings_df()
+    dense_ratings = (
+        ratings_df.drop_duplicates(["userId", "movieId"], keep="last")
+        .pivot(index="userId", columns="movieId", values="rating").fillna(0)
+    )
+    norms = np.linalg.norm(dense_ratings.to_numpy(), axis=0)
+    similarities = dense_ratings.to_numpy().T @ dense_ratings.to_numpy() / np.outer(norms, norms)
+    np.fill_diagonal(similarities, 0)
+    ratings_matrix = UserRatingsMatrix.from_frame(ratings_df)
+
+    # A budget of a few kilobytes splits the movies in many blocks and the products in many chunks
+    neighbours = ratings_matrix.get_top_k_neighbours(k=5, memory_budget_bytes=50000)
+
+    assert neighbours["movieId"].nunique() == dense_ratings.shape[1]
+    assert neighbours.groupby("movieId")["rank"].apply(list).map(lambda ranks: ranks == [1, 2, 3, 4, 5]).all()
+    for position, movie_id in enumerate(dense_ratings.columns):
+        expected_similarities = np.sort(similarities[position])[::-1][:5]
+        movie_neighbours = neighbours[neighbours["movieId"] == movie_id]
+        assert np.allclose(movie_neighbours["similarity"].to_numpy(), expected_similarities)
+        assert np.allclose(
+            similarities[position, dense_ratings.columns.get_indexer(movie_neighbours["neighbourId"])],
+            expected_similarities
+        )
+    similar_movies = ratings_matrix.get_similar_movies(10, k=5)
+    assert_frame_equal(
+        similar_movies,
+        neighbours[neighbours["movieId"] == 10][["neighbourId", "similarity"]]
+        .rename(columns={"neighbourId": "movieId"}).reset_index(drop=True)
+    )
+    assert ratings_matrix.get_similar_movies(5, k=5).empty
+
+
+def test_user_ratings_matrix_user_stats():
+    """
+    Testing that the per-user statistics match a group by of the ratings without the duplicated ratings
+    """
+    ratings_df = get_ratings_df(seed=1)
+    ratings_df.loc[0, "rating"] = np.nan
+    expected_df = (
+        ratings_df.dropna().drop_duplicates(["userId", "movieId"], keep="last").astype({"rating": "float64"})
+        .groupby("userId")["rating"].agg(["count", "mean", "min", "max"]).reset_index()
+        .set_axis(["userId", "rating_count", "average_rating", "min_rating", "max_rating"], axis=1)
+    )
+
+    actual_df = UserRatingsMatrix.from_frame(ratings_df).get_user_stats()
+
+    assert_frame_equal(expected_df, actual_df, check_dtype=False)
+
+
+def test_movies_dataset_similar_movies():
+    """
+    Testing the movie similarity queries of a MoviesDataSet object and that they follow the replaced ratings
+    """
+    movies_dataset_object = MoviesDataSet(test=True)
+    movies_dataset_object.ratings_df = pd.DataFrame(
+        {
+            "userId": [1, 1, 1, 2, 2, 3, 3],
+            "movieId": [1, 2, 3, 1, 2, 1, 3],
+            "rating": [5.0, 4.0, 1.0, 4.0, 5.0, 1.0, 5.0]
+        }
+    )
+
+    similar_movies = movies_dataset_object.get_similar_movies(1, k=2)
+
+    assert similar_movies["id"].tolist() == [2, 3]
+    assert similar_movies["title"].tolist() == ["title2", "title3"]
+    assert np.allclose(similar_movies["similarity"], [40 / np.sqrt(42 * 41), 10 / np.sqrt(42 * 26)])
+    assert movies_dataset_object.get_movie_neighbours(k=1)["neighbourId"].tolist() == [2, 1, 1]
+    assert movies_dataset_object.get_user_rating_stats()["rating_count"].tolist() == [3, 2, 2]
+
+    movies_dataset_object.ratings_df = pd.DataFrame({"userId": [1, 1], "movieId": [1, 3], "rating": [5.0, 5.0]})
+
+    assert movies_dataset_object.get_similar_movies(1, k=2)["id"].tolist() == [3]
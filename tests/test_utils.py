@@ -0,0 +1,131 @@
+import os
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.utils import (
+    read_csv,
+    parse_genres,
+    save_to_jsonl,
+    explode_genres,
+    write_atomically,
+    get_memory_usage_report
+)
+
+movies_schema = {
+    "usecols": ["id", "original_title", "release_date"],
+    "ids": {"id": "int32"},
+    "parse_dates": {"release_date": "%Y-%m-%d"}
+}
+
+
+def test_read_csv_with_schema(tmp_path):
+    """
+    Testing that read_csv loads only the schema columns with their dtypes and drops the malformed ids
+    """
+    csv_file_path = str(tmp_path / "movies_metadata.csv")
+    pd.DataFrame(
+        {
+            "id": ["1", "2", "1997-08-20"],
+            "original_title": ["title1", "title2", "title3"],
+            "overview": ["overview1", "overview2", "overview3"],
+            "release_date": ["1995-01-01", "1995-06", "1997-08-20"]
+        }
+    ).to_csv(csv_file_path, index=False)
+
+    expected_df = pd.DataFrame(
+        {
+            "id": pd.Series([1, 2], dtype="int32"),
+            "original_title": ["title1", "title2"],
+            "release_date": pd.to_datetime(["1995-01-01", None])
+        }
+    )
+    actual_df = read_csv(csv_file_path, schema=movies_schema)
+
+    assert_frame_equal(expected_df, actual_df)
+
+
+def test_read_csv_raises_schema_error(tmp_path):
+    """
+    Testing that read_csv raises the original error of a column which cannot be converted to its schema dtype
+    """
+    csv_file_path = str(tmp_path / "ratings.csv")
+    pd.DataFrame({"movieId": [1, 2], "rating": ["4.5", "malformed"]}).to_csv(csv_file_path, index=False)
+
+    with pytest.raises(ValueError, match="malformed"):
+        read_csv(csv_file_path, schema={"dtype": {"rating": "float32"}})
+
+
+def test_get_memory_usage_report(tmp_path):
+    """
+    Testing that get_memory_usage_report reports the bytes saved by the table schema
+    """
+    csv_file_path = str(tmp_path / "ratings.csv")
+    pd.DataFrame({"movieId": [1, 2, 3], "rating": [4.0, 3.5, 1.0]}).to_csv(csv_file_path, index=False)
+    ratings_schema = {"dtype": {"movieId": "int32", "rating": "float32"}}
+
+    report_df = get_memory_usage_report({"ratings": csv_file_path}, {"ratings": ratings_schema})
+
+    assert report_df["table"].tolist() == ["ratings"]
+    assert report_df["bytes_saved"][0] == 3 * 4 + 3 * 4
+
+
+def test_parse_genres():
+    """
+    Testing that parse_genres parses the genres strings with and without quotes in the genre names
+    """
+    assert parse_genres("[{'id': 16, 'name': 'Animation'}, {'id': 35, 'name': 'Comedy'}]") == ["Animation", "Comedy"]
+    assert parse_genres("[{'id': 1, 'name': \"Children's\"}]") == ["Children's"]
+    assert parse_genres("[]") == []
+    assert parse_genres(float("nan")) == []
+
+
+def test_explode_genres():
+    """
+    Testing that explode_genres creates a row for every movie id and genre name
+    """
+    movies_df = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "genres": ["[{'name': 'genre1'}]", "[]", "[{'name': 'genre1'}, {'name': 'genre2'}]", None]
+        }
+    )
+    genres_cache = {}
+
+    expected_df = pd.DataFrame({"id": [1, 3, 3], "genre_name": ["genre1", "genre1", "genre2"]})
+    actual_df = explode_genres(movies_df, genres_cache)
+
+    assert_frame_equal(expected_df, actual_df)
+    assert len(genres_cache) == 3
+
+
+def test_save_to_jsonl(tmp_path):
+    """
+    Testing that save_to_jsonl writes a data frame in chunks to a JSON lines file with a record per line
+    """
+    jsonl_file_path = str(tmp_path / "ratings.jsonl")
+    expected_df = pd.DataFrame({"movieId": [1, 2, 3, 4, 5], "rating": [4.0, 3.5, 1.0, 2.0, 5.0]})
+
+    save_to_jsonl(expected_df, jsonl_file_path, chunksize=2)
+    actual_df = pd.read_json(jsonl_file_path, lines=True)
+
+    assert_frame_equal(expected_df, actual_df)
+    assert os.listdir(tmp_path) == ["ratings.jsonl"]
+
+
+def test_write_atomically_keeps_previous_file(tmp_path):
+    """
+    Testing that write_atomically keeps the previous file and removes the temporary file when the writing fails
+    """
+    file_path = str(tmp_path / "unique_movies.json")
+    write_atomically(file_path, lambda temp_file_path: pd.DataFrame({"movies_count": [7]}).to_json(temp_file_path))
+
+    def failing_write(temp_file_path):
+        with open(temp_file_path, "w") as temp_file:
+            temp_file.write("partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_atomically(file_path, failing_write)
+
+    assert os.listdir(tmp_path) == ["unique_movies.json"]
+    assert pd.read_json(file_path)["movies_count"].tolist() == [7]